@@ -0,0 +1,126 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+class SemanticAnswerCache:
+    """질문 임베딩 유사도 기반 답변 캐시
+
+    이전 질문과의 코사인 유사도가 threshold 이상이면 저장된 답변을 재사용합니다.
+    항목은 ttl_seconds 가 지나면 만료되고, max_entries 를 넘으면 가장 오래 사용되지
+    않은 항목부터 삭제됩니다 (LRU).
+
+    version_provider 가 주어지면 저장 시점의 검색 컬렉션 버전을 항목과 함께 기록하고,
+    조회 시 현재 버전과 다른 항목은 삭제합니다. 다른 프로세스(load_data.py)가
+    컬렉션을 다시 적재한 경우에도 이전 답변을 사용하지 않습니다.
+    """
+
+    def __init__(self, embeddings: Embeddings, threshold: float = 0.95,
+                 ttl_seconds: float = 3600, max_entries: int = 1000,
+                 version_provider: Optional[Callable[[], str]] = None):
+        self.embeddings = embeddings
+        self.threshold = threshold
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.version_provider = version_provider
+        self._entries = OrderedDict()  # question -> {"vector", "answer", "created_at", "version"}
+        self._lock = threading.Lock()
+        self._counters = {"hits": 0, "misses": 0, "bypasses": 0, "evictions": 0, "invalidations": 0}
+
+    @staticmethod
+    def _normalize(vector: List[float]) -> np.ndarray:
+        array = np.asarray(vector, dtype=np.float32)
+        norm = np.linalg.norm(array)
+        return array / norm if norm else array
+
+    def _expire(self, now: float) -> None:
+        expired = [q for q, entry in self._entries.items() if now - entry["created_at"] > self.ttl_seconds]
+        for question in expired:
+            del self._entries[question]
+        self._counters["evictions"] += len(expired)
+
+    def _version(self) -> str:
+        return self.version_provider() if self.version_provider else ""
+
+    def _drop_stale(self, version: str) -> None:
+        """현재 컬렉션 버전과 다른 버전에서 만든 항목 삭제"""
+        stale = [q for q, entry in self._entries.items() if entry["version"] != version]
+        for question in stale:
+            del self._entries[question]
+        if stale:
+            self._counters["invalidations"] += 1
+
+    def _find(self, vector: np.ndarray) -> Optional[str]:
+        """가장 유사한 질문의 답변 반환 (threshold 미만이면 None)"""
+        with self._lock:
+            # 버전 확인과 항목 정리를 같은 lock 안에서 수행 (동시에 저장된 항목과 버전이 어긋나지 않도록)
+            version = self._version()
+            self._expire(time.time())
+            self._drop_stale(version)
+            if not self._entries:
+                self._counters["misses"] += 1
+                return None
+
+            questions = list(self._entries.keys())
+            matrix = np.stack([self._entries[q]["vector"] for q in questions])
+            scores = matrix @ vector
+            best = int(np.argmax(scores))
+            if scores[best] < self.threshold:
+                self._counters["misses"] += 1
+                return None
+
+            self._entries.move_to_end(questions[best])
+            self._counters["hits"] += 1
+            return self._entries[questions[best]]["answer"]
+
+    def _put(self, question: str, vector: np.ndarray, answer: str) -> None:
+        with self._lock:
+            version = self._version()
+            self._entries[question] = {
+                "vector": vector, "answer": answer, "created_at": time.time(), "version": version
+            }
+            self._entries.move_to_end(question)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._counters["evictions"] += 1
+
+    def lookup(self, question: str) -> Optional[str]:
+        """유사한 이전 질문의 답변 조회"""
+        return self._find(self._normalize(self.embeddings.embed_query(question)))
+
+    async def alookup(self, question: str) -> Optional[str]:
+        """유사한 이전 질문의 답변 조회 (비동기)"""
+        return self._find(self._normalize(await self.embeddings.aembed_query(question)))
+
+    def store(self, question: str, answer: str) -> None:
+        """질문과 답변 저장"""
+        self._put(question, self._normalize(self.embeddings.embed_query(question)), answer)
+
+    async def astore(self, question: str, answer: str) -> None:
+        """질문과 답변 저장 (비동기)"""
+        self._put(question, self._normalize(await self.embeddings.aembed_query(question)), answer)
+
+    def record_bypass(self) -> None:
+        """캐시 적중했지만 개인화가 필요해 사용하지 않은 경우 기록 (적중 수와 별도로 집계)"""
+        with self._lock:
+            self._counters["bypasses"] += 1
+
+    def invalidate(self) -> None:
+        """모든 캐시 항목 삭제 (검색 컬렉션이 다시 적재된 경우)"""
+        with self._lock:
+            self._entries.clear()
+            self._counters["invalidations"] += 1
+
+    def stats(self) -> Dict[str, float]:
+        """캐시 적중률 통계 (hit_rate 는 유사 질문을 찾은 비율이며, bypasses 는 그중 사용하지 않은 수)"""
+        with self._lock:
+            lookups = self._counters["hits"] + self._counters["misses"]
+            return {
+                **self._counters,
+                "hit_rate": round(self._counters["hits"] / lookups, 4) if lookups else 0.0,
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+            }
@@ -1,13 +1,21 @@
-from typing import TypedDict, List
+import re
+import time
+from typing import TypedDict, List, Dict, Optional, Callable, Annotated
 from langchain_core.messages import BaseMessage, HumanMessage, AIMessage
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_openai import ChatOpenAI
 from langchain_core.documents import Document
+from langchain_core.runnables import RunnableLambda
+from pydantic import BaseModel, Field
 from langgraph.graph import StateGraph, END
-from langgraph.checkpoint.memory import MemorySaver
 
+from agents.checkpointer import BoundedMemorySaver
 from config import Config
 
+def merge_timings(left: Dict[str, float], right: Dict[str, float]) -> Dict[str, float]:
+    """병렬 노드의 실행 시간 기록 병합"""
+    return {**(left or {}), **(right or {})}
+
 class BaseRagState(TypedDict):
     """RAG 시스템 상태 정의"""
     messages: List[BaseMessage]
@@ -18,6 +26,25 @@ class BaseRagState(TypedDict):
     answer: str
     apple_watch_data: str
     context_type: str  # 'health_data', 'web_search', 'combined'
+    needs_apple_watch_data: bool
+    rewrite_count: int
+    answer_mode: str  # 'two_pass', 'single_pass'
+    user_id: str  # 웨어러블 데이터를 조회할 사용자 (없으면 샘플 파일 사용)
+    node_timings: Annotated[Dict[str, float], merge_timings]  # 노드별 실행 시간(ms)
+
+ANSWER_MODES = ("two_pass", "single_pass")
+
+class ExtractedFact(BaseModel):
+    """단일 호출 모드에서 추출된 건강 정보"""
+    info: str = Field(description="질문과 관련된 건강 정보")
+    relevance: float = Field(description="질문과의 관련성 점수 (0-1)")
+    faithfulness: float = Field(description="답변의 충실성 점수 (0-1)")
+
+class SinglePassAnswer(BaseModel):
+    """단일 호출 모드의 구조화 출력"""
+    extracted_facts: List[ExtractedFact] = Field(description="문서에서 추출한 건강 정보 3~5개")
+    answerability: float = Field(description="추출된 정보로 질문에 답변할 수 있는 정도 (0-1)")
+    answer: str = Field(description="사용자에게 전달할 최종 답변")
 
 class BaseAgent:
     """Health Agent 기본 클래스"""
@@ -31,6 +58,10 @@ class BaseAgent:
             temperature=0.7
         )
         
+        # 모든 요청이 공유하는 체크포인트 저장소와 컴파일된 그래프
+        self.checkpointer = BoundedMemorySaver(max_threads=self.config.CHECKPOINT_MAX_THREADS)
+        self._compiled_agent = None
+        
     def _get_extraction_prompt(self) -> str:
         """정보 추출용 시스템 프롬프트"""
         return """당신은 건강 전문가입니다. 주어진 문서에서 질문과 관련된 건강 정보를 3~5개 정도 추출하세요.
@@ -47,7 +78,8 @@ class BaseAgent:
         - 충실성 점수: [0-1 사이의 점수]
         ...
         
-        마지막으로, 추출된 정보를 종합하여 질문에 대한 전반적인 답변 가능성을 0에서 1 사이의 점수로 평가하세요."""
+        마지막으로, 추출된 정보를 종합하여 질문에 대한 전반적인 답변 가능성을 0에서 1 사이의 점수로 평가하세요.
+        - 답변 가능성 점수: [0-1 사이의 점수]"""
     
     def _get_rewrite_prompt(self) -> str:
         """쿼리 재작성용 시스템 프롬프트"""
@@ -73,7 +105,8 @@ class BaseAgent:
         3. [개선된 검색 쿼리 3]
         - 이유: [이 쿼리를 제안한 이유 설명]
 
-        마지막으로, 제안된 쿼리 중 가장 효과적일 것 같은 쿼리를 선택하고 그 이유를 설명하세요."""
+        마지막으로, 제안된 쿼리 중 가장 효과적일 것 같은 쿼리를 선택하고 그 이유를 설명하세요.
+        마지막 줄에는 선택한 쿼리를 "최종 쿼리: [선택한 쿼리]" 형식으로 작성하세요."""
     
     def _get_answer_prompt(self) -> str:
         """답변 생성용 시스템 프롬프트"""
@@ -89,44 +122,38 @@ class BaseAgent:
 
 답변은 자연스럽고 이해하기 쉽게 작성하되, 특정 형식에 구애받지 마세요. 질문에 가장 적합한 방식으로 자유롭게 답변하세요."""
 
-    def extract_info(self, state: BaseRagState) -> BaseRagState:
-        """문서에서 관련 정보 추출"""
-        if not state["documents"]:
-            state["extracted_info"] = "검색된 문서가 없습니다."
-            return state
-        
+    def _get_single_pass_prompt(self) -> str:
+        """정보 추출과 답변 생성을 한 번에 수행하는 시스템 프롬프트"""
+        return """당신은 건강 전문 상담사입니다. 주어진 질문과 검색된 건강 정보를 바탕으로 다음 두 가지를 한 번에 수행하세요.
+
+1. 문서에서 질문과 관련된 건강 정보를 3~5개 추출하고, 각각 질문과의 관련성과 답변의 충실성을 0에서 1 사이의 점수로 평가하세요.
+   추출된 정보를 종합하여 질문에 대한 전반적인 답변 가능성도 0에서 1 사이의 점수로 평가하세요.
+2. 추출한 정보를 바탕으로 최종 답변을 작성하세요.
+   - 질문에 직접적이고 명확하게 답변하세요
+   - Apple Watch 데이터가 제공된 경우 개인화된 조언을 포함하세요
+   - 의학적으로 정확하고 신뢰할 수 있는 정보를 제공하고, 필요시 출처를 명시하세요
+   - 심각한 건강 문제의 경우 의료진 상담을 권장하세요"""
+
+    def _build_extraction_messages(self, state: BaseRagState) -> List[BaseMessage]:
+        """정보 추출 프롬프트 메시지 구성"""
         doc_content = "\n\n".join([doc.page_content for doc in state["documents"]])
         
         prompt = ChatPromptTemplate.from_messages([
             ("system", self._get_extraction_prompt()),
             ("human", f"질문: {state['question']}\n\n문서 내용:\n{doc_content}")
         ])
-        
-        try:
-            response = self.llm.invoke(prompt.format_messages())
-            state["extracted_info"] = response.content
-        except Exception as e:
-            state["extracted_info"] = f"정보 추출 중 오류가 발생했습니다: {str(e)}"
-        
-        return state
+        return prompt.format_messages()
     
-    def rewrite_query(self, state: BaseRagState) -> BaseRagState:
-        """검색 쿼리 재작성"""
+    def _build_rewrite_messages(self, state: BaseRagState) -> List[BaseMessage]:
+        """쿼리 재작성 프롬프트 메시지 구성"""
         prompt = ChatPromptTemplate.from_messages([
             ("system", self._get_rewrite_prompt()),
             ("human", f"원래 질문: {state['question']}\n\n추출된 정보:\n{state['extracted_info']}")
         ])
-        
-        try:
-            response = self.llm.invoke(prompt.format_messages())
-            state["rewritten_query"] = response.content
-        except Exception as e:
-            state["rewritten_query"] = f"쿼리 재작성 중 오류가 발생했습니다: {str(e)}"
-        
-        return state
+        return prompt.format_messages()
     
-    def generate_answer(self, state: BaseRagState) -> BaseRagState:
-        """최종 답변 생성"""
+    def _build_answer_messages(self, state: BaseRagState) -> List[BaseMessage]:
+        """답변 생성 프롬프트 메시지 구성"""
         apple_watch_info = ""
         if state.get("apple_watch_data") and state["apple_watch_data"] != "":
             apple_watch_info = f"\nApple Watch 데이터:\n{state['apple_watch_data']}"
@@ -143,41 +170,235 @@ class BaseAgent:
 추출된 핵심 정보:
 {state.get('extracted_info', '추출된 정보가 없습니다.')}{apple_watch_info}""")
         ])
+        return prompt.format_messages()
+    
+    def _build_single_pass_messages(self, state: BaseRagState) -> List[BaseMessage]:
+        """단일 호출 모드 프롬프트 메시지 구성 (문서는 한 번만 전송)"""
+        apple_watch_info = ""
+        if state.get("apple_watch_data") and state["apple_watch_data"] != "":
+            apple_watch_info = f"\n\nApple Watch 데이터:\n{state['apple_watch_data']}"
+        
+        doc_info = "\n\n".join([doc.page_content for doc in state["documents"]]) if state["documents"] else "관련 문서가 없습니다."
+        
+        prompt = ChatPromptTemplate.from_messages([
+            ("system", self._get_single_pass_prompt()),
+            ("human", f"질문: {state['question']}\n\n검색된 건강 정보:\n{doc_info}{apple_watch_info}")
+        ])
+        return prompt.format_messages()
+    
+    @staticmethod
+    def _format_extracted_facts(result: SinglePassAnswer) -> str:
+        """구조화 출력을 추출 단계와 같은 텍스트 형식으로 변환"""
+        lines = []
+        for i, fact in enumerate(result.extracted_facts, 1):
+            lines.append(f"{i}. {fact.info}")
+            lines.append(f"- 관련성 점수: {fact.relevance}")
+            lines.append(f"- 충실성 점수: {fact.faithfulness}")
+        lines.append(f"- 답변 가능성 점수: {result.answerability}")
+        return "\n".join(lines)
+    
+    def _record_answer(self, state: BaseRagState, answer: str) -> None:
+        """생성된 답변과 대화 메시지를 상태에 기록"""
+        state["answer"] = answer
+        
+        if "messages" not in state:
+            state["messages"] = []
+        
+        state["messages"].extend([
+            HumanMessage(content=state["question"]),
+            AIMessage(content=state["answer"])
+        ])
+
+    def extract_info(self, state: BaseRagState) -> BaseRagState:
+        """문서에서 관련 정보 추출"""
+        if not state["documents"]:
+            state["extracted_info"] = "검색된 문서가 없습니다."
+            return state
         
         try:
-            response = self.llm.invoke(prompt.format_messages())
-            state["answer"] = response.content
-            
-            if "messages" not in state:
-                state["messages"] = []
-            
-            state["messages"].extend([
-                HumanMessage(content=state["question"]),
-                AIMessage(content=state["answer"])
-            ])
-            
+            response = self.llm.invoke(self._build_extraction_messages(state))
+            state["extracted_info"] = response.content
+        except Exception as e:
+            state["extracted_info"] = f"정보 추출 중 오류가 발생했습니다: {str(e)}"
+        
+        return state
+    
+    async def aextract_info(self, state: BaseRagState) -> BaseRagState:
+        """문서에서 관련 정보 추출 (비동기)"""
+        if not state["documents"]:
+            state["extracted_info"] = "검색된 문서가 없습니다."
+            return state
+        
+        try:
+            response = await self.llm.ainvoke(self._build_extraction_messages(state))
+            state["extracted_info"] = response.content
+        except Exception as e:
+            state["extracted_info"] = f"정보 추출 중 오류가 발생했습니다: {str(e)}"
+        
+        return state
+    
+    def extract_and_answer(self, state: BaseRagState) -> BaseRagState:
+        """정보 추출과 최종 답변을 한 번의 구조화 출력 호출로 생성"""
+        try:
+            result = self.llm.with_structured_output(SinglePassAnswer).invoke(
+                self._build_single_pass_messages(state)
+            )
+            state["extracted_info"] = self._format_extracted_facts(result)
+            self._record_answer(state, result.answer)
+        except Exception as e:
+            state["answer"] = f"답변 생성 중 오류가 발생했습니다: {str(e)}"
+        
+        return state
+    
+    async def aextract_and_answer(self, state: BaseRagState) -> BaseRagState:
+        """정보 추출과 최종 답변을 한 번의 구조화 출력 호출로 생성 (비동기)"""
+        try:
+            result = await self.llm.with_structured_output(SinglePassAnswer).ainvoke(
+                self._build_single_pass_messages(state)
+            )
+            state["extracted_info"] = self._format_extracted_facts(result)
+            self._record_answer(state, result.answer)
         except Exception as e:
             state["answer"] = f"답변 생성 중 오류가 발생했습니다: {str(e)}"
         
         return state
     
+    def _resolve_answer_mode(self, answer_mode: Optional[str] = None) -> str:
+        """요청별 답변 모드 결정 (지정하지 않으면 Config.ANSWER_MODE)"""
+        mode = answer_mode or self.config.ANSWER_MODE
+        if mode not in ANSWER_MODES:
+            raise ValueError(f"지원하지 않는 답변 모드입니다: {mode} (가능한 값: {', '.join(ANSWER_MODES)})")
+        return mode
+    
+    def _route_answer_mode(self, state: BaseRagState) -> str:
+        """답변 모드에 따라 2단계(추출 -> 생성) 또는 단일 호출 경로 선택 (그래프 실행 전 _resolve_answer_mode 로 검증된 값)"""
+        return state["answer_mode"]
+    
+    @staticmethod
+    def _parse_answerability(extracted_info: str) -> Optional[float]:
+        """추출 결과에서 전반적인 답변 가능성 점수 파싱 (없으면 None)"""
+        match = re.search(r"답변 가능성[^0-9]*([01](?:\.\d+)?)", extracted_info or "")
+        return float(match.group(1)) if match else None
+    
+    @staticmethod
+    def _parse_rewritten_query(content: str, fallback: str) -> str:
+        """재작성 응답에서 최종 검색 쿼리 추출"""
+        match = re.search(r"최종 쿼리\s*:\s*\[?(.+?)\]?\s*$", content, re.MULTILINE)
+        if match:
+            return match.group(1).strip()
+        match = re.search(r"^\s*1\.\s*\[?(.+?)\]?\s*$", content, re.MULTILINE)
+        return match.group(1).strip() if match else fallback
+    
+    def _route_after_extract(self, state: BaseRagState) -> str:
+        """답변 가능성 점수가 낮을 때만 쿼리 재작성 단계로 이동"""
+        if not self.config.QUERY_REWRITE_ENABLED:
+            return "generate"
+        if state.get("rewrite_count", 0) >= self.config.MAX_REWRITE_ATTEMPTS:
+            return "generate"
+        
+        score = self._parse_answerability(state.get("extracted_info", ""))
+        if score is not None and score < self.config.REWRITE_SCORE_THRESHOLD:
+            return "rewrite"
+        return "generate"
+    
+    def rewrite_query(self, state: BaseRagState) -> BaseRagState:
+        """검색 쿼리 재작성"""
+        try:
+            response = self.llm.invoke(self._build_rewrite_messages(state))
+            state["rewritten_query"] = self._parse_rewritten_query(response.content, state["question"])
+        except Exception as e:
+            print(f"쿼리 재작성 중 오류: {e}")
+            state["rewritten_query"] = state["question"]
+        
+        state["rewrite_count"] = state.get("rewrite_count", 0) + 1
+        return state
+    
+    async def arewrite_query(self, state: BaseRagState) -> BaseRagState:
+        """검색 쿼리 재작성 (비동기)"""
+        try:
+            response = await self.llm.ainvoke(self._build_rewrite_messages(state))
+            state["rewritten_query"] = self._parse_rewritten_query(response.content, state["question"])
+        except Exception as e:
+            print(f"쿼리 재작성 중 오류: {e}")
+            state["rewritten_query"] = state["question"]
+        
+        state["rewrite_count"] = state.get("rewrite_count", 0) + 1
+        return state
+    
+    def generate_answer(self, state: BaseRagState) -> BaseRagState:
+        """최종 답변 생성"""
+        try:
+            response = self.llm.invoke(self._build_answer_messages(state))
+            self._record_answer(state, response.content)
+        except Exception as e:
+            state["answer"] = f"답변 생성 중 오류가 발생했습니다: {str(e)}"
+        
+        return state
+    
+    async def agenerate_answer(self, state: BaseRagState) -> BaseRagState:
+        """최종 답변 생성 (비동기)"""
+        try:
+            response = await self.llm.ainvoke(self._build_answer_messages(state))
+            self._record_answer(state, response.content)
+        except Exception as e:
+            state["answer"] = f"답변 생성 중 오류가 발생했습니다: {str(e)}"
+        
+        return state
+    
+    @staticmethod
+    def _with_timing(result: Dict, name: str, start: float) -> Dict:
+        """노드 결과에 실행 시간(ms) 기록 추가"""
+        update = dict(result)
+        update["node_timings"] = {name: round((time.perf_counter() - start) * 1000, 1)}
+        return update
+    
+    def _node(self, name: str, func: Callable, afunc: Optional[Callable] = None) -> RunnableLambda:
+        """동기/비동기 구현을 모두 갖는 그래프 노드 생성
+        
+        invoke() 에서는 func, ainvoke() 에서는 afunc 가 실행되므로
+        비동기 실행 시 이벤트 루프를 막지 않습니다. 각 노드의 실행 시간은
+        node_timings 에 기록됩니다.
+        """
+        def timed(state):
+            start = time.perf_counter()
+            return self._with_timing(func(state), name, start)
+        
+        async def atimed(state):
+            start = time.perf_counter()
+            result = await afunc(state) if afunc else func(state)
+            return self._with_timing(result, name, start)
+        
+        return RunnableLambda(timed, afunc=atimed, name=name)
+    
     def create_agent(self) -> StateGraph:
         """LangGraph 기반 에이전트 생성"""
         workflow = StateGraph(BaseRagState)
         
         # 노드 추가
-        workflow.add_node("extract", self.extract_info)
-        workflow.add_node("rewrite", self.rewrite_query)
-        workflow.add_node("generate_response", self.generate_answer)
+        workflow.add_node("extract", self._node("extract", self.extract_info, self.aextract_info))
+        workflow.add_node("generate_response", self._node("generate_response", self.generate_answer, self.agenerate_answer))
+        workflow.add_node("extract_and_answer", self._node("extract_and_answer", self.extract_and_answer, self.aextract_and_answer))
         
         # 엣지 설정
-        workflow.set_entry_point("extract")
-        workflow.add_edge("extract", "rewrite")
-        workflow.add_edge("rewrite", "generate_response")
+        # 검색 단계가 없으므로 쿼리 재작성(rewrite)은 재검색이 가능한 하위 에이전트에서만 사용
+        workflow.set_conditional_entry_point(
+            self._route_answer_mode,
+            {
+                "two_pass": "extract",
+                "single_pass": "extract_and_answer"
+            }
+        )
+        workflow.add_edge("extract", "generate_response")
         workflow.add_edge("generate_response", END)
+        workflow.add_edge("extract_and_answer", END)
         
         # 메모리 체크포인트 설정
-        memory = MemorySaver()
-        app = workflow.compile(checkpointer=memory)
+        app = workflow.compile(checkpointer=self.checkpointer)
         
-        return app 
\ No newline at end of file
+        return app
+    
+    def get_agent(self):
+        """컴파일된 에이전트 반환 (프로세스당 한 번만 컴파일)"""
+        if self._compiled_agent is None:
+            self._compiled_agent = self.create_agent()
+        return self._compiled_agent 
\ No newline at end of file
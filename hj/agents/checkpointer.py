@@ -0,0 +1,48 @@
+import threading
+from collections import OrderedDict
+
+from langgraph.checkpoint.memory import MemorySaver
+
+class BoundedMemorySaver(MemorySaver):
+    """thread_id 수를 제한하는 메모리 체크포인트 저장소
+
+    컴파일된 그래프 하나를 모든 요청이 공유하므로, 대화 스레드가 계속 쌓이지 않도록
+    가장 오래 사용되지 않은 스레드부터 공개 API 인 delete_thread 로 삭제합니다 (LRU).
+    MemorySaver 자체는 스레드 안전하지 않으므로 쓰기와 삭제는 하나의 lock 으로 직렬화합니다.
+    """
+
+    def __init__(self, max_threads: int = 1000, **kwargs):
+        super().__init__(**kwargs)
+        self.max_threads = max_threads
+        self._thread_order = OrderedDict()
+        self._lock = threading.RLock()
+
+    def _touch(self, config) -> None:
+        """스레드 사용 기록 갱신 및 초과분 삭제 (lock 안에서 호출)"""
+        thread_id = config["configurable"]["thread_id"]
+        self._thread_order[thread_id] = None
+        self._thread_order.move_to_end(thread_id)
+        while len(self._thread_order) > self.max_threads:
+            oldest, _ = self._thread_order.popitem(last=False)
+            super().delete_thread(oldest)
+
+    def put(self, config, checkpoint, metadata, new_versions):
+        with self._lock:
+            result = super().put(config, checkpoint, metadata, new_versions)
+            self._touch(config)
+        return result
+
+    def put_writes(self, config, writes, task_id, task_path=""):
+        with self._lock:
+            super().put_writes(config, writes, task_id, task_path)
+
+    def delete_thread(self, thread_id: str) -> None:
+        with self._lock:
+            self._thread_order.pop(thread_id, None)
+            super().delete_thread(thread_id)
+
+    @property
+    def thread_count(self) -> int:
+        """현재 저장된 스레드 수"""
+        with self._lock:
+            return len(self._thread_order)
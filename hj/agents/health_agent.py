@@ -1,11 +1,35 @@
-from typing import List, Dict, Any
+import asyncio
+import logging
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from datetime import timedelta
+from typing import List, Dict, Any, AsyncIterator, Awaitable, Optional
 from langchain_core.documents import Document
+from langchain_core.messages import AIMessageChunk
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_openai import ChatOpenAI
 
+from agents.answer_cache import SemanticAnswerCache
 from agents.base_agent import BaseAgent, BaseRagState
-from tools.search_tools import health_search, web_search
-from utils.user_data_parser import parse_apple_watch_data
+from agents.watch_need_classifier import WatchNeedClassifier
+from database.wearable_ingest import WearableIngestBuffer
+from database.wearable_store import WearableStore
+from tools.search_tools import health_search, web_search, db_manager, document_relevance, fallback_document, is_fallback
+from utils.rolling_stats import RollingAggregator
+from utils.user_data_parser import parse_apple_watch_data, format_watch_summary, load_wearable_data
+
+logger = logging.getLogger(__name__)
+
+# 검색 소스별 로그 이름
+SEARCH_SOURCE_LABELS = {"health": "건강 데이터 검색", "web": "웹 검색"}
+
+# 수집된 웨어러블 데이터가 없는 사용자에게 전달하는 컨텍스트
+NO_WATCH_DATA_MESSAGE = (
+    "## Apple Watch 데이터 없음\n\n"
+    "- 사용자 ID: {user_id}\n"
+    "- 최근 {hours}시간 동안 수집된 Apple Watch 데이터가 없습니다. "
+    "개인 측정값을 추정하지 말고, 데이터를 동기화하면 더 정확한 답변이 가능하다고 안내하세요.\n"
+)
 
 class HealthAgent(BaseAgent):
     """건강 정보 전문 에이전트 - Apple Watch 데이터와 RAG 검색을 결합한 개인화된 건강 조언 제공"""
@@ -13,14 +37,56 @@ class HealthAgent(BaseAgent):
     def __init__(self):
         super().__init__(agent_type="health")
         self.apple_watch_file = "apple_watch_sample_30min.json"
+        
+        # 사용자별 웨어러블 데이터 저장소, 증분 집계기, 수집 버퍼
+        self.wearable_store = WearableStore(self.config.WEARABLE_DATA_DIR)
+        self.wearable_stats = RollingAggregator()
+        self.wearable_buffer = WearableIngestBuffer(
+            self.wearable_store,
+            flush_size=self.config.WEARABLE_FLUSH_SIZE,
+            flush_interval=self.config.WEARABLE_FLUSH_INTERVAL_SECONDS,
+            aggregator=self.wearable_stats
+        )
         self.judgment_llm = ChatOpenAI(
             api_key=self.config.OPENAI_API_KEY,
             model=self.config.LLM_MODEL,
             temperature=0.1
         )
+        # 규칙 기반으로 먼저 판단하고 애매한 질문만 judgment_llm 호출
+        self.watch_need_classifier = WatchNeedClassifier(
+            threshold=self.config.WATCH_NEED_CONFIDENCE_THRESHOLD,
+            cache_size=self.config.WATCH_NEED_CACHE_SIZE,
+            local_enabled=self.config.WATCH_NEED_LOCAL_ENABLED
+        )
+        
+        # 건강 문서 검색과 웹 검색을 동시에 실행하기 위한 스레드 풀 (동기 그래프용)
+        self._search_executor = ThreadPoolExecutor(
+            max_workers=self.config.SEARCH_MAX_WORKERS, thread_name_prefix="search"
+        )
+        self._retrieval_lock = threading.Lock()
+        self._retrieval_counters = {
+            "local_only": 0, "web_used": 0, "web_cancelled": 0, "health_timeouts": 0, "web_timeouts": 0
+        }
+        
+        # 의미 기반 답변 캐시 (health_data 컬렉션이 다시 적재되면 비움, 다른 프로세스의 적재는 버전으로 감지)
+        self.answer_cache = None
+        if self.config.ANSWER_CACHE_ENABLED:
+            self.answer_cache = SemanticAnswerCache(
+                db_manager.embeddings_model,
+                threshold=self.config.ANSWER_CACHE_THRESHOLD,
+                ttl_seconds=self.config.ANSWER_CACHE_TTL_SECONDS,
+                max_entries=self.config.ANSWER_CACHE_MAX_ENTRIES,
+                version_provider=lambda: db_manager.collection_version("health_data")
+            )
+            db_manager.add_change_listener(self._on_collection_changed)
     
-    def _needs_apple_watch_data(self, question: str) -> bool:
-        """질문에 Apple Watch 데이터가 필요한지 판단"""
+    def _on_collection_changed(self, collection_name: str) -> None:
+        """검색 컬렉션이 바뀌면 캐시된 답변 무효화"""
+        if collection_name == "health_data" and self.answer_cache:
+            self.answer_cache.invalidate()
+    
+    def _build_watch_need_messages(self, question: str):
+        """Apple Watch 데이터 필요성 판단 프롬프트 메시지 구성"""
         prompt = ChatPromptTemplate.from_messages([
             ("system", """당신은 건강 상담 전문가입니다. 사용자의 질문을 분석하여 Apple Watch 데이터(심박수, 걸음 수, 활동량 등)가 답변에 도움이 될지 판단해주세요.
 
@@ -32,107 +98,281 @@ class HealthAgent(BaseAgent):
 답변은 반드시 "YES" 또는 "NO"로만 해주세요."""),
             ("human", f"질문: {question}")
         ])
-        
+        return prompt.format_messages()
+    
+    def _judge_watch_need(self, question: str) -> Optional[bool]:
+        """LLM으로 Apple Watch 데이터 필요성 판단 (오류 시 None)"""
         try:
-            response = self.judgment_llm.invoke(prompt.format_messages())
+            response = self.judgment_llm.invoke(self._build_watch_need_messages(question))
             return response.content.strip().upper() == "YES"
         except Exception as e:
             print(f"Apple Watch 데이터 필요성 판단 중 오류: {e}")
-            return False
+            return None
     
-    def _search_documents(self, state: BaseRagState) -> BaseRagState:
-        """건강 관련 문서 검색"""
-        query = state["question"]
-        documents = []
+    async def _ajudge_watch_need(self, question: str) -> Optional[bool]:
+        """LLM으로 Apple Watch 데이터 필요성 판단 (비동기, 오류 시 None)"""
+        try:
+            response = await self.judgment_llm.ainvoke(self._build_watch_need_messages(question))
+            return response.content.strip().upper() == "YES"
+        except Exception as e:
+            print(f"Apple Watch 데이터 필요성 판단 중 오류: {e}")
+            return None
+    
+    def _needs_apple_watch_data(self, question: str) -> bool:
+        """질문에 Apple Watch 데이터가 필요한지 판단 (로컬 분류기 -> 필요시 LLM)"""
+        return self.watch_need_classifier.decide(question, self._judge_watch_need)
+    
+    async def _aneeds_apple_watch_data(self, question: str) -> bool:
+        """질문에 Apple Watch 데이터가 필요한지 판단 (비동기)"""
+        return await self.watch_need_classifier.adecide(question, self._ajudge_watch_need)
+    
+    # 아래 세 노드는 병렬로 실행되므로 전체 상태 대신 자신이 쓰는 키만 반환합니다.
+    def _check_watch_need(self, state: BaseRagState) -> Dict[str, Any]:
+        """Apple Watch 데이터 필요성 확인"""
+        return {"needs_apple_watch_data": self._needs_apple_watch_data(state["question"])}
+    
+    async def _acheck_watch_need(self, state: BaseRagState) -> Dict[str, Any]:
+        """Apple Watch 데이터 필요성 확인 (비동기)"""
+        return {"needs_apple_watch_data": await self._aneeds_apple_watch_data(state["question"])}
+    
+    def _count_retrieval(self, name: str) -> None:
+        with self._retrieval_lock:
+            self._retrieval_counters[name] += 1
+    
+    def retrieval_stats(self) -> Dict[str, int]:
+        """검색 단계 지표 (로컬 결과만 사용, 웹 검색 사용/취소, 소스별 시간 초과 횟수)"""
+        with self._retrieval_lock:
+            return dict(self._retrieval_counters)
+    
+    def _is_local_sufficient(self, health_docs: List[Document]) -> bool:
+        """건강 문서 검색 결과의 최고 유사도가 LOCAL_SCORE_THRESHOLD 이상인지 확인"""
+        scores = [score for score in map(document_relevance, health_docs) if score is not None]
+        return bool(scores) and max(scores) >= self.config.LOCAL_SCORE_THRESHOLD
+    
+    def _combine_results(self, health_docs: List[Document], web_docs: List[Document]) -> Dict[str, Any]:
+        """유사도가 낮은 건강 문서와 웹 검색 결과를 합침 (검색 결과가 아닌 안내 문서는 제외)"""
+        local_hits = [doc for doc in health_docs if not is_fallback(doc)]
+        if web_docs:
+            self._count_retrieval("web_used")
+            return {"documents": local_hits + web_docs, "context_type": "web_search"}
+        return {"documents": local_hits or health_docs, "context_type": "health_data"}
+    
+    def _search_timed_out(self, source: str, timeout: float) -> List[Document]:
+        print(f"{SEARCH_SOURCE_LABELS[source]} 시간 초과 ({timeout}초)")
+        self._count_retrieval(f"{source}_timeouts")
+        return []
+    
+    def _future_result(self, future: Future, timeout: float, source: str) -> List[Document]:
+        """검색 결과를 timeout 초까지 기다림 (시간 초과 시 빈 결과)"""
+        try:
+            return future.result(timeout=timeout)
+        except FutureTimeoutError:
+            return self._search_timed_out(source, timeout)
+    
+    async def _await_result(self, awaitable: Awaitable[List[Document]], timeout: float, source: str) -> List[Document]:
+        """검색 결과를 timeout 초까지 기다림 (시간 초과 시 빈 결과, 비동기)"""
+        try:
+            return await asyncio.wait_for(awaitable, timeout)
+        except asyncio.TimeoutError:
+            return self._search_timed_out(source, timeout)
+    
+    def _retrieve(self, query: str) -> Dict[str, Any]:
+        """건강 문서 검색과 웹 검색을 동시에 시작하고, 건강 문서의 유사도가 충분하면 웹 검색 결과는 사용하지 않음
+        
+        PARALLEL_WEB_SEARCH 가 꺼져 있으면 건강 문서 유사도가 낮을 때만 웹 검색을 시작합니다.
+        """
+        web_future = None
+        try:
+            if self.config.PARALLEL_WEB_SEARCH:
+                web_future = self._search_executor.submit(web_search.invoke, query)
+            health_future = self._search_executor.submit(health_search.invoke, query)
+            health_docs = self._future_result(health_future, self.config.HEALTH_SEARCH_TIMEOUT, "health")
+            
+            if self._is_local_sufficient(health_docs):
+                self._count_retrieval("local_only")
+                # 아직 시작하지 않은 웹 검색만 취소됨 (이미 실행 중이면 결과만 버림)
+                if web_future is not None and web_future.cancel():
+                    self._count_retrieval("web_cancelled")
+                return {"documents": health_docs, "context_type": "health_data"}
+            
+            if web_future is None:
+                web_future = self._search_executor.submit(web_search.invoke, query)
+            web_docs = self._future_result(web_future, self.config.WEB_SEARCH_TIMEOUT, "web")
+            return self._combine_results(health_docs, web_docs)
         
+        except Exception as e:
+            print(f"문서 검색 중 오류: {e}")
+            return {
+                "documents": [fallback_document(f"문서 검색 중 오류가 발생했습니다: {str(e)}")],
+                "context_type": "error"
+            }
+    
+    async def _aretrieve(self, query: str) -> Dict[str, Any]:
+        """건강 문서 검색과 웹 검색을 동시에 시작하고, 건강 문서의 유사도가 충분하면 웹 검색 취소 (비동기)"""
+        web_task = None
         try:
-            health_docs = health_search.invoke(query)
-            documents.extend(health_docs)
+            if self.config.PARALLEL_WEB_SEARCH:
+                web_task = asyncio.create_task(
+                    self._await_result(web_search.ainvoke(query), self.config.WEB_SEARCH_TIMEOUT, "web")
+                )
+            health_docs = await self._await_result(
+                health_search.ainvoke(query), self.config.HEALTH_SEARCH_TIMEOUT, "health"
+            )
             
-            if len(health_docs) == 0 or "관련 건강 정보를 찾을 수 없습니다" in health_docs[0].page_content:
-                web_docs = web_search.invoke(query)
-                documents.extend(web_docs)
-                state["context_type"] = "web_search"
+            if self._is_local_sufficient(health_docs):
+                self._count_retrieval("local_only")
+                if web_task is not None and web_task.cancel():
+                    self._count_retrieval("web_cancelled")
+                return {"documents": health_docs, "context_type": "health_data"}
+            
+            if web_task is None:
+                web_docs = await self._await_result(
+                    web_search.ainvoke(query), self.config.WEB_SEARCH_TIMEOUT, "web"
+                )
             else:
-                state["context_type"] = "health_data"
-                
+                web_docs = await web_task
+            return self._combine_results(health_docs, web_docs)
+        
         except Exception as e:
+            if web_task is not None and not web_task.done():
+                web_task.cancel()
             print(f"문서 검색 중 오류: {e}")
-            documents = [Document(page_content=f"문서 검색 중 오류가 발생했습니다: {str(e)}")]
-            state["context_type"] = "error"
+            return {
+                "documents": [fallback_document(f"문서 검색 중 오류가 발생했습니다: {str(e)}")],
+                "context_type": "error"
+            }
+    
+    def _search_documents(self, state: BaseRagState) -> Dict[str, Any]:
+        """건강 관련 문서 검색"""
+        return self._retrieve(state["question"])
+    
+    async def _asearch_documents(self, state: BaseRagState) -> Dict[str, Any]:
+        """건강 관련 문서 검색 (비동기)"""
+        return await self._aretrieve(state["question"])
+    
+    def _research_documents(self, state: BaseRagState) -> Dict[str, Any]:
+        """재작성된 쿼리로 문서 재검색"""
+        return self._retrieve(state.get("rewritten_query") or state["question"])
+    
+    async def _aresearch_documents(self, state: BaseRagState) -> Dict[str, Any]:
+        """재작성된 쿼리로 문서 재검색 (비동기)"""
+        return await self._aretrieve(state.get("rewritten_query") or state["question"])
+    
+    def _load_user_watch_data(self, user_id: str) -> str:
+        """사용자의 최근 WEARABLE_LOOKBACK_HOURS 시간 데이터를 저장소에서 로드
+        
+        수집된 샘플이 없으면 샘플 파일로 대신하지 않고 데이터가 없다는 컨텍스트를 반환합니다.
+        """
+        hours = self.config.WEARABLE_LOOKBACK_HOURS
+        try:
+            WearableStore.validate_user_id(user_id)
+        except ValueError:
+            # 검증되지 않은 값은 프롬프트에 그대로 넣지 않음
+            return NO_WATCH_DATA_MESSAGE.format(user_id="(유효하지 않은 ID)", hours=f"{hours:g}")
+        # 아직 버퍼에 남아 있는 샘플까지 반영
+        self.wearable_buffer.flush(user_id)
+        window = timedelta(hours=hours)
+        
+        if window > self.wearable_stats.hour_retention:
+            # 증분 집계 보관 기간보다 긴 구간은 해당 기간의 날짜 파티션만 저장소에서 읽어 계산
+            latest = self.wearable_store.latest_timestamp(user_id)
+            result = load_wearable_data(self.wearable_store, user_id, latest - window, latest) if latest else None
+            if not result or not result["summary"]:
+                return NO_WATCH_DATA_MESSAGE.format(user_id=user_id, hours=f"{hours:g}")
+            return result["text"]
         
-        state["documents"] = documents
-        return state
+        # 증분 집계 결과만 사용하므로 원본 데이터를 다시 읽지 않음
+        self.wearable_stats.ensure_warm(self.wearable_store, user_id)
+        summary = self.wearable_stats.summary(user_id, window)
+        if not summary:
+            return NO_WATCH_DATA_MESSAGE.format(user_id=user_id, hours=f"{hours:g}")
+        return format_watch_summary(summary, self.wearable_stats.activity_periods(user_id, window))
     
-    def _load_watch_data(self, state: BaseRagState) -> BaseRagState:
-        """Apple Watch 데이터 로드"""
+    def _load_watch_data(self, state: BaseRagState) -> Dict[str, Any]:
+        """Apple Watch 데이터 로드 (필요하다고 판단된 질문만)
+        
+        user_id 가 있으면 해당 사용자의 수집 데이터만 사용하고 (없으면 데이터 없음 안내),
+        user_id 가 없을 때만 샘플 파일을 사용합니다. 필요 없는 질문은 버퍼 flush 나
+        저장소 조회 없이 바로 넘어갑니다.
+        """
+        if not state.get("needs_apple_watch_data"):
+            return {"apple_watch_data": ""}
         try:
-            apple_watch_data = parse_apple_watch_data(self.apple_watch_file)
-            state["apple_watch_data"] = apple_watch_data
+            if state.get("user_id"):
+                apple_watch_data = self._load_user_watch_data(state["user_id"])
+            else:
+                apple_watch_data = parse_apple_watch_data(self.apple_watch_file)
         except Exception as e:
             print(f"Apple Watch 데이터 로드 중 오류: {e}")
-            state["apple_watch_data"] = f"Apple Watch 데이터를 로드할 수 없습니다: {str(e)}"
+            apple_watch_data = f"Apple Watch 데이터를 로드할 수 없습니다: {str(e)}"
         
-        return state
-    
-    def _skip_watch_data(self, state: BaseRagState) -> BaseRagState:
-        """Apple Watch 데이터 건너뛰기"""
-        state["apple_watch_data"] = ""
-        return state
+        return {"apple_watch_data": apple_watch_data}
     
-    def _check_watch_need(self, state: BaseRagState) -> BaseRagState:
-        """Apple Watch 데이터 필요성 확인"""
-        return state
+    async def _aload_watch_data(self, state: BaseRagState) -> Dict[str, Any]:
+        """Apple Watch 데이터 로드 (비동기, 파일 I/O는 스레드에서 수행)"""
+        if not state.get("needs_apple_watch_data"):
+            return {"apple_watch_data": ""}
+        return await asyncio.to_thread(self._load_watch_data, state)
     
-    def _route_watch_decision(self, state: BaseRagState) -> str:
-        """Apple Watch 데이터 로드 여부 결정"""
-        if self._needs_apple_watch_data(state["question"]):
-            return "load_data"
-        else:
-            return "skip_data"
+    def _merge_context(self, state: BaseRagState) -> Dict[str, Any]:
+        """Apple Watch 데이터 경로와 문서 검색 경로의 합류 지점"""
+        return {}
     
     def create_agent(self):
-        """건강 전문 에이전트 생성"""
-        from langgraph.graph import StateGraph, END
+        """건강 전문 에이전트 생성
+        
+        문서 검색은 필요성 판단과 독립적이므로 동시에 실행하고, Apple Watch 데이터는
+        필요성 판단 결과가 YES 인 경우에만 로드한 뒤 merge_context 에서 합류합니다. 쿼리 재작성은
+        QUERY_REWRITE_ENABLED 일 때 답변 가능성 점수가 낮은 경우에만 재검색으로 이어집니다.
+        """
+        from langgraph.graph import StateGraph, START, END
         
         workflow = StateGraph(BaseRagState)
         
-        workflow.add_node("check_apple_watch_need", self._check_watch_need)
-        workflow.add_node("load_watch_data", self._load_watch_data)
-        workflow.add_node("skip_apple_watch_data", self._skip_watch_data)
-        workflow.add_node("retrieve", self._search_documents)
-        workflow.add_node("extract", self.extract_info)
-        workflow.add_node("rewrite", self.rewrite_query)
-        workflow.add_node("generate_response", self.generate_answer)
+        workflow.add_node("check_apple_watch_need", self._node("check_apple_watch_need", self._check_watch_need, self._acheck_watch_need))
+        workflow.add_node("load_watch_data", self._node("load_watch_data", self._load_watch_data, self._aload_watch_data))
+        workflow.add_node("retrieve", self._node("retrieve", self._search_documents, self._asearch_documents))
+        workflow.add_node("merge_context", self._node("merge_context", self._merge_context))
+        workflow.add_node("extract", self._node("extract", self.extract_info, self.aextract_info))
+        workflow.add_node("rewrite", self._node("rewrite", self.rewrite_query, self.arewrite_query))
+        workflow.add_node("re_retrieve", self._node("re_retrieve", self._research_documents, self._aresearch_documents))
+        workflow.add_node("generate_response", self._node("generate_response", self.generate_answer, self.agenerate_answer))
+        workflow.add_node("extract_and_answer", self._node("extract_and_answer", self.extract_and_answer, self.aextract_and_answer))
         
-        workflow.set_entry_point("check_apple_watch_need")
+        workflow.add_edge(START, "check_apple_watch_need")
+        workflow.add_edge(START, "retrieve")
+        workflow.add_edge("check_apple_watch_need", "load_watch_data")
+        workflow.add_edge(["load_watch_data", "retrieve"], "merge_context")
         workflow.add_conditional_edges(
-            "check_apple_watch_need",
-            self._route_watch_decision,
+            "merge_context",
+            self._route_answer_mode,
             {
-                "load_data": "load_watch_data",
-                "skip_data": "skip_apple_watch_data"
+                "two_pass": "extract",
+                "single_pass": "extract_and_answer"
             }
         )
-        workflow.add_edge("load_watch_data", "retrieve")
-        workflow.add_edge("skip_apple_watch_data", "retrieve")
-        workflow.add_edge("retrieve", "extract")
-        workflow.add_edge("extract", "rewrite")
-        workflow.add_edge("rewrite", "generate_response")
+        workflow.add_conditional_edges(
+            "extract",
+            self._route_after_extract,
+            {
+                "rewrite": "rewrite",
+                "generate": "generate_response"
+            }
+        )
+        workflow.add_edge("rewrite", "re_retrieve")
+        workflow.add_edge("re_retrieve", "extract")
         workflow.add_edge("generate_response", END)
+        workflow.add_edge("extract_and_answer", END)
         
         # 메모리 체크포인트 설정
-        from langgraph.checkpoint.memory import MemorySaver
-        memory = MemorySaver()
-        app = workflow.compile(checkpointer=memory)
+        app = workflow.compile(checkpointer=self.checkpointer)
         
         return app
     
-    def process_query(self, question: str, thread_id: str = "default") -> str:
-        """질문 처리 및 답변 반환"""
-        agent = self.create_agent()
-        
-        initial_state = {
+    def _initial_state(self, question: str, answer_mode: Optional[str] = None,
+                       user_id: Optional[str] = None) -> Dict[str, Any]:
+        """그래프 초기 상태 생성"""
+        return {
             "question": question,
             "messages": [],
             "documents": [],
@@ -140,17 +380,171 @@ class HealthAgent(BaseAgent):
             "rewritten_query": "",
             "answer": "",
             "apple_watch_data": "",
-            "context_type": ""
+            "context_type": "",
+            "needs_apple_watch_data": False,
+            "rewrite_count": 0,
+            "answer_mode": self._resolve_answer_mode(answer_mode),
+            "user_id": user_id or "",
+            "node_timings": {}
         }
+    
+    def _log_timings(self, result: Dict[str, Any]) -> None:
+        """노드별 실행 시간 로깅"""
+        timings = result.get("node_timings") or {}
+        if timings:
+            logger.info("노드 실행 시간(ms): " + ", ".join(f"{node}={ms}" for node, ms in timings.items()))
+    
+    @staticmethod
+    def _is_cacheable(result: Dict[str, Any]) -> bool:
+        """개인화 데이터 없이 정상적으로 생성된 답변만 캐시"""
+        return bool(result.get("answer")) \
+            and not result.get("needs_apple_watch_data") \
+            and result.get("context_type") in ("health_data", "web_search")
+    
+    def _lookup_cached_answer(self, question: str) -> Optional[str]:
+        """유사 질문의 캐시된 답변 조회 (Apple Watch 데이터가 필요한 질문은 제외)"""
+        if not self.answer_cache:
+            return None
+        try:
+            answer = self.answer_cache.lookup(question)
+            if answer and self._needs_apple_watch_data(question):
+                self.answer_cache.record_bypass()
+                return None
+            return answer
+        except Exception as e:
+            print(f"답변 캐시 조회 중 오류: {e}")
+            return None
+    
+    async def _alookup_cached_answer(self, question: str) -> Optional[str]:
+        """유사 질문의 캐시된 답변 조회 (비동기)"""
+        if not self.answer_cache:
+            return None
+        try:
+            answer = await self.answer_cache.alookup(question)
+            if answer and await self._aneeds_apple_watch_data(question):
+                self.answer_cache.record_bypass()
+                return None
+            return answer
+        except Exception as e:
+            print(f"답변 캐시 조회 중 오류: {e}")
+            return None
+    
+    def _store_cached_answer(self, question: str, result: Dict[str, Any]) -> None:
+        if self.answer_cache and self._is_cacheable(result):
+            try:
+                self.answer_cache.store(question, result["answer"])
+            except Exception as e:
+                print(f"답변 캐시 저장 중 오류: {e}")
+    
+    async def _astore_cached_answer(self, question: str, result: Dict[str, Any]) -> None:
+        if self.answer_cache and self._is_cacheable(result):
+            try:
+                await self.answer_cache.astore(question, result["answer"])
+            except Exception as e:
+                print(f"답변 캐시 저장 중 오류: {e}")
+    
+    def process_query(self, question: str, thread_id: str = "default", answer_mode: Optional[str] = None,
+                      user_id: Optional[str] = None) -> str:
+        """질문 처리 및 답변 반환"""
+        config = {"configurable": {"thread_id": thread_id}}
         
+        try:
+            # 답변 모드 검증 실패도 다른 오류와 같이 처리 (캐시 조회 전에 검증)
+            initial_state = self._initial_state(question, answer_mode, user_id)
+            cached_answer = self._lookup_cached_answer(question)
+            if cached_answer:
+                return cached_answer
+            
+            result = self.get_agent().invoke(initial_state, config=config)
+            self._log_timings(result)
+            self._store_cached_answer(question, result)
+            return result.get("answer", "답변을 생성할 수 없습니다.")
+        except Exception as e:
+            return f"질문 처리 중 오류가 발생했습니다: {str(e)}"
+    
+    async def aprocess_query(self, question: str, thread_id: str = "default", answer_mode: Optional[str] = None,
+                             user_id: Optional[str] = None) -> str:
+        """질문 처리 및 답변 반환 (비동기)"""
         config = {"configurable": {"thread_id": thread_id}}
         
         try:
-            result = agent.invoke(initial_state, config=config)
+            initial_state = self._initial_state(question, answer_mode, user_id)
+            cached_answer = await self._alookup_cached_answer(question)
+            if cached_answer:
+                return cached_answer
+            
+            result = await self.get_agent().ainvoke(initial_state, config=config)
+            self._log_timings(result)
+            await self._astore_cached_answer(question, result)
             return result.get("answer", "답변을 생성할 수 없습니다.")
         except Exception as e:
             return f"질문 처리 중 오류가 발생했습니다: {str(e)}"
 
+    async def astream_query(self, question: str, thread_id: str = "default", answer_mode: Optional[str] = None,
+                            user_id: Optional[str] = None) -> AsyncIterator[Dict[str, Any]]:
+        """질문을 처리하면서 진행 상황과 답변 토큰을 순서대로 반환
+        
+        반환 이벤트:
+            {"event": "progress", "node": 노드 이름}  - 그래프 노드 완료
+            {"event": "token", "content": 토큰}       - 최종 답변 토큰
+            {"event": "done", "answer": 전체 답변}     - 처리 완료
+            {"event": "error", "detail": 오류 메시지}   - 처리 실패 (이미 전달한 토큰은 버려야 하며 done 없이 종료)
+        """
+        try:
+            initial_state = self._initial_state(question, answer_mode, user_id)
+        except ValueError as e:
+            yield {"event": "error", "detail": f"질문 처리 중 오류가 발생했습니다: {str(e)}"}
+            return
+        
+        cached_answer = await self._alookup_cached_answer(question)
+        if cached_answer:
+            yield {"event": "progress", "node": "answer_cache"}
+            yield {"event": "token", "content": cached_answer}
+            yield {"event": "done", "answer": cached_answer}
+            return
+        
+        agent = self.get_agent()
+        config = {"configurable": {"thread_id": thread_id}}
+        answer = ""
+        streamed = False
+        final_state = {}
+        
+        try:
+            async for mode, chunk in agent.astream(
+                initial_state,
+                config=config,
+                stream_mode=["updates", "messages"]
+            ):
+                if mode == "messages":
+                    message, metadata = chunk
+                    # 최종 답변 노드의 LLM 토큰만 전달 (추출/재작성 토큰 제외)
+                    if isinstance(message, AIMessageChunk) and message.content \
+                            and metadata.get("langgraph_node") == "generate_response":
+                        streamed = True
+                        yield {"event": "token", "content": message.content}
+                    continue
+                
+                for node, update in chunk.items():
+                    update = update or {}
+                    final_state.update({k: v for k, v in update.items() if k != "node_timings"})
+                    if node in ("generate_response", "extract_and_answer"):
+                        answer = update.get("answer", "")
+                    event = {"event": "progress", "node": node}
+                    if node in update.get("node_timings", {}):
+                        event["elapsed_ms"] = update["node_timings"][node]
+                    yield event
+        except Exception as e:
+            # 일부 토큰이 전달된 뒤 실패했더라도 불완전한 답변은 저장/캐시하지 않음
+            print(f"스트리밍 질문 처리 중 오류: {e}")
+            yield {"event": "error", "detail": f"질문 처리 중 오류가 발생했습니다: {str(e)}"}
+            return
+        
+        # 단일 호출 모드(구조화 출력)는 토큰 단위로 스트리밍되지 않으므로 답변을 한 번에 전달
+        if not streamed and answer:
+            yield {"event": "token", "content": answer}
+        await self._astore_cached_answer(question, final_state)
+        yield {"event": "done", "answer": answer or "답변을 생성할 수 없습니다."}
+
 def create_health_agent():
     """건강 에이전트 인스턴스 생성"""
     return HealthAgent() 
\ No newline at end of file
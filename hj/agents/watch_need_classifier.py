@@ -0,0 +1,136 @@
+import re
+import threading
+import unicodedata
+from typing import Awaitable, Callable, Dict, Optional, Tuple
+
+from utils.cache import LRUCache
+
+# 개인을 가리키는 어절 (조사가 붙은 형태 포함, "제2형" 같은 단어와 구분하기 위해 어절 단위로 비교)
+PERSONAL_TOKENS = {
+    "내", "나", "나의", "내가", "나는", "나도", "나한테", "내꺼",
+    "제", "저", "저의", "제가", "저는", "저도", "저한테",
+    "my", "i", "me",
+}
+# 최근 시점 표현 (측정 데이터가 있는 기간)
+TIME_MARKERS = ("오늘", "어제", "이번주", "이번 주", "요즘", "최근", "방금", "아까", "지금", "아침에", "저녁에")
+# Apple Watch 로 측정되는 항목
+METRIC_TERMS = (
+    "심박", "맥박", "심장 박동", "심장박동", "bpm", "걸음", "만보", "보행", "활동량", "운동량",
+    "칼로리", "소모", "애플워치", "애플 워치", "워치", "heart rate", "step",
+)
+# 개인 기록에 대한 동작/평가 표현
+ACTIVITY_VERBS = ("걸었", "뛰었", "달렸", "운동했", "움직였", "측정", "기록")
+# 일반 정보 질문 표현
+GENERAL_PATTERNS = re.compile(
+    r"(이란|란\s*무엇|뭔가요|무엇인가요|무엇이|뭐야|정의|원인|증상|예방|치료|효능|부작용|"
+    r"음식|식단|정상\s*범위|평균|권장|기준|방법|좋은)"
+)
+# 개인 측정 데이터가 필요한 것이 확실한 표현
+STRONG_PATTERNS = re.compile(
+    r"((내|나의|제|저의)\s*(심박|맥박|걸음|활동량|운동량|칼로리)|"
+    r"(애플\s*워치|워치)\s*(데이터|기록|측정)|"
+    r"(오늘|어제|이번\s*주|방금|아까)\s*(몇\s*)?(걸음|걸었|뛰었|달렸|운동했))"
+)
+
+def normalize_question(question: str) -> str:
+    """캐시 키용 질문 정규화 (유니코드 정규화, 소문자, 공백 정리, 끝 문장부호 제거)"""
+    text = unicodedata.normalize("NFKC", question).lower()
+    text = re.sub(r"\s+", " ", text).strip()
+    return text.rstrip("?!.~ ")
+
+class WatchNeedClassifier:
+    """Apple Watch 데이터 필요성 로컬 분류기 (LLM fallback)
+
+    개인 지칭어, 시점 표현, 측정 항목 등의 규칙으로 YES/NO 와 신뢰도를 계산하고,
+    신뢰도가 threshold 미만일 때만 LLM 판단을 호출합니다. 최종 판단은 정규화된
+    질문 기준으로 캐시합니다.
+    """
+
+    def __init__(self, threshold: float = 0.8, cache_size: int = 2048, local_enabled: bool = True):
+        self.threshold = threshold
+        self.local_enabled = local_enabled
+        self._cache = LRUCache(max_size=cache_size)
+        self._lock = threading.Lock()
+        self._counters = {"local_yes": 0, "local_no": 0, "llm_fallback": 0, "llm_errors": 0, "cache_hits": 0}
+
+    @staticmethod
+    def classify(question: str) -> Tuple[bool, float]:
+        """규칙 기반 판단 (필요 여부, 신뢰도 0~1)"""
+        text = normalize_question(question)
+        tokens = set(re.findall(r"[0-9a-z가-힣]+", text))
+
+        if STRONG_PATTERNS.search(text):
+            return True, 0.95
+
+        personal = bool(tokens & PERSONAL_TOKENS)
+        recent = any(marker in text for marker in TIME_MARKERS)
+        metric = any(term in text for term in METRIC_TERMS)
+        activity = any(verb in text for verb in ACTIVITY_VERBS)
+        general = bool(GENERAL_PATTERNS.search(text))
+
+        if (personal or recent) and (metric or activity):
+            return True, 0.85 if not general else 0.6
+        if not personal and not recent and not metric and not activity:
+            return False, 0.9
+        if not personal and not recent and general:
+            # "심박수 정상 범위는?" 처럼 측정 항목에 대한 일반 정보 질문
+            return False, 0.85
+        # 개인 지칭만 있거나 측정 항목만 있는 애매한 질문
+        return personal or recent, 0.5
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self._counters[name] += 1
+
+    def _local_decision(self, key: str, question: str) -> Optional[bool]:
+        """캐시 또는 규칙으로 판단 (LLM 이 필요하면 None)"""
+        cached = self._cache.get(key)
+        if cached is not None:
+            self._count("cache_hits")
+            return cached
+
+        if self.local_enabled:
+            decision, confidence = self.classify(question)
+            if confidence >= self.threshold:
+                self._count("local_yes" if decision else "local_no")
+                self._cache.set(key, decision)
+                return decision
+        return None
+
+    def _record_llm_decision(self, key: str, decision: Optional[bool]) -> bool:
+        self._count("llm_fallback")
+        if decision is None:
+            # LLM 오류는 캐시하지 않고 데이터 없이 진행
+            self._count("llm_errors")
+            return False
+        self._cache.set(key, decision)
+        return decision
+
+    def decide(self, question: str, llm_judge: Callable[[str], Optional[bool]]) -> bool:
+        """질문에 Apple Watch 데이터가 필요한지 판단
+
+        llm_judge: 신뢰도가 낮을 때 호출할 LLM 판단 함수 (오류 시 None 반환)
+        """
+        key = normalize_question(question)
+        decision = self._local_decision(key, question)
+        if decision is not None:
+            return decision
+        return self._record_llm_decision(key, llm_judge(question))
+
+    async def adecide(self, question: str, llm_judge: Callable[[str], Awaitable[Optional[bool]]]) -> bool:
+        """질문에 Apple Watch 데이터가 필요한지 판단 (비동기)"""
+        key = normalize_question(question)
+        decision = self._local_decision(key, question)
+        if decision is not None:
+            return decision
+        return self._record_llm_decision(key, await llm_judge(question))
+
+    def stats(self) -> Dict:
+        with self._lock:
+            counters = dict(self._counters)
+        decisions = counters["local_yes"] + counters["local_no"] + counters["llm_fallback"]
+        return {
+            **counters,
+            "fallback_rate": round(counters["llm_fallback"] / decisions, 4) if decisions else 0.0,
+            "cached_decisions": len(self._cache),
+        }
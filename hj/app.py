@@ -1,13 +1,18 @@
-from fastapi import FastAPI, HTTPException, Depends
+from fastapi import FastAPI, HTTPException, Depends, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Literal
 from contextlib import asynccontextmanager
 import os
+import json
+import asyncio
 import logging
 
 from agents.health_agent import create_health_agent, HealthAgent
-from database.chatdb_manager import ChatDBManager
+from database.chatdb_manager import AsyncChatDBManager
+from database.db import dispose_async_engine, get_pool_status
+from database.wearable_ingest import parse_json_samples, parse_ndjson_samples
 from config import Config
 
 # uvicorn app:app --host 127.0.0.1 --port 8000 --reload
@@ -23,11 +28,12 @@ logger = logging.getLogger(__name__)
 # =============================================================================
 health_agent = None
 chat_db = None
+wearable_flush_task = None
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """앱 생명주기 관리"""
-    global health_agent, chat_db
+    global health_agent, chat_db, wearable_flush_task
     
     try:
         # 설정 검증
@@ -39,9 +45,16 @@ async def lifespan(app: FastAPI):
         logger.info("Health Agent 초기화 중...")
         health_agent = create_health_agent()
         
+        # 그래프는 시작 시 한 번만 컴파일하여 모든 요청에서 재사용
+        health_agent.get_agent()
+        
         # 데이터베이스 초기화
         logger.info("데이터베이스 초기화 중...")
-        chat_db = ChatDBManager()
+        chat_db = AsyncChatDBManager()
+        await chat_db.initialize()
+        
+        # 웨어러블 샘플 버퍼 주기적 기록
+        wearable_flush_task = asyncio.create_task(health_agent.wearable_buffer.run_periodic_flush())
         
         logger.info("Health Agent API 시작 완료")
         
@@ -52,6 +65,11 @@ async def lifespan(app: FastAPI):
     yield
     
     # 정리 작업 (필요시)
+    if wearable_flush_task:
+        wearable_flush_task.cancel()
+    # 종료 전에 버퍼에 남은 웨어러블 샘플 기록
+    await asyncio.to_thread(health_agent.wearable_buffer.flush)
+    await dispose_async_engine()
     logger.info("Health Agent API 종료")
 
 app = FastAPI(
@@ -76,6 +94,11 @@ class ChatRequest(BaseModel):
     user_id: str
     question: str
     conversation_id: Optional[int] = None  
+    answer_mode: Optional[Literal["two_pass", "single_pass"]] = None  # 기본값: Config.ANSWER_MODE
+
+class WearableIngestResponse(BaseModel):
+    accepted: int
+    pending: int
 
 class ChatResponse(BaseModel):
     answer: str
@@ -99,6 +122,10 @@ class ConversationDetailResponse(BaseModel):
     updated_at: str
     messages: List[MessageResponse]
 
+def format_sse(event: str, data: Dict[str, Any]) -> str:
+    """Server-Sent Events 메시지 포맷팅"""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
 def get_health_agent():
     """Health Agent 의존성 주입"""
     if health_agent is None:
@@ -126,14 +153,62 @@ async def health_check():
         "status": "healthy",
         "health_agent_ready": health_agent is not None,
         "database_ready": chat_db is not None,
-        "database_url": Config().DATABASE_URL.split('@')[0] + "@***" if '@' in Config().DATABASE_URL else "***"
+        "database_url": Config().DATABASE_URL.split('@')[0] + "@***" if '@' in Config().DATABASE_URL else "***",
+        "database_pool": get_pool_status()
+    }
+
+@app.get("/metrics")
+async def metrics():
+    """캐시 등 성능 관련 지표 조회"""
+    from database.vectordb_manager import VectorDBManager
+    from tools.search_tools import web_client
+    return {
+        "embedding_cache": VectorDBManager().get_cache_stats(),
+        "answer_cache": health_agent.answer_cache.stats() if health_agent and health_agent.answer_cache else {},
+        "wearable_ingest": health_agent.wearable_buffer.stats() if health_agent else {},
+        "wearable_stats": health_agent.wearable_stats.stats() if health_agent else {},
+        "watch_need": health_agent.watch_need_classifier.stats() if health_agent else {},
+        "retrieval": health_agent.retrieval_stats() if health_agent else {},
+        "web_search": web_client.stats() if web_client else {},
+        "database_pool": get_pool_status()
     }
 
+@app.post("/wearables/{user_id}/samples", response_model=WearableIngestResponse)
+async def ingest_wearable_samples(
+    user_id: str,
+    request: Request,
+    agent: HealthAgent = Depends(get_health_agent)
+):
+    """웨어러블 샘플 일괄 수집
+    
+    - application/json: {"samples": [{"timestamp", "step_count", "heart_rate"}, ...]}
+    - application/x-ndjson: 한 줄에 샘플 하나
+    
+    timestamp 는 ISO8601 문자열 또는 epoch 초(숫자)입니다.
+    샘플은 메모리 버퍼에 쌓였다가 일정 개수 또는 주기마다 저장소에 일괄 기록됩니다.
+    """
+    body = await request.body()
+    content_type = request.headers.get("content-type", "").split(";")[0].strip()
+    
+    try:
+        if content_type in ("application/x-ndjson", "application/jsonl"):
+            samples = parse_ndjson_samples(body)
+        else:
+            samples = parse_json_samples(body)
+        accepted = await asyncio.to_thread(agent.wearable_buffer.add, user_id, samples)
+    except (ValueError, TypeError, KeyError) as e:
+        raise HTTPException(status_code=400, detail=f"잘못된 웨어러블 샘플입니다: {str(e)}")
+    except Exception as e:
+        logger.error(f"웨어러블 샘플 수집 중 오류: {e}")
+        raise HTTPException(status_code=500, detail="웨어러블 샘플 수집 중 오류가 발생했습니다")
+    
+    return WearableIngestResponse(accepted=accepted, pending=agent.wearable_buffer.pending_count)
+
 @app.post("/chat", response_model=ChatResponse)
 async def chat(
     request: ChatRequest,
     agent: HealthAgent = Depends(get_health_agent),
-    db: ChatDBManager = Depends(get_chat_db)
+    db: AsyncChatDBManager = Depends(get_chat_db)
 ):
     """채팅 API 엔드포인트"""
     try:
@@ -147,21 +222,23 @@ async def chat(
         else:
             # 새로운 대화 세션 생성
             conversation_title = request.question[:20] + "..." if len(request.question) > 20 else request.question
-            conversation_id = db.create_conversation(conversation_title)
+            conversation_id = await db.create_conversation(conversation_title)
             logger.info(f"새 대화 세션 생성: conversation_id={conversation_id}")
         
         # 사용자 메시지 저장
-        db.save_message(conversation_id, "user", request.question)
+        await db.save_message(conversation_id, "user", request.question)
         
         # Health Agent로 질문 처리
         thread_id = f"health_session_{conversation_id}"
-        answer = agent.process_query(
+        answer = await agent.aprocess_query(
             question=request.question,
-            thread_id=thread_id
+            thread_id=thread_id,
+            answer_mode=request.answer_mode,
+            user_id=request.user_id
         )
         
         # 응답 저장
-        db.save_message(conversation_id, "assistant", answer)
+        await db.save_message(conversation_id, "assistant", answer)
         
         logger.info(f"채팅 응답 완료: conversation_id={conversation_id}")
         
@@ -171,13 +248,87 @@ async def chat(
         logger.error(f"채팅 처리 중 오류: {e}")
         raise HTTPException(status_code=500, detail=f"채팅 처리 중 오류가 발생했습니다: {str(e)}")
 
+@app.post("/chat/stream")
+async def chat_stream(
+    request: ChatRequest,
+    http_request: Request,
+    agent: HealthAgent = Depends(get_health_agent),
+    db: AsyncChatDBManager = Depends(get_chat_db)
+):
+    """채팅 스트리밍 API 엔드포인트 (SSE)
+    
+    이벤트 순서: start -> progress(노드 완료마다) -> token(답변 토큰) -> done
+    답변 생성에 실패하면 done 대신 error 로 끝나며 응답은 저장되지 않습니다.
+    클라이언트 연결이 끊기면 그래프 실행(LLM 호출 포함)을 중단하고 응답을 저장하지 않습니다.
+    """
+    try:
+        logger.info(f"스트리밍 채팅 요청 수신: user_id={request.user_id}, question={request.question[:50]}...")
+        
+        if request.conversation_id:
+            conversation_id = request.conversation_id
+        else:
+            conversation_title = request.question[:20] + "..." if len(request.question) > 20 else request.question
+            conversation_id = await db.create_conversation(conversation_title)
+            logger.info(f"새 대화 세션 생성: conversation_id={conversation_id}")
+        
+        await db.save_message(conversation_id, "user", request.question)
+    except Exception as e:
+        logger.error(f"채팅 처리 중 오류: {e}")
+        raise HTTPException(status_code=500, detail=f"채팅 처리 중 오류가 발생했습니다: {str(e)}")
+    
+    async def event_stream():
+        yield format_sse("start", {"conversation_id": conversation_id})
+        
+        thread_id = f"health_session_{conversation_id}"
+        events = agent.astream_query(
+            question=request.question,
+            thread_id=thread_id,
+            answer_mode=request.answer_mode,
+            user_id=request.user_id
+        )
+        try:
+            async for event in events:
+                if await http_request.is_disconnected():
+                    logger.info(f"클라이언트 연결 종료로 스트리밍 중단: conversation_id={conversation_id}")
+                    return
+                if event["event"] == "progress":
+                    yield format_sse("progress", {k: v for k, v in event.items() if k != "event"})
+                elif event["event"] == "token":
+                    yield format_sse("token", {"content": event["content"]})
+                elif event["event"] == "error":
+                    # 답변 생성 실패: 이미 보낸 토큰은 클라이언트가 버리며 응답은 저장하지 않음
+                    logger.error(f"스트리밍 채팅 처리 실패: conversation_id={conversation_id}")
+                    yield format_sse("error", {"detail": event["detail"], "conversation_id": conversation_id})
+                elif event["event"] == "done":
+                    try:
+                        # 스트림 완료 시 응답 저장
+                        await db.save_message(conversation_id, "assistant", event["answer"])
+                        logger.info(f"스트리밍 채팅 응답 완료: conversation_id={conversation_id}")
+                    except Exception as e:
+                        logger.error(f"응답 저장 중 오류: {e}")
+                        yield format_sse("error", {"detail": "응답 저장 중 오류가 발생했습니다"})
+                    yield format_sse("done", {"answer": event["answer"], "conversation_id": conversation_id})
+        except asyncio.CancelledError:
+            # 서버가 연결 종료를 감지해 응답 작업을 취소한 경우 (그래프 실행도 함께 취소됨)
+            logger.info(f"스트리밍 취소: conversation_id={conversation_id}")
+            raise
+        finally:
+            # 중간에 빠져나온 경우 진행 중인 그래프 실행과 LLM 호출을 정리
+            await events.aclose()
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 @app.get("/conversations", response_model=List[ConversationResponse])
 async def get_conversations(
-    db: ChatDBManager = Depends(get_chat_db)
+    db: AsyncChatDBManager = Depends(get_chat_db)
 ):
     """모든 대화 세션 목록 조회"""
     try:
-        conversations = db.get_conversations()
+        conversations = await db.get_conversations()
         return [
             ConversationResponse(
                 id=conv[0],
@@ -194,12 +345,12 @@ async def get_conversations(
 @app.get("/conversations/{conversation_id}", response_model=ConversationDetailResponse)
 async def get_conversation_detail(
     conversation_id: int,
-    db: ChatDBManager = Depends(get_chat_db)
+    db: AsyncChatDBManager = Depends(get_chat_db)
 ):
     """특정 대화 세션의 상세 정보 조회"""
     try:
         # 대화 세션 정보 조회
-        conversations = db.get_conversations()
+        conversations = await db.get_conversations()
         conversation = None
         for conv in conversations:
             if conv[0] == conversation_id:
@@ -210,7 +361,7 @@ async def get_conversation_detail(
             raise HTTPException(status_code=404, detail="대화 세션을 찾을 수 없습니다")
         
         # 메시지 목록 조회
-        messages = db.get_messages(conversation_id)
+        messages = await db.get_messages(conversation_id)
         
         return ConversationDetailResponse(
             id=conversation[0],
@@ -235,11 +386,11 @@ async def get_conversation_detail(
 @app.delete("/conversations/{conversation_id}")
 async def delete_conversation(
     conversation_id: int,
-    db: ChatDBManager = Depends(get_chat_db)
+    db: AsyncChatDBManager = Depends(get_chat_db)
 ):
     """대화 세션 삭제"""
     try:
-        db.delete_conversation(conversation_id)
+        await db.delete_conversation(conversation_id)
         return {"message": f"대화 세션 {conversation_id}가 삭제되었습니다"}
     except Exception as e:
         logger.error(f"대화 세션 삭제 중 오류: {e}")
@@ -0,0 +1,91 @@
+"""활동 구간 탐지 벤치마크 (합성 30초 간격 데이터)
+
+벡터화된 AppleWatchDataParser.get_activity_periods 와 기존 iterrows 구현을
+같은 합성 데이터에서 비교하고, 구간 경계/걸음 수가 동일한지 확인합니다.
+
+실행: python -m benchmarks.bench_activity_periods --rows 1000000 --legacy-rows 100000
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from utils.user_data_parser import AppleWatchDataParser
+
+def make_trace(rows: int, seed: int = 42) -> pd.DataFrame:
+    """걷기/휴식이 번갈아 나타나는 합성 Apple Watch 데이터 생성"""
+    rng = np.random.default_rng(seed)
+    walking = rng.random(rows) < 0.6
+    step_increments = np.where(walking, rng.integers(0, 40, rows), 0)
+    return pd.DataFrame({
+        'timestamp': pd.date_range('2025-06-21', periods=rows, freq='30s'),
+        'step_count': np.cumsum(step_increments),
+        'heart_rate': rng.integers(60, 160, rows),
+    })
+
+def legacy_activity_periods(df: pd.DataFrame) -> list:
+    """기존 iterrows 기반 구현 (비교용, avg_hr 는 시작/종료 심박수 평균)"""
+    df = df.copy()
+    df['step_diff'] = df['step_count'].diff().fillna(0)
+    active_periods = []
+    current_period = None
+    for idx, row in df.iterrows():
+        if row['step_diff'] > 0:
+            if current_period is None:
+                current_period = {
+                    'start_time': row['timestamp'],
+                    'start_steps': row['step_count'],
+                    'start_hr': row['heart_rate']
+                }
+            current_period['end_time'] = row['timestamp']
+            current_period['end_steps'] = row['step_count']
+            current_period['end_hr'] = row['heart_rate']
+        else:
+            if current_period is not None:
+                duration = (current_period['end_time'] - current_period['start_time']).total_seconds() / 60
+                if duration >= 1:
+                    current_period['duration_minutes'] = round(duration, 1)
+                    current_period['steps_taken'] = current_period['end_steps'] - current_period['start_steps']
+                    current_period['avg_hr'] = round((current_period['start_hr'] + current_period['end_hr']) / 2, 1)
+                    active_periods.append(current_period)
+                current_period = None
+    return active_periods
+
+def vectorized_activity_periods(df: pd.DataFrame) -> list:
+    parser = AppleWatchDataParser("")
+    parser.data = {"data": []}
+    parser.df = df.copy()
+    return parser.get_activity_periods()
+
+def timed(func, df):
+    start = time.perf_counter()
+    result = func(df)
+    return result, time.perf_counter() - start
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--legacy-rows", type=int, default=100_000,
+                        help="iterrows 구현은 느리므로 일부 행만 비교")
+    args = parser.parse_args()
+
+    trace = make_trace(args.rows)
+    periods, elapsed = timed(vectorized_activity_periods, trace)
+    print(f"vectorized: {args.rows:,} rows -> {len(periods):,} periods in {elapsed:.2f}s")
+
+    sample = trace.iloc[:args.legacy_rows].reset_index(drop=True)
+    new_periods, new_elapsed = timed(vectorized_activity_periods, sample)
+    old_periods, old_elapsed = timed(legacy_activity_periods, sample)
+    print(f"legacy:     {args.legacy_rows:,} rows -> {len(old_periods):,} periods in {old_elapsed:.2f}s "
+          f"(vectorized {new_elapsed:.3f}s, {old_elapsed / new_elapsed:.0f}x)")
+
+    keys = ['start_time', 'start_steps', 'start_hr', 'end_time', 'end_steps', 'end_hr',
+            'duration_minutes', 'steps_taken']
+    identical = len(new_periods) == len(old_periods) and all(
+        all(new[k] == old[k] for k in keys) for new, old in zip(new_periods, old_periods)
+    )
+    print(f"identical periods (excluding avg_hr): {identical}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""답변 모드(two_pass / single_pass) 지연 시간 및 토큰 사용량 비교
+
+고정 질문 세트를 두 모드로 처리하여 요청당 지연 시간, LLM 호출 수, 프롬프트 토큰을 비교합니다.
+--live 옵션을 주면 실제 OpenAI 모델과 health_data 컬렉션을 사용하고 usage_metadata 로 토큰을 집계합니다.
+기본값은 가짜 LLM 이며, 이 경우 토큰 수는 프롬프트 문자 수로부터 추정합니다.
+
+실행: python -m benchmarks.bench_answer_modes [--live]
+"""
+import argparse
+import statistics
+import time
+
+from benchmarks.fakes import install_fakes, FakeChatModel
+from agents.health_agent import HealthAgent
+
+QUESTIONS = [
+    "혈당지수(GI)와 식이섬유의 관계는?",
+    "중강도 유산소 운동의 적정 심박수는?",
+    "등산 전 준비운동은 어떻게 하나요?",
+    "수면의 질을 높이는 생활습관은?",
+    "근력 운동은 일주일에 몇 번이 적당한가요?",
+]
+
+def estimate_tokens(chars: int) -> int:
+    """한국어 프롬프트 기준 대략적인 토큰 수 추정"""
+    return int(chars / 1.5)
+
+def run_mode(agent: HealthAgent, mode: str, live: bool) -> dict:
+    latencies = []
+    prompt_tokens = 0
+    calls = 0
+    for i, question in enumerate(QUESTIONS):
+        thread_id = f"bench_{mode}_{i}"
+        if live:
+            from langchain_core.callbacks import get_usage_metadata_callback
+            with get_usage_metadata_callback() as cb:
+                start = time.perf_counter()
+                agent.process_query(question, thread_id=thread_id, answer_mode=mode)
+                latencies.append(time.perf_counter() - start)
+            for usage in cb.usage_metadata.values():
+                prompt_tokens += usage.get("input_tokens", 0)
+        else:
+            start = time.perf_counter()
+            agent.process_query(question, thread_id=thread_id, answer_mode=mode)
+            latencies.append(time.perf_counter() - start)
+
+    if not live:
+        calls = agent.llm.calls
+        prompt_tokens = estimate_tokens(agent.llm.prompt_chars)
+    return {"latencies": latencies, "prompt_tokens": prompt_tokens, "calls": calls}
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--live", action="store_true", help="실제 OpenAI 모델 사용")
+    parser.add_argument("--llm-latency", type=float, default=0.5)
+    args = parser.parse_args()
+
+    agent = HealthAgent()
+    if not args.live:
+        install_fakes(agent, llm_latency=args.llm_latency)
+
+    for mode in ("two_pass", "single_pass"):
+        if not args.live:
+            agent.llm = FakeChatModel(latency=args.llm_latency)
+        stats = run_mode(agent, mode, args.live)
+        per_request = len(QUESTIONS)
+        calls = f"{stats['calls'] / per_request:.1f}" if stats["calls"] else "-"
+        print(f"{mode:<12} mean={statistics.mean(stats['latencies']):.2f}s "
+              f"p50={statistics.median(stats['latencies']):.2f}s "
+              f"prompt_tokens/request={stats['prompt_tokens'] / per_request:.0f} "
+              f"answer_llm_calls/request={calls}")
+
+if __name__ == "__main__":
+    main()
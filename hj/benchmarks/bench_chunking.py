@@ -0,0 +1,69 @@
+"""청크 분할 전후 답변 프롬프트 컨텍스트 크기 비교
+
+data/*.json 의 항목을 카테고리별로 이어 붙여 긴 문서를 만든 뒤, 청크 분할 여부에 따라
+샘플 질문마다 어휘 겹침 기준 상위 RERANK_TOP_N 개 문서를 골라
+extract/answer 프롬프트에 들어가는 문서 토큰 수를 비교합니다 (네트워크 호출 없음).
+
+실행: python -m benchmarks.bench_chunking --merge 5
+"""
+import argparse
+import json
+import os
+from collections import defaultdict
+
+from config import Config
+from database.compressors import LexicalOverlapReranker
+from utils.document_parser import DEFAULT_DATA_FILES, build_text_splitter, item_to_documents
+from utils.token_counter import get_token_counter
+
+QUESTIONS = [
+    "혈당지수(GI)가 낮은 음식은 무엇인가요?",
+    "유산소 운동과 무산소 운동의 차이는?",
+    "등산할 때 무릎 부상을 예방하는 방법",
+    "수면의 질을 높이는 생활 습관",
+    "근력 운동은 일주일에 몇 번이 적당한가요?",
+    "식이섬유를 많이 먹으면 좋은 점",
+]
+
+def long_items(merge: int):
+    """같은 카테고리 항목을 merge 개씩 이어 붙인 긴 항목 목록"""
+    items = []
+    for filename in DEFAULT_DATA_FILES:
+        with open(os.path.join(Config().DATA_DIR, filename), encoding="utf-8") as f:
+            data = json.load(f)
+        for i in range(0, len(data), merge):
+            group = data[i:i + merge]
+            items.append((filename, {
+                "id": f"{group[0]['id']}_merged",
+                "title": " / ".join(item["title"] for item in group),
+                "content": "\n\n".join(item["content"] for item in group),
+            }))
+    return items
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--merge", type=int, default=5, help="긴 문서 하나에 이어 붙일 항목 수")
+    args = parser.parse_args()
+
+    config = Config()
+    count_tokens = get_token_counter()
+    reranker = LexicalOverlapReranker(top_n=config.RERANK_TOP_N)
+    splitter = build_text_splitter(config.CHUNK_SIZE_TOKENS, config.CHUNK_OVERLAP_TOKENS)
+    items = long_items(args.merge)
+
+    corpora = {
+        "no chunking": [doc for filename, item in items for doc in item_to_documents(item, filename)],
+        f"chunked ({config.CHUNK_SIZE_TOKENS}/{config.CHUNK_OVERLAP_TOKENS})":
+            [doc for filename, item in items for doc in item_to_documents(item, filename, splitter)],
+    }
+    for label, documents in corpora.items():
+        doc_tokens = [count_tokens(doc.page_content) for doc in documents]
+        context_tokens = []
+        for question in QUESTIONS:
+            top = reranker.compress_documents(documents, question)
+            context_tokens.append(sum(count_tokens(doc.page_content) for doc in top))
+        print(f"{label:<20} docs={len(documents):<4} avg_doc_tokens={sum(doc_tokens) / len(doc_tokens):7.1f} "
+              f"context_tokens_per_chat={sum(context_tokens) / len(context_tokens):7.1f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""단일 워커 동시성 부하 테스트 (가짜 LLM 사용)
+
+동일한 이벤트 루프에서 N개의 채팅을 동시에 처리할 때
+동기 경로(process_query, 루프 블로킹)와 비동기 경로(aprocess_query)의
+총 소요 시간과 처리량을 비교하고, /chat 엔드포인트에도 동시 요청을 보냅니다.
+
+실행: python -m benchmarks.bench_concurrency --concurrency 20 --llm-latency 0.2
+"""
+import argparse
+import asyncio
+import time
+
+import httpx
+
+from benchmarks.fakes import install_fakes
+from agents.health_agent import HealthAgent
+from database.chatdb_manager import AsyncChatDBManager
+import app as app_module
+
+async def run_sync_path(agent: HealthAgent, concurrency: int) -> float:
+    async def chat(i: int):
+        # 기존 /chat 구현: async 라우트 안에서 동기 체인을 호출
+        return agent.process_query("혈당지수와 식이섬유의 관계는?", thread_id=f"sync_{i}")
+
+    start = time.perf_counter()
+    await asyncio.gather(*(chat(i) for i in range(concurrency)))
+    return time.perf_counter() - start
+
+async def run_async_path(agent: HealthAgent, concurrency: int) -> float:
+    start = time.perf_counter()
+    await asyncio.gather(*(
+        agent.aprocess_query("혈당지수와 식이섬유의 관계는?", thread_id=f"async_{i}")
+        for i in range(concurrency)
+    ))
+    return time.perf_counter() - start
+
+async def run_http(agent: HealthAgent, concurrency: int) -> float:
+    app_module.health_agent = agent
+    app_module.chat_db = AsyncChatDBManager()
+    await app_module.chat_db.initialize()
+
+    transport = httpx.ASGITransport(app=app_module.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        start = time.perf_counter()
+        responses = await asyncio.gather(*(
+            client.post("/chat", json={"user_id": f"user_{i}", "question": "혈당지수와 식이섬유의 관계는?"})
+            for i in range(concurrency)
+        ))
+        elapsed = time.perf_counter() - start
+    failed = [r for r in responses if r.status_code != 200]
+    if failed:
+        print(f"실패한 요청: {len(failed)}개 ({failed[0].text})")
+    return elapsed
+
+async def main_async(args):
+    agent = install_fakes(HealthAgent(), llm_latency=args.llm_latency, search_latency=args.search_latency)
+    agent.get_agent()
+
+    sync_elapsed = await run_sync_path(agent, args.concurrency)
+    async_elapsed = await run_async_path(agent, args.concurrency)
+    http_elapsed = await run_http(agent, args.concurrency)
+
+    for label, elapsed in (
+        ("sync process_query", sync_elapsed),
+        ("async aprocess_query", async_elapsed),
+        ("POST /chat (async)", http_elapsed),
+    ):
+        print(f"{label}: {args.concurrency} chats in {elapsed:.2f}s "
+              f"({args.concurrency / elapsed:.1f} chats/s)")
+    print(f"speedup: {sync_elapsed / async_elapsed:.1f}x")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--llm-latency", type=float, default=0.2)
+    parser.add_argument("--search-latency", type=float, default=0.05)
+    asyncio.run(main_async(parser.parse_args()))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""문서 로더 벤치마크: json.load 전체 로드 vs 스트리밍 / 프로세스 풀
+
+합성 JSON 배열 파일 여러 개를 임시 data 디렉터리에 만든 뒤,
+기존 방식(json.load 후 리스트 생성)과 iter_health_documents(순차/병렬)의
+처리 시간과 메인 프로세스 최대 메모리(tracemalloc)를 비교합니다.
+스트리밍은 문서를 소비만 하고 보관하지 않는 적재 파이프라인을 가정합니다.
+
+파싱이 가벼운 문서에서는 프로세스 간 전달 비용 때문에 병렬 로드가 더 느릴 수 있으므로
+DOCUMENT_LOADER_WORKERS 기본값(1)을 바꾸기 전에 실제 코퍼스로 확인하세요.
+
+실행: python -m benchmarks.bench_document_loader --files 4 --items 50000
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import shutil
+import tempfile
+import time
+import tracemalloc
+
+from utils.document_parser import item_to_document, iter_health_documents
+
+def write_corpus(directory: str, files: int, items: int):
+    names = []
+    for f in range(files):
+        name = f"synthetic_{f}.json"
+        with open(os.path.join(directory, name), "w", encoding="utf-8") as out:
+            out.write("[\n")
+            for i in range(items):
+                item = {"id": f"{f}_{i}", "title": f"합성 문서 {i}", "content": "건강한 생활 습관에 관한 설명입니다. " * 20}
+                out.write(("," if i else "") + json.dumps(item, ensure_ascii=False) + "\n")
+            out.write("]\n")
+        names.append(name)
+    return names
+
+def legacy_load(directory, names):
+    documents = []
+    for name in names:
+        with open(os.path.join(directory, name), encoding="utf-8") as f:
+            for item in json.load(f):
+                documents.append(item_to_document(item, name))
+    return len(documents)
+
+def streaming_load(directory, names, workers):
+    # 경로를 인자로 넘기므로 spawn 방식 워커에서도 같은 디렉터리를 읽음
+    return sum(1 for _ in iter_health_documents(names, workers=workers, chunking=False, data_dir=directory))
+
+def measure(label, func):
+    tracemalloc.start()
+    start = time.perf_counter()
+    count = func()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{label:<22} {count:>9,} docs in {elapsed:6.2f}s  peak {peak / 1024 / 1024:8.1f} MiB (main process)")
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--files", type=int, default=4)
+    parser.add_argument("--items", type=int, default=50000)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--start-method", choices=multiprocessing.get_all_start_methods(), default=None,
+                        help="워커 프로세스 시작 방식 (기본값: 플랫폼 기본)")
+    args = parser.parse_args()
+    if args.start_method:
+        multiprocessing.set_start_method(args.start_method)
+
+    directory = tempfile.mkdtemp(prefix="corpus_bench_")
+    try:
+        names = write_corpus(directory, args.files, args.items)
+        size = sum(os.path.getsize(os.path.join(directory, n)) for n in names) / 1024 / 1024
+        print(f"corpus: {args.files} files, {args.files * args.items:,} items, {size:.1f} MiB")
+        measure("json.load + list", lambda: legacy_load(directory, names))
+        measure("streaming, 1 process", lambda: streaming_load(directory, names, 1))
+        measure(f"streaming, {args.workers} processes", lambda: streaming_load(directory, names, args.workers))
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+if __name__ == "__main__":
+    main()
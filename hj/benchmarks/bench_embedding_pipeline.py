@@ -0,0 +1,77 @@
+"""문서 적재 임베딩 파이프라인 벤치마크 (가짜 임베딩 백엔드, 오프라인)
+
+요청당 지연과 일시적 오류를 흉내 내는 가짜 임베딩 모델로 EmbeddingPipeline 을
+동시 요청 수별로 실행하고, 임시 Chroma 컬렉션에 upsert 하는 전체 시간을 비교합니다.
+
+실행: python -m benchmarks.bench_embedding_pipeline --docs 2000 --latency 0.2 --workers 1 4 8
+"""
+import argparse
+import random
+import shutil
+import tempfile
+import threading
+import time
+
+from langchain_chroma import Chroma
+from langchain_core.documents import Document
+from langchain_core.embeddings import DeterministicFakeEmbedding
+
+from database.embedding_pipeline import EmbeddingPipeline
+
+class SlowFakeEmbedding(DeterministicFakeEmbedding):
+    """요청마다 latency 초 지연되고 failure_rate 확률로 실패하는 가짜 임베딩"""
+
+    latency: float = 0.2
+    failure_rate: float = 0.0
+    calls: int = 0
+    failures: int = 0
+
+    def embed_documents(self, texts):
+        time.sleep(self.latency)
+        with _counter_lock:
+            self.calls += 1
+            if random.random() < self.failure_rate:
+                self.failures += 1
+                raise RuntimeError("simulated rate limit")
+        return super().embed_documents(texts)
+
+_counter_lock = threading.Lock()
+
+def make_documents(count: int):
+    topics = ["혈당 관리", "유산소 운동", "수면 위생", "근력 운동", "식이섬유", "스트레스 관리"]
+    return [
+        Document(
+            page_content=f"제목: {topics[i % len(topics)]} {i}\n\n내용: " + f"{topics[i % len(topics)]}에 관한 설명 문장입니다. " * (5 + i % 20),
+            metadata={"id": f"bench_{i}", "category": "bench"},
+        )
+        for i in range(count)
+    ]
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--docs", type=int, default=2000)
+    parser.add_argument("--latency", type=float, default=0.2, help="임베딩 요청당 지연(초)")
+    parser.add_argument("--failure-rate", type=float, default=0.02)
+    parser.add_argument("--batch-tokens", type=int, default=8000)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 4, 8])
+    args = parser.parse_args()
+
+    documents = make_documents(args.docs)
+    ids = [doc.metadata["id"] for doc in documents]
+    for workers in args.workers:
+        persist_dir = tempfile.mkdtemp(prefix="embed_bench_")
+        try:
+            embeddings = SlowFakeEmbedding(size=256, latency=args.latency, failure_rate=args.failure_rate)
+            pipeline = EmbeddingPipeline(embeddings, max_batch_tokens=args.batch_tokens, max_workers=workers,
+                                         backoff_seconds=0.05, verbose=False)
+            db = Chroma(collection_name="bench", embedding_function=embeddings, persist_directory=persist_dir)
+            stats = pipeline.upsert(db, documents, ids)
+            print(f"workers={workers:<3} batches={len(pipeline.make_batches([d.page_content for d in documents])):<4} "
+                  f"calls={embeddings.calls:<4} retries={embeddings.failures:<3} "
+                  f"embed={stats['embed_seconds']:6.2f}s total={stats['total_seconds']:6.2f}s "
+                  f"({stats['docs_per_second']:,.0f} docs/s, stored={db._collection.count()})")
+        finally:
+            shutil.rmtree(persist_dir, ignore_errors=True)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+"""요청당 그래프 생성 비용 벤치마크
+
+매 요청마다 create_agent() 로 그래프를 새로 컴파일하던 방식과
+get_agent() 로 컴파일된 그래프를 재사용하는 방식의 요청당 오버헤드를 비교합니다.
+
+실행: python -m benchmarks.bench_graph_compile --requests 200
+"""
+import argparse
+import statistics
+import time
+
+from benchmarks.fakes import install_fakes
+from agents.health_agent import HealthAgent
+
+def run(agent: HealthAgent, requests: int, reuse: bool) -> list:
+    timings = []
+    for i in range(requests):
+        start = time.perf_counter()
+        graph = agent.get_agent() if reuse else agent.create_agent()
+        graph.invoke(
+            agent._initial_state("혈당지수와 식이섬유의 관계는?"),
+            config={"configurable": {"thread_id": f"bench_{i % 50}"}},
+        )
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=200)
+    args = parser.parse_args()
+
+    agent = install_fakes(HealthAgent())
+
+    for label, reuse in (("before (create_agent per request)", False), ("after (cached graph)", True)):
+        timings = run(agent, args.requests, reuse)
+        print(f"{label}: mean={statistics.mean(timings):.2f}ms "
+              f"p50={statistics.median(timings):.2f}ms "
+              f"p95={sorted(timings)[int(len(timings) * 0.95) - 1]:.2f}ms")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""병렬 그래프의 노드별 실행 시간 측정 (가짜 LLM 사용)
+
+retrieve 는 check_apple_watch_need 와 동시에 실행되고, load_watch_data 는
+필요성 판단이 YES 인 경우에만 판단 직후 실행됩니다. 따라서 fan-out 구간의 소요 시간은
+max(retrieve, check_apple_watch_need + load_watch_data) 입니다.
+
+규칙 기반 분류기가 확신하는 질문은 판단이 즉시 끝나므로 데이터 로드를 판단 뒤로 미뤄도
+지연이 거의 늘지 않고, 애매한 질문(LLM fallback)만 판단 지연만큼 로드가 늦어집니다.
+대신 일반 질문에서는 버퍼 flush 와 저장소 조회를 하지 않습니다.
+
+실행: python -m benchmarks.bench_parallel_graph --llm-latency 0.5 --search-latency 0.3
+"""
+import argparse
+import asyncio
+import time
+
+from benchmarks.fakes import install_fakes
+from agents.health_agent import HealthAgent
+
+QUESTIONS = {
+    "watch (local YES)": "오늘 내 걸음 수로 보면 운동량이 충분한가요?",
+    "general (local NO)": "당뇨병 예방에 좋은 음식은 무엇인가요?",
+    "ambiguous (LLM)": "제 운동 괜찮을까요?",
+}
+
+def report(label: str, timings: dict, wall_ms: float) -> None:
+    print(f"[{label}]")
+    for node, ms in timings.items():
+        print(f"  {node:<24} {ms:>8.1f} ms")
+    watch_path = timings.get("check_apple_watch_need", 0.0) + timings.get("load_watch_data", 0.0)
+    print(f"  fan-out 구간: max(retrieve {timings.get('retrieve', 0.0):.1f}, "
+          f"판단+로드 {watch_path:.1f}) ms")
+    print(f"  노드 합계(순차 실행 시) {sum(timings.values()):.1f} ms / 실제 {wall_ms:.1f} ms")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--llm-latency", type=float, default=0.5)
+    parser.add_argument("--search-latency", type=float, default=0.3)
+    args = parser.parse_args()
+
+    agent = install_fakes(HealthAgent(), llm_latency=args.llm_latency, search_latency=args.search_latency)
+    graph = agent.get_agent()
+
+    for i, (label, question) in enumerate(QUESTIONS.items()):
+        config = {"configurable": {"thread_id": f"bench_parallel_{i}"}}
+        start = time.perf_counter()
+        result = graph.invoke(agent._initial_state(question), config=config)
+        report(f"sync invoke / {label}", result["node_timings"], (time.perf_counter() - start) * 1000)
+
+        config = {"configurable": {"thread_id": f"bench_parallel_async_{i}"}}
+        start = time.perf_counter()
+        result = asyncio.run(graph.ainvoke(agent._initial_state(question), config=config))
+        report(f"async ainvoke / {label}", result["node_timings"], (time.perf_counter() - start) * 1000)
+
+if __name__ == "__main__":
+    main()
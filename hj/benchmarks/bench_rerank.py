@@ -0,0 +1,90 @@
+"""임베딩 재정렬 비용 비교 (가짜 임베딩 백엔드, 오프라인)
+
+임베딩 호출마다 latency 초가 걸리는 가짜 임베딩으로 임시 Chroma 컬렉션을 만들고,
+HybridRetriever 검색 결과를 EmbeddingsReranker 로 RERANK_TOP_N 개까지 줄일 때
+- 후보 문서를 다시 임베딩하는 방식 (검색 점수 제거)
+- 검색 단계의 relevance_score (저장된 임베딩 기준)를 사용하는 방식
+의 재정렬 단계 지연과 임베딩 호출 수를 비교합니다.
+
+실행: python -m benchmarks.bench_rerank --docs 500 --queries 20 --latency 0.15
+"""
+import argparse
+import shutil
+import statistics
+import tempfile
+import time
+
+from langchain_chroma import Chroma
+from langchain_core.embeddings import DeterministicFakeEmbedding
+
+from benchmarks.bench_embedding_pipeline import make_documents
+from database.bm25_index import BM25Index
+from database.compressors import EmbeddingsReranker
+from database.hybrid_retriever import HybridRetriever
+
+QUERIES = ["혈당 관리 방법", "유산소 운동 강도", "수면 위생 습관", "근력 운동 빈도", "식이섬유 효과", "스트레스 관리"]
+
+class SlowFakeEmbedding(DeterministicFakeEmbedding):
+    """호출마다 latency 초 지연되는 가짜 임베딩 (호출 수 기록)"""
+
+    latency: float = 0.15
+    calls: int = 0
+
+    def embed_documents(self, texts):
+        self.calls += 1
+        time.sleep(self.latency)
+        return super().embed_documents(texts)
+
+    def embed_query(self, text):
+        self.calls += 1
+        time.sleep(self.latency)
+        return super().embed_query(text)
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--docs", type=int, default=500)
+    parser.add_argument("--queries", type=int, default=20)
+    parser.add_argument("--k", type=int, default=10, help="재정렬 전 후보 수 (SEARCH_TOP_K)")
+    parser.add_argument("--top-n", type=int, default=2, help="RERANK_TOP_N")
+    parser.add_argument("--latency", type=float, default=0.15, help="임베딩 호출당 지연(초)")
+    args = parser.parse_args()
+
+    persist_dir = tempfile.mkdtemp(prefix="rerank_bench_")
+    try:
+        embeddings = SlowFakeEmbedding(size=256, latency=0.0)
+        documents = make_documents(args.docs)
+        ids = [doc.metadata["id"] for doc in documents]
+        db = Chroma(collection_name="bench", embedding_function=embeddings, persist_directory=persist_dir)
+        db.add_documents(documents, ids=ids)
+        index = BM25Index()
+        index.add(ids, [doc.page_content for doc in documents])
+        retriever = HybridRetriever(vectorstore=db, bm25_index=index, k=args.k)
+        reranker = EmbeddingsReranker(embeddings=embeddings, top_n=args.top_n)
+
+        queries = [f"{QUERIES[i % len(QUERIES)]} {i}" for i in range(args.queries)]
+        candidates = [retriever.invoke(query) for query in queries]
+        embeddings.latency = args.latency
+
+        scenarios = {
+            "re-embed candidates": lambda docs: [
+                doc.model_copy(update={"metadata": {k: v for k, v in doc.metadata.items() if k != "relevance_score"}})
+                for doc in docs
+            ],
+            "stored relevance": lambda docs: docs,
+        }
+        for label, prepare in scenarios.items():
+            embeddings.calls = 0
+            timings = []
+            for query, docs in zip(queries, candidates):
+                docs = prepare(docs)
+                start = time.perf_counter()
+                top = reranker.compress_documents(docs, query)
+                timings.append((time.perf_counter() - start) * 1000)
+                assert len(top) == min(args.top_n, len(docs))
+            print(f"{label:<20} median={statistics.median(timings):8.2f}ms  "
+                  f"max={max(timings):8.2f}ms  embed_calls={embeddings.calls}")
+    finally:
+        shutil.rmtree(persist_dir, ignore_errors=True)
+
+if __name__ == "__main__":
+    main()
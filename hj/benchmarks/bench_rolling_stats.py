@@ -0,0 +1,61 @@
+"""웨어러블 요약 통계 벤치마크: 증분 집계 vs 전체 재계산
+
+같은 합성 데이터(30초 간격)를 RollingAggregator 에 배치 단위로 반영한 뒤,
+"last_hour", "today", "last_7_days" 요약을 버킷 병합으로 구하는 시간과
+AppleWatchDataParser 로 해당 구간을 다시 계산하는 시간을 비교합니다.
+
+실행: python -m benchmarks.bench_rolling_stats --rows 200000
+"""
+import argparse
+import time
+
+import pandas as pd
+
+from benchmarks.bench_activity_periods import make_trace
+from utils.rolling_stats import RollingAggregator
+from utils.user_data_parser import AppleWatchDataParser
+
+def rescan_summary(df: pd.DataFrame, start: pd.Timestamp) -> dict:
+    parser = AppleWatchDataParser(None)
+    parser.data = {"user_id": "bench", "date": ""}
+    parser.df = df[df["timestamp"] >= start].copy()
+    return parser.get_summary_stats()
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--batch-size", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    trace = make_trace(args.rows)
+    aggregator = RollingAggregator()
+    start = time.perf_counter()
+    for i in range(0, len(trace), args.batch_size):
+        aggregator.add("bench", trace.iloc[i:i + args.batch_size])
+    elapsed = time.perf_counter() - start
+    print(f"ingest: {args.rows:,} rows in {elapsed:.2f}s ({args.rows / elapsed:,.0f} rows/s)")
+
+    latest = trace["timestamp"].iloc[-1]
+    starts = {
+        "last_hour": (latest - pd.Timedelta(hours=1)).floor("min"),
+        "today": latest.normalize(),
+        "last_7_days": (latest - pd.Timedelta(days=7)).floor("h"),
+    }
+    for window, window_start in starts.items():
+        start = time.perf_counter()
+        for _ in range(args.repeat):
+            incremental = aggregator.summary("bench", window)
+        incremental_ms = (time.perf_counter() - start) / args.repeat * 1000
+
+        start = time.perf_counter()
+        for _ in range(args.repeat):
+            rescanned = rescan_summary(trace, window_start)
+        rescan_ms = (time.perf_counter() - start) / args.repeat * 1000
+
+        same = all(float(incremental[k]) == float(rescanned[k])
+                   for k in ("duration_minutes", "total_steps", "avg_heart_rate", "heart_rate_variability"))
+        print(f"{window:<12} incremental {incremental_ms:7.3f}ms  rescan {rescan_ms:7.3f}ms  identical={same}")
+
+if __name__ == "__main__":
+    main()
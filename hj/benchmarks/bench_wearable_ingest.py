@@ -0,0 +1,77 @@
+"""웨어러블 샘플 수집 처리량 벤치마크
+
+/wearables/{user_id}/samples 와 같은 경로(본문 파싱 -> 메모리 버퍼 -> 일괄 기록)로
+여러 사용자의 배치를 연속 수집하고 초당 처리 샘플 수를 측정합니다.
+비교를 위해 버퍼 없이 요청마다 저장소에 바로 기록하는 경우도 함께 측정합니다.
+
+실행: python -m benchmarks.bench_wearable_ingest --users 20 --batches 200 --batch-size 60
+"""
+import argparse
+import json
+import shutil
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from database.wearable_ingest import WearableIngestBuffer, parse_json_samples, parse_ndjson_samples
+from database.wearable_store import WearableStore
+
+def make_batches(users: int, batches: int, batch_size: int):
+    """사용자별로 시간순 30초 간격 샘플 배치 생성 (JSON/NDJSON 본문)"""
+    start = datetime(2025, 6, 21)
+    steps = {f"user_{u:03d}": 0 for u in range(users)}
+    for b in range(batches):
+        for user_id in steps:
+            samples = []
+            for i in range(batch_size):
+                steps[user_id] += (b + i) % 7
+                ts = start + timedelta(seconds=30 * (b * batch_size + i))
+                samples.append({
+                    "timestamp": ts.isoformat(),
+                    "step_count": steps[user_id],
+                    "heart_rate": 60 + (b * 7 + i) % 80,
+                })
+            yield user_id, samples
+
+def run(label: str, users: int, batches: int, batch_size: int, fmt: str, flush_size: int):
+    base_dir = tempfile.mkdtemp(prefix="wearable_bench_")
+    try:
+        store = WearableStore(base_dir)
+        buffer = WearableIngestBuffer(store, flush_size=flush_size)
+        bodies = []
+        for user_id, samples in make_batches(users, batches, batch_size):
+            if fmt == "ndjson":
+                body = "\n".join(json.dumps(s) for s in samples).encode()
+            else:
+                body = json.dumps({"samples": samples}).encode()
+            bodies.append((user_id, body))
+        parse = parse_ndjson_samples if fmt == "ndjson" else parse_json_samples
+
+        start = time.perf_counter()
+        total = 0
+        for user_id, body in bodies:
+            total += buffer.add(user_id, parse(body))
+        buffer.flush()
+        elapsed = time.perf_counter() - start
+
+        stats = buffer.stats()
+        print(f"{label:<24} {total:>9,} samples in {elapsed:6.2f}s -> {total / elapsed:>10,.0f} samples/s "
+              f"({len(bodies) / elapsed:,.0f} req/s, {stats['flushes']} flushes)")
+    finally:
+        shutil.rmtree(base_dir, ignore_errors=True)
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--batches", type=int, default=200)
+    parser.add_argument("--batch-size", type=int, default=60)
+    parser.add_argument("--flush-size", type=int, default=5000)
+    args = parser.parse_args()
+
+    print(f"users={args.users} batches/user={args.batches} batch_size={args.batch_size}")
+    run("json, buffered", args.users, args.batches, args.batch_size, "json", args.flush_size)
+    run("ndjson, buffered", args.users, args.batches, args.batch_size, "ndjson", args.flush_size)
+    run("json, write-through", args.users, args.batches, args.batch_size, "json", 1)
+
+if __name__ == "__main__":
+    main()
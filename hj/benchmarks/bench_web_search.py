@@ -0,0 +1,64 @@
+"""웹 검색 캐시/요청 제한 벤치마크 (가짜 백엔드 사용, 네트워크 호출 없음)
+
+고유 검색어 --unique 개를 표기만 바꿔 가며 반복한 --requests 개의 요청을 --concurrency 개씩
+동시에 보내고, 캐시 유무에 따른 백엔드 호출 수와 소요 시간, 토큰 버킷 대기 효과를 비교합니다.
+
+실행: python -m benchmarks.bench_web_search --requests 200 --unique 20 --latency 0.3
+"""
+import argparse
+import asyncio
+import random
+import time
+
+from tools.web_search_backends import FakeWebSearchBackend, TokenBucket, WebSearchCache, WebSearchClient
+
+QUERIES = [
+    "혈당지수 낮은 음식", "간헐적 단식 효과", "등산 무릎 통증", "수면 무호흡 증상", "카페인 섭취 권장량",
+    "마그네슘 부족 증상", "스쿼트 자세", "고강도 인터벌 트레이닝", "비타민 D 권장량", "심박 변이도 의미",
+]
+
+def make_requests(total: int, unique: int):
+    """같은 검색어를 공백/대소문자/문장부호만 바꿔 반복"""
+    base = [f"{QUERIES[i % len(QUERIES)]} {i // len(QUERIES)}" for i in range(unique)]
+    variants = [lambda q: q, lambda q: q + "?", lambda q: "  " + q.upper(), lambda q: q.replace(" ", "  ")]
+    rng = random.Random(0)
+    return [rng.choice(variants)(rng.choice(base)) for _ in range(total)]
+
+async def run(client: WebSearchClient, queries, concurrency: int) -> float:
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(query):
+        async with semaphore:
+            return await client.asearch(query)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(query) for query in queries))
+    return time.perf_counter() - start
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--unique", type=int, default=20)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--latency", type=float, default=0.3, help="가짜 백엔드 지연 시간(초)")
+    parser.add_argument("--rate", type=float, default=20.0, help="초당 백엔드 호출 수 제한")
+    args = parser.parse_args()
+
+    queries = make_requests(args.requests, args.unique)
+    scenarios = {
+        "no cache": lambda backend: WebSearchClient(backend, timeout=30),
+        "cache": lambda backend: WebSearchClient(backend, cache=WebSearchCache(), timeout=30),
+        f"cache + {args.rate:g}/s limit": lambda backend: WebSearchClient(
+            backend, cache=WebSearchCache(), limiter=TokenBucket(args.rate, 5), timeout=30
+        ),
+    }
+    for label, make_client in scenarios.items():
+        backend = FakeWebSearchBackend(latency=args.latency)
+        client = make_client(backend)
+        elapsed = asyncio.run(run(client, queries, args.concurrency))
+        stats = client.stats()
+        print(f"{label:<22} {elapsed:6.2f}s  backend_calls={backend.calls:<4} "
+              f"cache_hit_rate={stats['cache'].get('hit_rate', 0.0)}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+"""벤치마크용 가짜 LLM / 검색 도구 (네트워크 호출 없음)"""
+import asyncio
+import os
+import tempfile
+import time
+from typing import Any, Callable, List, Optional
+
+os.environ.setdefault("OPENAI_API_KEY", "sk-benchmark")
+os.environ.setdefault(
+    "DATABASE_URL", f"sqlite:///{os.path.join(tempfile.mkdtemp(prefix='health_agent_bench_'), 'chat.db')}"
+)
+
+from langchain_core.documents import Document
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from langchain_core.runnables import RunnableLambda
+
+SAMPLE_DOCUMENTS = [
+    Document(
+        page_content="제목: 혈당지수와 식이섬유\n\n내용: 식이섬유는 탄수화물의 흡수 속도를 늦춰 혈당지수(GI)를 낮춘다.",
+        metadata={"source": "nutrition.json", "category": "nutrition", "id": "nutrition_1", "title": "혈당지수와 식이섬유"},
+    ),
+    Document(
+        page_content="제목: 유산소 운동과 심박수\n\n내용: 중강도 유산소 운동은 최대 심박수의 60~70% 범위에서 수행한다.",
+        metadata={"source": "exercise.json", "category": "exercise", "id": "exercise_1", "title": "유산소 운동과 심박수"},
+    ),
+]
+
+def default_responder(messages: List[BaseMessage]) -> str:
+    """마지막 메시지 종류에 따라 그럴듯한 응답 생성"""
+    system = messages[0].content if messages else ""
+    if "YES" in system and "NO" in system:
+        return "NO"
+    return "식이섬유가 풍부한 음식을 함께 섭취하면 식후 혈당 상승을 완화할 수 있습니다."
+
+class FakeChatModel(BaseChatModel):
+    """고정 지연 시간을 갖는 가짜 채팅 모델
+
+    동기 호출은 time.sleep, 비동기 호출은 asyncio.sleep 으로 LLM 왕복 시간을 흉내냅니다.
+    """
+
+    latency: float = 0.0
+    token_latency: float = 0.0
+    responder: Callable[[List[BaseMessage]], str] = default_responder
+    calls: int = 0
+    prompt_chars: int = 0
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-benchmark-chat-model"
+
+    def _record(self, messages: List[BaseMessage]) -> str:
+        self.calls += 1
+        self.prompt_chars += sum(len(str(m.content)) for m in messages)
+        return self.responder(messages)
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs: Any) -> ChatResult:
+        text = self._record(messages)
+        time.sleep(self.latency)
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=text))])
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs: Any) -> ChatResult:
+        text = self._record(messages)
+        await asyncio.sleep(self.latency)
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=text))])
+
+    def _stream(self, messages, stop=None, run_manager=None, **kwargs: Any):
+        text = self._record(messages)
+        time.sleep(self.latency)
+        for token in text.split(" "):
+            time.sleep(self.token_latency)
+            chunk = ChatGenerationChunk(message=AIMessageChunk(content=token + " "))
+            if run_manager:
+                run_manager.on_llm_new_token(chunk.text, chunk=chunk)
+            yield chunk
+
+    def with_structured_output(self, schema, **kwargs: Any):
+        """구조화 출력 흉내: responder 응답을 answer 로 갖는 스키마 객체 반환"""
+        def _fill(messages: List[BaseMessage]):
+            text = self._record(messages)
+            return schema.model_validate({
+                "extracted_facts": [{"info": text, "relevance": 0.9, "faithfulness": 0.8}],
+                "answerability": 0.9,
+                "answer": text,
+            })
+
+        def _invoke(messages: List[BaseMessage]):
+            result = _fill(messages)
+            time.sleep(self.latency)
+            return result
+
+        async def _ainvoke(messages: List[BaseMessage]):
+            result = _fill(messages)
+            await asyncio.sleep(self.latency)
+            return result
+
+        return RunnableLambda(_invoke, afunc=_ainvoke)
+
+    async def _astream(self, messages, stop=None, run_manager=None, **kwargs: Any):
+        text = self._record(messages)
+        await asyncio.sleep(self.latency)
+        for token in text.split(" "):
+            await asyncio.sleep(self.token_latency)
+            chunk = ChatGenerationChunk(message=AIMessageChunk(content=token + " "))
+            if run_manager:
+                await run_manager.on_llm_new_token(chunk.text, chunk=chunk)
+            yield chunk
+
+def make_fake_search(latency: float = 0.0, documents: Optional[List[Document]] = None):
+    """health_search / web_search 를 대체하는 가짜 검색 Runnable"""
+    docs = documents if documents is not None else SAMPLE_DOCUMENTS
+
+    def _search(query: str) -> List[Document]:
+        time.sleep(latency)
+        return list(docs)
+
+    async def _asearch(query: str) -> List[Document]:
+        await asyncio.sleep(latency)
+        return list(docs)
+
+    return RunnableLambda(_search, afunc=_asearch)
+
+def install_fakes(agent, llm_latency: float = 0.0, search_latency: float = 0.0):
+    """에이전트의 LLM과 검색 도구를 가짜 구현으로 교체"""
+    import agents.health_agent as health_agent_module
+
+    agent.llm = FakeChatModel(latency=llm_latency)
+    if hasattr(agent, "judgment_llm"):
+        agent.judgment_llm = FakeChatModel(latency=llm_latency)
+    health_agent_module.health_search = make_fake_search(search_latency)
+    health_agent_module.web_search = make_fake_search(search_latency)
+    return agent
@@ -0,0 +1,150 @@
+import json
+import math
+import os
+import threading
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from .compressors import iter_lexical_tokens
+
+class BM25Index:
+    """컬렉션 문서에 대한 로컬 BM25 역색인
+
+    토큰은 영문/숫자 단어와 한글 글자 bigram 이므로 "혈당지수", 약 이름, 운동 이름처럼
+    임베딩 검색이 놓치기 쉬운 정확한 용어를 찾을 수 있습니다. 문서 ID 단위로
+    추가/삭제할 수 있어 Chroma 컬렉션과 함께 증분 갱신하며, path 에 JSON 으로 저장합니다.
+    문서별 category 를 함께 저장하여 카테고리를 제한한 검색도 지원합니다.
+    """
+
+    # 저장 형식 버전 (다르면 빈 색인으로 시작하여 컬렉션에서 다시 생성)
+    FORMAT_VERSION = 2
+
+    def __init__(self, path: Optional[str] = None, k1: float = 1.5, b: float = 0.75):
+        self.path = path
+        self.k1 = k1
+        self.b = b
+        self._lock = threading.Lock()
+        # 문서별 토큰 빈도와 토큰별 역색인 (doc_id -> tf)
+        self._doc_terms: Dict[str, Dict[str, int]] = {}
+        self._doc_lengths: Dict[str, int] = {}
+        self._doc_categories: Dict[str, Optional[str]] = {}
+        self._postings: Dict[str, Dict[str, int]] = {}
+        self._total_length = 0
+        if path and os.path.exists(path):
+            self._load()
+
+    def __len__(self) -> int:
+        return len(self._doc_terms)
+
+    def _add_locked(self, doc_id: str, text: str, category: Optional[str]) -> None:
+        self._remove_locked(doc_id)
+        terms = Counter(iter_lexical_tokens(text))
+        length = sum(terms.values())
+        self._doc_terms[doc_id] = dict(terms)
+        self._doc_lengths[doc_id] = length
+        self._doc_categories[doc_id] = category
+        self._total_length += length
+        for term, tf in terms.items():
+            self._postings.setdefault(term, {})[doc_id] = tf
+
+    def _remove_locked(self, doc_id: str) -> None:
+        terms = self._doc_terms.pop(doc_id, None)
+        if terms is None:
+            return
+        self._total_length -= self._doc_lengths.pop(doc_id)
+        self._doc_categories.pop(doc_id, None)
+        for term in terms:
+            posting = self._postings[term]
+            del posting[doc_id]
+            if not posting:
+                del self._postings[term]
+
+    def add(self, ids: Iterable[str], texts: Iterable[str],
+            categories: Optional[Iterable[Optional[str]]] = None) -> None:
+        """문서를 추가 (같은 ID가 있으면 교체)"""
+        ids, texts = list(ids), list(texts)
+        categories = list(categories) if categories is not None else [None] * len(ids)
+        with self._lock:
+            for doc_id, text, category in zip(ids, texts, categories):
+                self._add_locked(doc_id, text, category)
+
+    def remove(self, ids: Iterable[str]) -> None:
+        with self._lock:
+            for doc_id in ids:
+                self._remove_locked(doc_id)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._doc_terms.clear()
+            self._doc_lengths.clear()
+            self._doc_categories.clear()
+            self._postings.clear()
+            self._total_length = 0
+
+    def search(self, query: str, k: int = 10,
+               categories: Optional[Iterable[str]] = None) -> List[Tuple[str, float]]:
+        """BM25 점수 상위 k 개 (doc_id, score) 목록 (categories 가 있으면 해당 카테고리 문서만)
+
+        IDF 는 카테고리와 무관하게 전체 문서 기준으로 계산합니다.
+        """
+        query_terms = set(iter_lexical_tokens(query))
+        allowed = set(categories) if categories else None
+        with self._lock:
+            n_docs = len(self._doc_terms)
+            if not n_docs or not query_terms:
+                return []
+            avg_length = self._total_length / n_docs or 1.0
+            scores: Dict[str, float] = {}
+            for term in query_terms:
+                posting = self._postings.get(term)
+                if not posting:
+                    continue
+                idf = math.log(1 + (n_docs - len(posting) + 0.5) / (len(posting) + 0.5))
+                for doc_id, tf in posting.items():
+                    if allowed is not None and self._doc_categories.get(doc_id) not in allowed:
+                        continue
+                    norm = self.k1 * (1 - self.b + self.b * self._doc_lengths[doc_id] / avg_length)
+                    scores[doc_id] = scores.get(doc_id, 0.0) + idf * tf * (self.k1 + 1) / (tf + norm)
+        return sorted(scores.items(), key=lambda item: item[1], reverse=True)[:k]
+
+    def _load(self) -> None:
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"BM25 색인 로드 실패, 빈 색인으로 시작합니다: {e}")
+            return
+        if data.get("version") != self.FORMAT_VERSION:
+            return
+        categories = data.get("categories", {})
+        with self._lock:
+            for doc_id, terms in data.get("documents", {}).items():
+                self._doc_terms[doc_id] = terms
+                self._doc_categories[doc_id] = categories.get(doc_id)
+                length = sum(terms.values())
+                self._doc_lengths[doc_id] = length
+                self._total_length += length
+                for term, tf in terms.items():
+                    self._postings.setdefault(term, {})[doc_id] = tf
+
+    def save(self) -> None:
+        """색인을 path 에 저장 (임시 파일에 쓴 뒤 교체)"""
+        if not self.path:
+            return
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._lock:
+            payload = json.dumps({
+                "version": self.FORMAT_VERSION,
+                "documents": self._doc_terms,
+                "categories": self._doc_categories,
+            }, ensure_ascii=False)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(payload)
+        os.replace(tmp_path, self.path)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {"documents": len(self._doc_terms), "terms": len(self._postings)}
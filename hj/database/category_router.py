@@ -0,0 +1,49 @@
+import re
+import unicodedata
+from typing import Dict, List, Tuple
+
+# 카테고리별 대표 키워드 (문서 metadata 의 category 값 기준)
+CATEGORY_KEYWORDS: Dict[str, Tuple[str, ...]] = {
+    "exercise": (
+        "운동", "근력", "근육", "유산소", "무산소", "스트레칭", "유연성", "웨이트", "스쿼트", "러닝", "달리기",
+        "조깅", "헬스", "트레이닝", "세트", "반복", "부상", "재활", "회복", "코칭", "프로그램", "체력",
+    ),
+    "nutrition": (
+        "영양", "식단", "음식", "식사", "섭취", "탄수화물", "단백질", "지방", "비타민", "미네랄", "칼슘", "철분",
+        "혈당", "식이섬유", "수분", "물 섭취", "다이어트", "감량", "단식", "저탄수", "지중해", "라벨", "가공식품",
+        "칼로리", "열량", "rda",
+    ),
+    "lifestyle": (
+        "수면", "잠이", "불면", "생활습관", "생활 습관", "스트레스", "명상", "휴식", "디지털", "디톡스", "집중력",
+        "햇빛", "자연", "음주", "흡연", "담배", "카페인", "커피", "생체 리듬", "생체리듬",
+    ),
+    "hiking": (
+        "등산", "산행", "하산", "트레킹", "등산화", "배낭", "스틱", "고도", "낙상", "조난", "기상", "날씨",
+        "야생", "곤충", "뱀", "에티켓", "페이스",
+    ),
+    "personalization": (
+        "개인", "맞춤", "체형", "체질", "체성분", "인바디", "inbody", "심박", "심박수", "맥박", "기초대사",
+        "bmr", "대사량", "유전자", "dna", "웨어러블", "워치", "데이터", "생활 패턴",
+    ),
+}
+
+CATEGORIES = tuple(CATEGORY_KEYWORDS)
+
+def route_categories(query: str, max_categories: int = 2, min_ratio: float = 0.5) -> List[str]:
+    """질문에 맞는 문서 카테고리 추정 (키워드 일치 기반, 네트워크 호출 없음)
+
+    가장 많이 일치한 카테고리와 그 점수의 min_ratio 이상인 카테고리를 최대
+    max_categories 개까지 반환합니다. 일치하는 키워드가 없으면 빈 리스트
+    (필터 없이 전체 검색)를 반환합니다.
+    """
+    text = re.sub(r"\s+", " ", unicodedata.normalize("NFKC", query).lower())
+    scores = {
+        category: sum(1 for keyword in keywords if keyword in text)
+        for category, keywords in CATEGORY_KEYWORDS.items()
+    }
+    best = max(scores.values())
+    if best == 0:
+        return []
+    ranked = sorted((category for category in scores if scores[category] >= best * min_ratio),
+                    key=lambda category: scores[category], reverse=True)
+    return ranked[:max_categories]
@@ -0,0 +1,136 @@
+import math
+import re
+from typing import Iterator, List, Optional, Sequence
+
+from langchain_core.callbacks import Callbacks
+from langchain_core.documents import BaseDocumentCompressor, Document
+from langchain_core.embeddings import Embeddings
+from pydantic import ConfigDict
+
+# 사용 가능한 압축기 종류
+COMPRESSOR_TYPES = ("embeddings", "lexical", "llm", "none")
+
+def cosine_similarity(a: Sequence[float], b: Sequence[float]) -> float:
+    """두 벡터의 코사인 유사도"""
+    dot = sum(x * y for x, y in zip(a, b))
+    norm = math.sqrt(sum(x * x for x in a)) * math.sqrt(sum(y * y for y in b))
+    return dot / norm if norm else 0.0
+
+_WORD_PATTERN = re.compile(r"[0-9A-Za-z]+|[가-힣]+")
+
+def iter_lexical_tokens(text: str) -> Iterator[str]:
+    """어휘 비교용 토큰을 등장 순서대로 반환 (영문/숫자 단어 + 한글 글자 bigram, 중복 포함)"""
+    for word in _WORD_PATTERN.findall(text.lower()):
+        if word[0].isascii() or len(word) == 1:
+            yield word
+        else:
+            yield from (word[i:i + 2] for i in range(len(word) - 1))
+
+def lexical_tokens(text: str) -> set:
+    """어휘 비교용 토큰 집합 (영문/숫자 단어 + 한글 글자 bigram)"""
+    return set(iter_lexical_tokens(text))
+
+class EmbeddingsReranker(BaseDocumentCompressor):
+    """질문과 문서 임베딩의 코사인 유사도로 상위 top_n 문서만 남기는 압축기
+
+    검색 단계에서 이미 계산한 relevance_score (컬렉션에 저장된 임베딩 기준)를 사용하므로
+    보통은 임베딩 호출이 없습니다. 점수가 없는 문서만 질문과 함께 임베딩합니다.
+    """
+
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    embeddings: Embeddings
+    top_n: int = 2
+
+    @staticmethod
+    def _unscored(documents: Sequence[Document]) -> List[Document]:
+        return [doc for doc in documents if "relevance_score" not in doc.metadata]
+
+    def _rerank(self, documents: Sequence[Document], unscored: Sequence[Document],
+                query_vector=None, doc_vectors=()) -> List[Document]:
+        computed = {id(doc): float(cosine_similarity(query_vector, vector))
+                    for doc, vector in zip(unscored, doc_vectors)}
+        scored = []
+        for doc in documents:
+            score = computed[id(doc)] if id(doc) in computed else float(doc.metadata["relevance_score"])
+            scored.append(doc.model_copy(update={
+                "metadata": {**doc.metadata, "similarity_score": round(score, 4)}
+            }))
+        scored.sort(key=lambda d: d.metadata["similarity_score"], reverse=True)
+        return scored[:self.top_n]
+
+    def compress_documents(
+        self,
+        documents: Sequence[Document],
+        query: str,
+        callbacks: Optional[Callbacks] = None,
+    ) -> Sequence[Document]:
+        if not documents:
+            return []
+        unscored = self._unscored(documents)
+        if not unscored:
+            return self._rerank(documents, unscored)
+        query_vector = self.embeddings.embed_query(query)
+        doc_vectors = self.embeddings.embed_documents([doc.page_content for doc in unscored])
+        return self._rerank(documents, unscored, query_vector, doc_vectors)
+
+    async def acompress_documents(
+        self,
+        documents: Sequence[Document],
+        query: str,
+        callbacks: Optional[Callbacks] = None,
+    ) -> Sequence[Document]:
+        if not documents:
+            return []
+        unscored = self._unscored(documents)
+        if not unscored:
+            return self._rerank(documents, unscored)
+        query_vector = await self.embeddings.aembed_query(query)
+        doc_vectors = await self.embeddings.aembed_documents([doc.page_content for doc in unscored])
+        return self._rerank(documents, unscored, query_vector, doc_vectors)
+
+class LexicalOverlapReranker(BaseDocumentCompressor):
+    """질문과 문서의 어휘 겹침 비율로 상위 top_n 문서만 남기는 압축기 (네트워크 호출 없음)"""
+
+    top_n: int = 2
+
+    def compress_documents(
+        self,
+        documents: Sequence[Document],
+        query: str,
+        callbacks: Optional[Callbacks] = None,
+    ) -> Sequence[Document]:
+        query_tokens = lexical_tokens(query)
+        if not documents or not query_tokens:
+            return list(documents)[:self.top_n]
+
+        scored = []
+        for doc in documents:
+            overlap = len(query_tokens & lexical_tokens(doc.page_content)) / len(query_tokens)
+            scored.append(doc.model_copy(update={
+                "metadata": {**doc.metadata, "lexical_score": round(overlap, 4)}
+            }))
+        # 동점이면 기존 검색 순위 유지
+        scored.sort(key=lambda d: d.metadata["lexical_score"], reverse=True)
+        return scored[:self.top_n]
+
+def build_compressor(compressor_type: str, embeddings: Embeddings, config) -> Optional[BaseDocumentCompressor]:
+    """설정된 종류의 문서 압축기 생성 ('none' 이면 None)"""
+    if compressor_type == "embeddings":
+        return EmbeddingsReranker(embeddings=embeddings, top_n=config.RERANK_TOP_N)
+    if compressor_type == "lexical":
+        return LexicalOverlapReranker(top_n=config.RERANK_TOP_N)
+    if compressor_type == "llm":
+        # 문서마다 LLM을 호출하므로 명시적으로 선택한 경우에만 사용
+        from langchain.retrievers.document_compressors import LLMChainExtractor
+        from langchain_openai import ChatOpenAI
+
+        llm = ChatOpenAI(
+            api_key=config.OPENAI_API_KEY,
+            model=config.LLM_MODEL,
+            temperature=0
+        )
+        return LLMChainExtractor.from_llm(llm)
+    if compressor_type == "none":
+        return None
+    raise ValueError(f"지원하지 않는 압축기입니다: {compressor_type} (가능한 값: {', '.join(COMPRESSOR_TYPES)})")
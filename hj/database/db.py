@@ -1,24 +1,73 @@
 from sqlalchemy import create_engine, inspect
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncEngine
 from sqlalchemy.orm import sessionmaker, Session
-from sqlalchemy.pool import StaticPool
-from typing import Generator
+from sqlalchemy.pool import NullPool, StaticPool
+from typing import Any, Dict, Generator, Optional
 from config import Config
 from .models import Base
 import logging
-from contextlib import contextmanager
+from contextlib import contextmanager, asynccontextmanager
 
 logger = logging.getLogger(__name__)
 
+# 사용 가능한 연결 풀 종류
+POOL_MODES = ("queue", "null", "static")
+
+def is_memory_sqlite(database_url: str) -> bool:
+    """인메모리 SQLite URL 여부"""
+    url = make_url(database_url)
+    return url.get_backend_name() == "sqlite" and url.database in (None, "", ":memory:")
+
+def engine_options(database_url: str) -> Dict[str, Any]:
+    """DB_POOL_* 설정에 따른 엔진 연결 풀 옵션
+    
+    - queue: 요청마다 풀에서 연결을 빌려 쓰며 pool_size + max_overflow 개까지 동시 사용
+      (동기 엔진은 QueuePool, 비동기 엔진은 AsyncAdaptedQueuePool)
+    - null: 연결을 풀에 보관하지 않음 (PgBouncer 등 외부 풀을 사용할 때)
+    - static: 단일 연결 공유 (테스트용), 인메모리 SQLite 는 항상 이 방식 사용
+    """
+    config = Config()
+    options: Dict[str, Any] = {"pool_pre_ping": True, "echo": False}  # echo=True 이면 SQL 로그 출력
+    mode = config.DB_POOL_MODE
+    if mode not in POOL_MODES:
+        raise ValueError(f"지원하지 않는 연결 풀입니다: {mode} (가능한 값: {', '.join(POOL_MODES)})")
+    
+    if is_memory_sqlite(database_url) or mode == "static":
+        # 인메모리 SQLite는 연결마다 DB가 분리되므로 단일 연결을 공유
+        options["poolclass"] = StaticPool
+        if make_url(database_url).get_backend_name() == "sqlite":
+            options["connect_args"] = {"check_same_thread": False}
+    elif mode == "null":
+        options["poolclass"] = NullPool
+    else:
+        options.update(
+            pool_size=config.DB_POOL_SIZE,
+            max_overflow=config.DB_MAX_OVERFLOW,
+            pool_recycle=config.DB_POOL_RECYCLE,
+            pool_timeout=config.DB_POOL_TIMEOUT,
+        )
+    return options
+
 # Database engine configuration
-engine = create_engine(
-    Config().DATABASE_URL,
-    poolclass=StaticPool,
-    pool_pre_ping=True,
-    echo=False  # Set to True for SQL query logging
-)
+# API 서버는 비동기 엔진만 사용하므로, 동기 엔진은 처음 필요할 때 생성하여
+# 사용하지 않는 연결 풀이 연결 수 한도를 함께 차지하지 않도록 함
+_engine: Optional[Engine] = None
+_session_factory = None
 
-# Session factory
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+def get_engine() -> Engine:
+    """동기 엔진 반환 (최초 호출 시 생성)"""
+    global _engine, _session_factory
+    if _engine is None:
+        database_url = Config().DATABASE_URL
+        _engine = create_engine(database_url, **engine_options(database_url))
+        _session_factory = sessionmaker(autocommit=False, autoflush=False, bind=_engine)
+    return _engine
+
+def SessionLocal() -> Session:
+    """동기 세션 생성"""
+    get_engine()
+    return _session_factory()
 
 def get_db() -> Generator[Session, None, None]:
     """데이터베이스 세션을 반환하는 의존성 함수"""
@@ -41,9 +90,96 @@ def get_db_session():
     finally:
         db.close()
 
+# =============================================================================
+# ASYNC ENGINE
+# =============================================================================
+# 동기 드라이버 -> 비동기 드라이버 매핑
+ASYNC_DRIVERS = {
+    "postgresql": "asyncpg",
+    "sqlite": "aiosqlite",
+    "mysql": "aiomysql",
+}
+
+_async_engine: Optional[AsyncEngine] = None
+_async_session_factory = None
+
+def to_async_url(database_url: str) -> str:
+    """동기 DATABASE_URL을 비동기 드라이버 URL로 변환"""
+    url = make_url(database_url)
+    backend = url.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"비동기 드라이버를 지원하지 않는 데이터베이스입니다: {backend}")
+    return url.set(drivername=f"{backend}+{ASYNC_DRIVERS[backend]}").render_as_string(hide_password=False)
+
+def get_async_engine() -> AsyncEngine:
+    """비동기 엔진 반환 (최초 호출 시 생성)"""
+    global _async_engine, _async_session_factory
+    if _async_engine is None:
+        async_url = to_async_url(Config().DATABASE_URL)
+        _async_engine = create_async_engine(async_url, **engine_options(async_url))
+        _async_session_factory = async_sessionmaker(
+            _async_engine, autoflush=False, expire_on_commit=False
+        )
+    return _async_engine
+
+@asynccontextmanager
+async def get_async_db_session():
+    """비동기 컨텍스트 매니저를 사용한 데이터베이스 세션 관리"""
+    get_async_engine()
+    db = _async_session_factory()
+    try:
+        yield db
+        await db.commit()
+    except Exception:
+        await db.rollback()
+        raise
+    finally:
+        await db.close()
+
+async def ensure_tables_exist_async():
+    """비동기 엔진에서 테이블이 존재하는지 확인하고 없으면 생성"""
+    async with get_async_engine().begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+async def dispose_async_engine():
+    """비동기 엔진 연결 정리"""
+    global _async_engine, _async_session_factory
+    if _async_engine is not None:
+        await _async_engine.dispose()
+        _async_engine = None
+        _async_session_factory = None
+
+def _pool_status(pool) -> Dict[str, Any]:
+    """연결 풀 사용 현황 (풀 객체의 현재 값만 보고하며, 해당 풀 종류에 없는 항목은 생략)
+    
+    QueuePool 계열만 크기/사용 중 연결 수를 제공하고, NullPool/StaticPool 은 풀 종류만 반환합니다.
+    """
+    status: Dict[str, Any] = {"pool": type(pool).__name__}
+    if hasattr(pool, "checkedout"):
+        status.update(
+            size=pool.size(),
+            checked_in=pool.checkedin(),
+            checked_out=pool.checkedout(),
+            overflow=pool.overflow(),
+        )
+    # SQLAlchemy 는 max_overflow 공개 접근자를 제공하지 않으므로 풀에 있을 때만 보고
+    max_overflow = getattr(pool, "_max_overflow", None)
+    if max_overflow is not None:
+        status["max_overflow"] = max_overflow
+    if hasattr(pool, "timeout"):
+        status["timeout"] = pool.timeout()
+    return status
+
+def get_pool_status() -> Dict[str, Any]:
+    """동기/비동기 엔진의 연결 풀 사용 현황 (생성되지 않은 엔진은 빈 값)"""
+    return {
+        "sync": _pool_status(_engine.pool) if _engine is not None else {},
+        "async": _pool_status(_async_engine.sync_engine.pool) if _async_engine is not None else {},
+    }
+
 def table_exists(table_name: str) -> bool:
     """테이블 존재 여부 확인"""
-    inspector = inspect(engine)
+    inspector = inspect(get_engine())
     return table_name in inspector.get_table_names()
 
 def create_tables():
@@ -66,7 +202,7 @@ def create_tables():
     
     if missing_tables:
         logger.info(f"생성할 테이블: {', '.join(missing_tables)}")
-        Base.metadata.create_all(bind=engine)
+        Base.metadata.create_all(bind=get_engine())
         logger.info("테이블 생성 완료")
     else:
         logger.info("모든 필요한 테이블이 이미 존재합니다")
@@ -74,7 +210,7 @@ def create_tables():
 def drop_tables():
     """데이터베이스 테이블 삭제 (개발용)"""
     logger.warning("모든 테이블을 삭제합니다...")
-    Base.metadata.drop_all(bind=engine)
+    Base.metadata.drop_all(bind=get_engine())
     logger.info("테이블 삭제 완료")
 
 def ensure_tables_exist():
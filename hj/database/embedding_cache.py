@@ -0,0 +1,211 @@
+import asyncio
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from array import array
+from typing import Dict, List, Optional
+
+from langchain_core.embeddings import Embeddings
+
+def normalize_text(text: str) -> str:
+    """캐시 키용 텍스트 정규화 (유니코드 정규화 + 공백 정리)"""
+    return re.sub(r"\s+", " ", unicodedata.normalize("NFKC", text)).strip()
+
+class EmbeddingCache:
+    """SQLite 기반 임베딩 캐시 (LRU 삭제, 적중/실패 카운터)
+
+    키는 (모델, 정규화된 텍스트)의 해시이며, max_entries 를 넘으면
+    가장 오래 사용되지 않은 항목부터 삭제합니다. 조회 시 last_access 갱신은 메모리에
+    모아 두었다가 touch_batch_size 개가 쌓이거나 저장/삭제할 때 한 번에 기록합니다.
+    """
+
+    def __init__(self, path: str, max_entries: int = 100000, touch_batch_size: int = 256):
+        self.path = path
+        self.max_entries = max_entries
+        self.touch_batch_size = touch_batch_size
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS embeddings (
+                key TEXT PRIMARY KEY,
+                model TEXT NOT NULL,
+                vector BLOB NOT NULL,
+                last_access REAL NOT NULL
+            )"""
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_embeddings_last_access ON embeddings (last_access)")
+        self._conn.commit()
+        # 아직 기록하지 않은 조회 시각 (key -> last_access)
+        self._pending_touches: Dict[str, float] = {}
+
+    def _count(self) -> int:
+        """저장된 항목 수 (lock 을 잡은 상태에서 호출)
+
+        executemany 의 rowcount 는 INSERT OR IGNORE 에서 무시된 행을 어떻게 세는지가
+        SQLite/드라이버 버전에 따라 달라 신뢰할 수 없으므로 항상 테이블에서 직접 셉니다.
+        """
+        return self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+
+    @staticmethod
+    def make_key(model: str, text: str) -> str:
+        return hashlib.sha256(f"{model}\x00{normalize_text(text)}".encode("utf-8")).hexdigest()
+
+    def get_many(self, model: str, texts: List[str]) -> List[Optional[List[float]]]:
+        """텍스트별 캐시된 벡터 조회 (없으면 None)"""
+        keys = [self.make_key(model, text) for text in texts]
+        found: Dict[str, List[float]] = {}
+        with self._lock:
+            unique_keys = list(set(keys))
+            # SQLite 변수 개수 제한을 고려해 나누어 조회
+            for i in range(0, len(unique_keys), 500):
+                batch = unique_keys[i:i + 500]
+                placeholders = ",".join("?" * len(batch))
+                rows = self._conn.execute(
+                    f"SELECT key, vector FROM embeddings WHERE key IN ({placeholders})", batch
+                ).fetchall()
+                for key, blob in rows:
+                    found[key] = array("d", blob).tolist()
+            if found:
+                now = time.time()
+                for key in found:
+                    self._pending_touches[key] = now
+                if len(self._pending_touches) >= self.touch_batch_size:
+                    self._flush_touches()
+                    self._conn.commit()
+
+            results = [found.get(key) for key in keys]
+            hit_count = sum(1 for vector in results if vector is not None)
+            self.hits += hit_count
+            self.misses += len(results) - hit_count
+        return results
+
+    def put_many(self, model: str, texts: List[str], vectors: List[List[float]]) -> None:
+        """벡터 저장 후 최대 항목 수를 넘으면 LRU 삭제"""
+        if not texts:
+            return
+        now = time.time()
+        rows = [
+            (self.make_key(model, text), model, array("d", vector).tobytes(), now)
+            for text, vector in zip(texts, vectors)
+        ]
+        with self._lock:
+            # 같은 (모델, 텍스트)의 벡터는 같으므로 이미 있는 키는 조회 시각만 갱신
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO embeddings (key, model, vector, last_access) VALUES (?, ?, ?, ?)",
+                rows
+            )
+            for key, _, _, _ in rows:
+                self._pending_touches[key] = now
+            self._flush_touches()
+            overflow = self._count() - self.max_entries
+            if overflow > 0:
+                self._conn.execute(
+                    "DELETE FROM embeddings WHERE key IN "
+                    "(SELECT key FROM embeddings ORDER BY last_access ASC LIMIT ?)",
+                    (overflow,)
+                )
+            self._conn.commit()
+
+    def _flush_touches(self) -> None:
+        """모아 둔 조회 시각을 기록 (lock 을 잡은 상태에서 호출, commit 은 호출자가 수행)"""
+        if not self._pending_touches:
+            return
+        self._conn.executemany(
+            "UPDATE embeddings SET last_access = ? WHERE key = ?",
+            [(last_access, key) for key, last_access in self._pending_touches.items()]
+        )
+        self._pending_touches.clear()
+
+    def flush(self) -> None:
+        """모아 둔 조회 시각을 즉시 기록"""
+        with self._lock:
+            self._flush_touches()
+            self._conn.commit()
+
+    def stats(self) -> Dict[str, float]:
+        """캐시 적중률 통계"""
+        with self._lock:
+            hits, misses, size = self.hits, self.misses, self._count()
+        total = hits + misses
+        return {
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": round(hits / total, 4) if total else 0.0,
+            "entries": size,
+            "max_entries": self.max_entries,
+        }
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM embeddings")
+            self._conn.commit()
+            self._pending_touches.clear()
+            self.hits = 0
+            self.misses = 0
+
+class CachedEmbeddings(Embeddings):
+    """임베딩 모델 앞단의 캐시 래퍼 - 캐시에 없는 텍스트만 실제 모델로 임베딩"""
+
+    def __init__(self, embeddings: Embeddings, cache: EmbeddingCache, model_name: str):
+        self.embeddings = embeddings
+        self.cache = cache
+        self.model_name = model_name
+
+    def _split(self, texts: List[str]):
+        """캐시 조회 후 (벡터 목록, 임베딩이 필요한 고유 텍스트) 반환"""
+        vectors = self.cache.get_many(self.model_name, texts)
+        missing = {}
+        for i, vector in enumerate(vectors):
+            if vector is None:
+                missing.setdefault(normalize_text(texts[i]), texts[i])
+        return vectors, list(missing.values())
+
+    def _fill(self, texts: List[str], vectors, missing_texts, new_vectors) -> List[List[float]]:
+        self.cache.put_many(self.model_name, missing_texts, new_vectors)
+        computed = {normalize_text(text): vector for text, vector in zip(missing_texts, new_vectors)}
+        return [
+            vector if vector is not None else computed[normalize_text(text)]
+            for text, vector in zip(texts, vectors)
+        ]
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        vectors, missing_texts = self._split(texts)
+        if not missing_texts:
+            return vectors
+        new_vectors = self.embeddings.embed_documents(missing_texts)
+        return self._fill(texts, vectors, missing_texts, new_vectors)
+
+    def embed_query(self, text: str) -> List[float]:
+        vector = self.cache.get_many(self.model_name, [text])[0]
+        if vector is not None:
+            return vector
+        vector = self.embeddings.embed_query(text)
+        self.cache.put_many(self.model_name, [text], [vector])
+        return vector
+
+    # 비동기 경로에서는 SQLite 입출력이 이벤트 루프를 막지 않도록 스레드에서 실행
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        vectors, missing_texts = await asyncio.to_thread(self._split, texts)
+        if not missing_texts:
+            return vectors
+        new_vectors = await self.embeddings.aembed_documents(missing_texts)
+        return await asyncio.to_thread(self._fill, texts, vectors, missing_texts, new_vectors)
+
+    async def aembed_query(self, text: str) -> List[float]:
+        vector = (await asyncio.to_thread(self.cache.get_many, self.model_name, [text]))[0]
+        if vector is not None:
+            return vector
+        vector = await self.embeddings.aembed_query(text)
+        await asyncio.to_thread(self.cache.put_many, self.model_name, [text], [vector])
+        return vector
@@ -0,0 +1,109 @@
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, List, Optional, Sequence
+
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+
+from utils.token_counter import get_token_counter
+
+class EmbeddingPipeline:
+    """대량 문서 임베딩 파이프라인
+
+    텍스트를 토큰 예산(max_batch_tokens) 단위 배치로 나누고, 배치를 최대
+    max_workers 개까지 동시에 임베딩합니다. 실패한 배치는 지수 백오프로
+    max_retries 번까지 재시도하며, 결과는 Chroma 컬렉션에 한 번에 upsert 합니다.
+    """
+
+    def __init__(self, embeddings: Embeddings, max_batch_tokens: int = 8000, max_batch_size: int = 512,
+                 max_workers: int = 4, max_retries: int = 3, backoff_seconds: float = 1.0,
+                 encoding_name: str = "cl100k_base", verbose: bool = True):
+        self.embeddings = embeddings
+        self.max_batch_tokens = max_batch_tokens
+        self.max_batch_size = max_batch_size
+        self.max_workers = max_workers
+        self.max_retries = max_retries
+        self.backoff_seconds = backoff_seconds
+        self.verbose = verbose
+        self.count_tokens = get_token_counter(encoding_name)
+
+    def make_batches(self, texts: Sequence[str]) -> List[List[int]]:
+        """토큰 예산과 최대 개수를 넘지 않도록 텍스트 인덱스를 배치로 묶음"""
+        batches, current, current_tokens = [], [], 0
+        for i, text in enumerate(texts):
+            tokens = self.count_tokens(text)
+            if current and (current_tokens + tokens > self.max_batch_tokens or len(current) >= self.max_batch_size):
+                batches.append(current)
+                current, current_tokens = [], 0
+            current.append(i)
+            current_tokens += tokens
+        if current:
+            batches.append(current)
+        return batches
+
+    def _embed_batch(self, texts: List[str]) -> List[List[float]]:
+        """배치 임베딩 (지수 백오프 + 지터로 재시도)"""
+        for attempt in range(self.max_retries + 1):
+            try:
+                return self.embeddings.embed_documents(texts)
+            except Exception as e:
+                if attempt == self.max_retries:
+                    raise
+                delay = self.backoff_seconds * (2 ** attempt) * (1 + random.random() * 0.1)
+                print(f"임베딩 배치 실패, {delay:.1f}초 후 재시도 ({attempt + 1}/{self.max_retries}): {e}")
+                time.sleep(delay)
+
+    def embed(self, texts: Sequence[str]) -> List[List[float]]:
+        """텍스트 목록을 입력 순서대로 임베딩"""
+        texts = list(texts)
+        if not texts:
+            return []
+        batches = self.make_batches(texts)
+        vectors: List[Optional[List[float]]] = [None] * len(texts)
+        done_texts = 0
+        start = time.perf_counter()
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = {
+                executor.submit(self._embed_batch, [texts[i] for i in batch]): batch
+                for batch in batches
+            }
+            for done_batches, future in enumerate(as_completed(futures), 1):
+                batch = futures[future]
+                for i, vector in zip(batch, future.result()):
+                    vectors[i] = vector
+                done_texts += len(batch)
+                if self.verbose:
+                    elapsed = time.perf_counter() - start
+                    print(f"임베딩 진행: {done_batches}/{len(batches)} 배치, {done_texts}/{len(texts)}개 "
+                          f"({done_texts / elapsed if elapsed else 0:.1f}개/초)")
+        return vectors
+
+    def upsert(self, db, documents: Sequence[Document], ids: Sequence[str], write_batch_size: int = 5000) -> Dict:
+        """문서를 임베딩하여 Chroma 컬렉션에 일괄 upsert 하고 처리 통계를 반환"""
+        start = time.perf_counter()
+        texts = [doc.page_content for doc in documents]
+        vectors = self.embed(texts)
+        embed_seconds = time.perf_counter() - start
+
+        # 벡터를 미리 계산했으므로 임베딩 함수를 거치지 않고 컬렉션에 바로 기록
+        for i in range(0, len(documents), write_batch_size):
+            db._collection.upsert(
+                ids=list(ids[i:i + write_batch_size]),
+                embeddings=vectors[i:i + write_batch_size],
+                metadatas=[doc.metadata for doc in documents[i:i + write_batch_size]],
+                documents=texts[i:i + write_batch_size],
+            )
+        total_seconds = time.perf_counter() - start
+
+        stats = {
+            "documents": len(documents),
+            "embed_seconds": round(embed_seconds, 3),
+            "total_seconds": round(total_seconds, 3),
+            "docs_per_second": round(len(documents) / total_seconds, 1) if total_seconds else 0.0,
+        }
+        if self.verbose and documents:
+            print(f"Chroma 기록 완료: {stats['documents']}개 문서, 임베딩 {stats['embed_seconds']}초, "
+                  f"전체 {stats['total_seconds']}초 ({stats['docs_per_second']}개/초)")
+        return stats
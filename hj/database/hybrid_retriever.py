@@ -0,0 +1,114 @@
+import asyncio
+from typing import Any, Dict, List, Optional, Tuple
+
+from langchain_core.callbacks import AsyncCallbackManagerForRetrieverRun, CallbackManagerForRetrieverRun
+from langchain_core.documents import Document
+from langchain_core.retrievers import BaseRetriever
+from pydantic import ConfigDict
+
+from .bm25_index import BM25Index
+from .compressors import cosine_similarity
+
+class HybridRetriever(BaseRetriever):
+    """벡터 검색과 BM25 검색 결과를 RRF(Reciprocal Rank Fusion)로 결합하는 retriever
+
+    두 검색의 상위 k 개를 각각 구한 뒤 문서별로 1 / (rrf_k + 순위) 를 더해 정렬합니다.
+    결과 메타데이터에 relevance_score (질문과의 코사인 유사도), bm25_score (BM25 검색에
+    포함된 문서만), rrf_score 를 기록합니다. relevance_score 는 컬렉션에 저장된 임베딩으로
+    직접 계산하므로 컬렉션의 거리 함수(hnsw:space)나 임베딩 정규화 여부와 관계없고,
+    재정렬 시 문서를 다시 임베딩할 필요가 없습니다.
+    bm25_index 가 None 이면 벡터 검색 결과만 사용합니다.
+    categories 가 있으면 두 검색 모두 해당 category 메타데이터를 가진 문서로 제한합니다.
+    """
+
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    vectorstore: Any
+    bm25_index: Optional[BM25Index] = None
+    k: int = 3
+    rrf_k: int = 60
+    categories: Optional[List[str]] = None
+
+    def _vector_filter(self) -> Optional[Dict]:
+        """Chroma where 필터 (카테고리 제한이 없으면 None)"""
+        if not self.categories:
+            return None
+        if len(self.categories) == 1:
+            return {"category": self.categories[0]}
+        return {"category": {"$in": list(self.categories)}}
+
+    def _lexical_hits(self, query: str) -> List[Tuple[str, float]]:
+        if self.bm25_index is None:
+            return []
+        return self.bm25_index.search(query, self.k, self.categories)
+
+    def _vector_search(self, query_vector: List[float]) -> List[str]:
+        """벡터 검색 상위 k 개 문서 ID (거리 순)"""
+        hits = self.vectorstore.similarity_search_by_vector(query_vector, k=self.k, filter=self._vector_filter())
+        return [doc.id for doc in hits]
+
+    def _fetch(self, ids: List[str], query_vector: List[float]) -> Dict[str, Document]:
+        """검색된 문서를 컬렉션에서 ID 로 조회 (저장된 임베딩으로 질문과의 코사인 유사도 계산)"""
+        if not ids:
+            return {}
+        result = self.vectorstore.get(ids=ids, include=["documents", "metadatas", "embeddings"])
+        return {
+            doc_id: Document(
+                page_content=content,
+                metadata={
+                    **(metadata or {}),
+                    "relevance_score": round(float(cosine_similarity(query_vector, embedding)), 4),
+                },
+                id=doc_id,
+            )
+            for doc_id, content, metadata, embedding in zip(
+                result["ids"], result["documents"], result["metadatas"], result["embeddings"]
+            )
+        }
+
+    def _fuse(self, vector_ids: List[str], lexical_hits: List[Tuple[str, float]],
+              fetched: Dict[str, Document]) -> List[Document]:
+        """순위만으로 RRF 점수 계산 (벡터 검색 거리 값은 사용하지 않음)"""
+        scores: Dict[str, Dict[str, float]] = {}
+        for rank, doc_id in enumerate(vector_ids, 1):
+            scores[doc_id] = {"rrf_score": 1 / (self.rrf_k + rank)}
+        for rank, (doc_id, bm25_score) in enumerate(lexical_hits, 1):
+            entry = scores.setdefault(doc_id, {"rrf_score": 0.0})
+            entry["bm25_score"] = round(bm25_score, 4)
+            entry["rrf_score"] += 1 / (self.rrf_k + rank)
+
+        # 색인과 컬렉션이 어긋나 조회되지 않은 문서는 제외 (다음 동기화 때 정리됨)
+        ranked = sorted((doc_id for doc_id in scores if doc_id in fetched),
+                        key=lambda doc_id: scores[doc_id]["rrf_score"], reverse=True)[:self.k]
+        return [
+            fetched[doc_id].model_copy(update={"metadata": {
+                **fetched[doc_id].metadata,
+                **scores[doc_id],
+                "rrf_score": round(scores[doc_id]["rrf_score"], 6),
+            }})
+            for doc_id in ranked
+        ]
+
+    @staticmethod
+    def _candidate_ids(vector_ids: List[str], lexical_hits: List[Tuple[str, float]]) -> List[str]:
+        return list(dict.fromkeys(vector_ids + [doc_id for doc_id, _ in lexical_hits]))
+
+    def _get_relevant_documents(self, query: str, *, run_manager: CallbackManagerForRetrieverRun) -> List[Document]:
+        query_vector = self.vectorstore.embeddings.embed_query(query)
+        vector_ids = self._vector_search(query_vector)
+        lexical_hits = self._lexical_hits(query)
+        fetched = self._fetch(self._candidate_ids(vector_ids, lexical_hits), query_vector)
+        return self._fuse(vector_ids, lexical_hits, fetched)
+
+    async def _aget_relevant_documents(self, query: str, *,
+                                       run_manager: AsyncCallbackManagerForRetrieverRun) -> List[Document]:
+        query_vector = await self.vectorstore.embeddings.aembed_query(query)
+        # 벡터 검색과 BM25 점수 계산은 CPU/디스크 작업이므로 이벤트 루프 밖에서 동시에 실행
+        vector_ids, lexical_hits = await asyncio.gather(
+            asyncio.to_thread(self._vector_search, query_vector),
+            asyncio.to_thread(self._lexical_hits, query),
+        )
+        fetched = await asyncio.to_thread(
+            self._fetch, self._candidate_ids(vector_ids, lexical_hits), query_vector
+        )
+        return self._fuse(vector_ids, lexical_hits, fetched)
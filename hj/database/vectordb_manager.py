@@ -1,9 +1,51 @@
+import hashlib
+import itertools
+import json
+import os
+import uuid
+
 from langchain_chroma import Chroma
 from langchain_openai import OpenAIEmbeddings
 from langchain.retrievers import ContextualCompressionRetriever
-from langchain.retrievers.document_compressors import LLMChainExtractor
-from langchain_openai import ChatOpenAI
 from config import Config
+from .bm25_index import BM25Index
+from .compressors import build_compressor
+from .embedding_cache import EmbeddingCache, CachedEmbeddings
+from .embedding_pipeline import EmbeddingPipeline
+from .hybrid_retriever import HybridRetriever
+
+def content_hash(document):
+    """문서 내용과 메타데이터의 해시 (변경 감지용)"""
+    metadata = {k: v for k, v in document.metadata.items() if k != "content_hash"}
+    payload = json.dumps({"content": document.page_content, "metadata": metadata}, ensure_ascii=False, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+def document_key(document):
+    """문서의 고정 Chroma ID (문서 id, 청크가 있으면 id#chunk_index)"""
+    doc_id = document.metadata.get("id", "unknown")
+    if doc_id == "unknown":
+        return content_hash(document)
+    if "chunk_index" in document.metadata:
+        return f"{doc_id}#{document.metadata['chunk_index']}"
+    return str(doc_id)
+
+def batched(iterable, size):
+    """iterable 을 size 개씩 리스트로 나누어 반환"""
+    iterator = iter(iterable)
+    while True:
+        batch = list(itertools.islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+def prepare_documents(documents):
+    """문서별 고정 ID와 content_hash 메타데이터를 붙인 사본 반환 (같은 ID는 마지막 문서 사용)"""
+    prepared = {}
+    for doc in documents:
+        metadata = dict(doc.metadata)
+        metadata["content_hash"] = content_hash(doc)
+        prepared[document_key(doc)] = doc.model_copy(update={"metadata": metadata})
+    return prepared
 
 class VectorDBManager:
     _instance = None
@@ -24,28 +66,195 @@ class VectorDBManager:
             model=self.config.EMBEDDING_MODEL
         )
         
-        # LLM 기반 압축기 사용 (CrossEncoder 대신)
-        llm = ChatOpenAI(
-            api_key=self.config.OPENAI_API_KEY,
-            model=self.config.LLM_MODEL,
-            temperature=0
-        )
-        self.compressor = LLMChainExtractor.from_llm(llm)
+        # 질문/문서 임베딩 디스크 캐시 (반복 질문과 재적재 시 네트워크 호출 생략)
+        self.embedding_cache = None
+        if self.config.EMBEDDING_CACHE_ENABLED:
+            self.embedding_cache = EmbeddingCache(
+                self.config.EMBEDDING_CACHE_PATH,
+                max_entries=self.config.EMBEDDING_CACHE_MAX_ENTRIES
+            )
+            self.embeddings_model = CachedEmbeddings(
+                self.embeddings_model, self.embedding_cache, self.config.EMBEDDING_MODEL
+            )
+        
+        # 검색 결과 압축기 (기본: 로컬 임베딩 유사도 재정렬, LLM 추출기는 선택 사항)
+        self._compressors = {}
+        self.compressor = self._get_compressor(self.config.RETRIEVAL_COMPRESSOR)
         
         self.collections = {}
+        # 컬렉션별 BM25 색인 (DB_DIR/bm25/{컬렉션}.json, 컬렉션과 함께 증분 갱신)
+        self._bm25_indexes = {}
+        # (컬렉션, k, 압축기, 카테고리) 별로 생성한 retriever 캐시
+        self._retrievers = {}
+        # 컬렉션 변경 시 호출할 콜백 (답변 캐시 무효화 등)
+        self._change_listeners = []
+        # 컬렉션별 버전 파일 읽기 캐시 (컬렉션 -> ((inode, mtime_ns), 버전), 파일은 매번 교체되므로 inode 가 바뀜)
+        self._versions = {}
         self._initialized = True
     
-    def create_collection(self, documents, collection_name):
-        """문서 컬렉션을 생성하고 벡터화합니다."""
-        db = Chroma.from_documents(
-            documents=documents,
-            embedding=self.embeddings_model,
+    def _get_compressor(self, compressor_type):
+        """압축기 종류별 인스턴스 반환 (한 번만 생성)"""
+        if compressor_type not in self._compressors:
+            self._compressors[compressor_type] = build_compressor(
+                compressor_type, self.embeddings_model, self.config
+            )
+        return self._compressors[compressor_type]
+    
+    def add_change_listener(self, listener):
+        """컬렉션이 생성/갱신될 때 listener(collection_name) 호출"""
+        self._change_listeners.append(listener)
+    
+    def _version_path(self, collection_name):
+        return os.path.join(self.config.DB_DIR, "versions", collection_name)
+    
+    def _bump_version(self, collection_name):
+        """컬렉션 버전 파일 갱신 (다른 프로세스의 load_data.py 적재도 감지할 수 있도록 DB_DIR 에 기록)"""
+        path = self._version_path(collection_name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(uuid.uuid4().hex)
+        os.replace(tmp_path, path)
+    
+    def collection_version(self, collection_name):
+        """컬렉션이 생성/갱신될 때마다 바뀌는 버전 문자열 (한 번도 기록되지 않았으면 빈 문자열)
+        
+        파일이 바뀌지 않았으면 stat 만으로 이전 값을 반환합니다.
+        """
+        path = self._version_path(collection_name)
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            return ""
+        signature = (stat.st_ino, stat.st_mtime_ns)
+        cached = self._versions.get(collection_name)
+        if cached is not None and cached[0] == signature:
+            return cached[1]
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                version = f.read().strip()
+        except FileNotFoundError:
+            return ""
+        self._versions[collection_name] = (signature, version)
+        return version
+    
+    def _invalidate_retrievers(self, collection_name):
+        """컬렉션 내용이 바뀌었을 때 버전 갱신, 해당 컬렉션의 retriever 캐시 삭제 및 listener 알림"""
+        self._bump_version(collection_name)
+        for key in [key for key in self._retrievers if key[0] == collection_name]:
+            del self._retrievers[key]
+        for listener in self._change_listeners:
+            listener(collection_name)
+    
+    def _open_collection(self, collection_name):
+        return Chroma(
+            embedding_function=self.embeddings_model,
             collection_name=collection_name,
             persist_directory=self.config.DB_DIR,
         )
+    
+    def _bm25_index(self, collection_name, db=None):
+        """컬렉션의 BM25 색인 반환 (저장된 색인이 컬렉션과 문서 수가 다르면 컬렉션에서 다시 생성)"""
+        index = self._bm25_indexes.get(collection_name)
+        if index is None:
+            index = BM25Index(os.path.join(self.config.DB_DIR, "bm25", f"{collection_name}.json"))
+            self._bm25_indexes[collection_name] = index
+            db = db or self.collections.get(collection_name) or self._open_collection(collection_name)
+            if len(index) != db._collection.count():
+                existing = db.get(include=["documents", "metadatas"])
+                index.clear()
+                index.add(existing["ids"], existing["documents"],
+                          [(metadata or {}).get("category") for metadata in existing["metadatas"]])
+                index.save()
+                print(f"{collection_name}: BM25 색인 재생성 ({len(index)}개 문서)")
+        return index
+    
+    def _embedding_pipeline(self):
+        """문서 적재용 배치/병렬 임베딩 파이프라인"""
+        return EmbeddingPipeline(
+            self.embeddings_model,
+            max_batch_tokens=self.config.EMBEDDING_BATCH_TOKENS,
+            max_workers=self.config.EMBEDDING_MAX_WORKERS,
+            max_retries=self.config.EMBEDDING_MAX_RETRIES,
+        )
+    
+    def create_collection(self, documents, collection_name):
+        """문서 컬렉션을 새로 생성하고 벡터화합니다 (기존 컬렉션은 삭제).
+        
+        documents 는 리스트 또는 제너레이터이며 INGEST_BATCH_SIZE 단위로 나누어 적재합니다.
+        """
+        self._open_collection(collection_name).delete_collection()
+        db = self._open_collection(collection_name)
+        index = self._bm25_index(collection_name, db)
+        index.clear()
+        pipeline = self._embedding_pipeline()
+        for batch in batched(documents, self.config.INGEST_BATCH_SIZE):
+            prepared = prepare_documents(batch)
+            pipeline.upsert(db, list(prepared.values()), list(prepared.keys()))
+            index.add(prepared.keys(), [doc.page_content for doc in prepared.values()],
+                      [doc.metadata.get("category") for doc in prepared.values()])
+        index.save()
         self.collections[collection_name] = db
+        self._invalidate_retrievers(collection_name)
         return db
     
+    def sync_collection(self, documents, collection_name):
+        """컬렉션을 documents 와 같아지도록 증분 갱신합니다.
+        
+        문서마다 고정 ID와 content_hash 를 두고, 새 문서와 내용이 바뀐 문서만
+        임베딩하여 upsert 하며 documents 에 없는 문서는 삭제합니다.
+        documents 는 리스트 또는 제너레이터이며 INGEST_BATCH_SIZE 단위로 처리합니다.
+        
+        Returns:
+            dict: {"added", "updated", "deleted", "unchanged"} 문서 수
+        """
+        db = self._open_collection(collection_name)
+        self.collections[collection_name] = db
+        index = self._bm25_index(collection_name, db)
+        
+        existing = db.get(include=["metadatas"])
+        existing_hashes = {
+            doc_id: (metadata or {}).get("content_hash")
+            for doc_id, metadata in zip(existing["ids"], existing["metadatas"])
+        }
+        
+        counts = {"added": 0, "updated": 0, "deleted": 0, "unchanged": 0}
+        seen = set()
+        pipeline = self._embedding_pipeline()
+        for batch in batched(documents, self.config.INGEST_BATCH_SIZE):
+            prepared = prepare_documents(batch)
+            changed = []
+            for key, doc in prepared.items():
+                doc_hash = doc.metadata["content_hash"]
+                if key not in existing_hashes:
+                    status = "added"
+                elif existing_hashes[key] != doc_hash:
+                    status = "updated"
+                else:
+                    status = "unchanged"
+                if status != "unchanged":
+                    changed.append(key)
+                    existing_hashes[key] = doc_hash
+                counts[status] += 1
+                seen.add(key)
+            if changed:
+                pipeline.upsert(db, [prepared[key] for key in changed], changed)
+                index.add(changed, [prepared[key].page_content for key in changed],
+                          [prepared[key].metadata.get("category") for key in changed])
+        
+        deleted = [doc_id for doc_id in existing_hashes if doc_id not in seen]
+        if deleted:
+            db.delete(ids=deleted)
+            index.remove(deleted)
+        counts["deleted"] = len(deleted)
+        
+        if counts["added"] or counts["updated"] or deleted:
+            index.save()
+            self._invalidate_retrievers(collection_name)
+        print(f"{collection_name}: 추가 {counts['added']}개, 변경 {counts['updated']}개, "
+              f"삭제 {counts['deleted']}개, 유지 {counts['unchanged']}개")
+        return counts
+    
     def update_collection(self, documents, collection_name):
         """기존 컬렉션에 문서를 추가하되, 중복 문서는 제외합니다."""
         # 기존 컬렉션 로드 시도
@@ -74,7 +283,13 @@ class VectorDBManager:
             
             if new_documents:
                 print(f"{collection_name}: {len(new_documents)}개 새 문서 추가 (중복 {len(documents) - len(new_documents)}개 제외)")
-                db.add_documents(new_documents)
+                ids = db.add_documents(new_documents)
+                index = self._bm25_index(collection_name, db)
+                index.add(ids, [doc.page_content for doc in new_documents],
+                          [doc.metadata.get("category") for doc in new_documents])
+                index.save()
+                # 문서가 실제로 추가된 뒤에만 retriever 캐시와 답변 캐시 버전을 갱신
+                self._invalidate_retrievers(collection_name)
             else:
                 print(f"{collection_name}: 모든 문서가 이미 존재함 (중복 {len(documents)}개)")
                 
@@ -97,19 +312,50 @@ class VectorDBManager:
         self.collections[collection_name] = db
         return self.get_retriever(collection_name)
     
-    def get_retriever(self, collection_name):
-        """컬렉션에 대한 압축 retriever를 반환합니다."""
+    def get_retriever(self, collection_name, k=None, compressor_type=None, categories=None):
+        """컬렉션에 대한 압축 retriever를 반환합니다.
+        
+        기본 검색은 벡터 검색이며, HYBRID_SEARCH_ENABLED 이면 BM25 검색 결과를 RRF 로 결합합니다.
+        categories 가 주어지면 해당 category 메타데이터를 가진 문서만 검색합니다.
+        retriever는 (컬렉션, k, 압축기, 카테고리) 별로 캐시되며, create_collection 또는
+        update_collection 으로 해당 컬렉션이 바뀔 때만 다시 생성됩니다.
+        """
+        k = k or self.config.SEARCH_TOP_K
+        compressor_type = compressor_type or self.config.RETRIEVAL_COMPRESSOR
+        categories = tuple(sorted(set(categories))) if categories else None
+        key = (collection_name, k, compressor_type, categories)
+        if key in self._retrievers:
+            return self._retrievers[key]
+        
         if collection_name not in self.collections:
             self.load_collection(collection_name)
-            
-        retriever = ContextualCompressionRetriever(
-            base_compressor=self.compressor,
-            base_retriever=self.collections[collection_name].as_retriever(
-                search_kwargs={"k": self.config.SEARCH_TOP_K}
-            ),
+        
+        bm25_index = None
+        if self.config.HYBRID_SEARCH_ENABLED:
+            bm25_index = self._bm25_index(collection_name)
+        base_retriever = HybridRetriever(
+            vectorstore=self.collections[collection_name],
+            bm25_index=bm25_index,
+            k=k,
+            rrf_k=self.config.RRF_K,
+            categories=list(categories) if categories else None,
         )
+        compressor = self._get_compressor(compressor_type)
+        if compressor is None:
+            retriever = base_retriever
+        else:
+            retriever = ContextualCompressionRetriever(
+                base_compressor=compressor,
+                base_retriever=base_retriever,
+            )
+        
+        self._retrievers[key] = retriever
         return retriever
         
+    def get_cache_stats(self):
+        """임베딩 캐시 통계 반환"""
+        return self.embedding_cache.stats() if self.embedding_cache else {}
+    
     def collection_exists(self, collection_name):
         """컬렉션이 존재하는지 확인합니다."""
         try:
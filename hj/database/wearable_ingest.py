@@ -0,0 +1,123 @@
+import asyncio
+import json
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Union
+
+import pandas as pd
+
+from database.wearable_store import WearableStore
+from utils.rolling_stats import RollingAggregator
+
+def parse_json_samples(body: bytes) -> List[Dict]:
+    """JSON 본문에서 샘플 목록 추출 ({"samples": [...]} 또는 [...])"""
+    payload = json.loads(body)
+    if isinstance(payload, dict):
+        payload = payload.get("samples")
+    if not isinstance(payload, list):
+        raise ValueError("samples 배열이 필요합니다")
+    return payload
+
+def parse_ndjson_samples(body: bytes) -> List[Dict]:
+    """NDJSON 본문(한 줄에 샘플 하나)에서 샘플 목록 추출"""
+    samples = []
+    for line_no, line in enumerate(body.splitlines(), 1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            samples.append(json.loads(line))
+        except json.JSONDecodeError as e:
+            raise ValueError(f"{line_no}번째 줄을 파싱할 수 없습니다: {e}")
+    return samples
+
+class WearableIngestBuffer:
+    """웨어러블 샘플 메모리 버퍼
+
+    요청마다 디스크에 쓰지 않고 사용자별로 샘플을 모아 두었다가,
+    버퍼가 flush_size 에 도달하거나 주기적 flush 가 실행될 때 WearableStore 에 한 번에 기록합니다.
+    aggregator 가 주어지면 기록된 샘플을 증분 집계에도 반영합니다.
+    """
+
+    def __init__(self, store: WearableStore, flush_size: int = 5000, flush_interval: float = 5.0,
+                 aggregator: Optional[RollingAggregator] = None):
+        self.store = store
+        self.aggregator = aggregator
+        self.flush_size = flush_size
+        self.flush_interval = flush_interval
+        self._pending: Dict[str, List[pd.DataFrame]] = {}
+        self._pending_counts: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._stats = {"received": 0, "written": 0, "flushes": 0, "errors": 0}
+
+    def add(self, user_id: str, samples: Union[pd.DataFrame, Iterable[Dict]]) -> int:
+        """샘플을 검증하여 버퍼에 추가하고 추가된 샘플 수를 반환 (가득 차면 해당 사용자 flush)"""
+        self.store.validate_user_id(user_id)
+        df = self.store.to_frame(samples)
+        if df.empty:
+            return 0
+
+        with self._lock:
+            self._pending.setdefault(user_id, []).append(df)
+            self._pending_counts[user_id] = self._pending_counts.get(user_id, 0) + len(df)
+            self._stats["received"] += len(df)
+            should_flush = self._pending_counts[user_id] >= self.flush_size
+
+        if should_flush:
+            self.flush(user_id)
+        return len(df)
+
+    def flush(self, user_id: Optional[str] = None) -> int:
+        """버퍼의 샘플을 저장소에 기록 (user_id 가 없으면 전체) 후 기록된 샘플 수를 반환"""
+        with self._lock:
+            user_ids = [user_id] if user_id is not None else list(self._pending)
+            batches = {uid: self._pending.pop(uid) for uid in user_ids if uid in self._pending}
+            for uid in batches:
+                self._pending_counts.pop(uid, None)
+
+        written = 0
+        for uid, frames in batches.items():
+            try:
+                df = pd.concat(frames, ignore_index=True).sort_values("timestamp", kind="stable")
+                if self.aggregator is not None:
+                    # 재시작 후 처음 들어온 사용자는 기존 이력으로 집계 상태를 먼저 복원
+                    self.aggregator.ensure_warm(self.store, uid)
+                written += self.store.append(uid, df)
+            except Exception as e:
+                print(f"웨어러블 데이터 저장 중 오류 ({uid}): {e}")
+                with self._lock:
+                    self._stats["errors"] += 1
+                    # 기록하지 못한 샘플은 다음 flush 때 다시 시도하도록 버퍼 앞쪽에 되돌림
+                    self._pending[uid] = frames + self._pending.get(uid, [])
+                    self._pending_counts[uid] = (self._pending_counts.get(uid, 0)
+                                                 + sum(len(frame) for frame in frames))
+                continue
+            if self.aggregator is not None:
+                try:
+                    self.aggregator.add(uid, df)
+                except Exception as e:
+                    print(f"웨어러블 데이터 집계 중 오류 ({uid}): {e}")
+                    with self._lock:
+                        self._stats["errors"] += 1
+        if batches:
+            with self._lock:
+                self._stats["written"] += written
+                self._stats["flushes"] += 1
+        return written
+
+    async def run_periodic_flush(self) -> None:
+        """flush_interval 마다 버퍼 전체를 기록하는 백그라운드 루프"""
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            if self.pending_count:
+                await asyncio.to_thread(self.flush)
+
+    @property
+    def pending_count(self) -> int:
+        """아직 기록되지 않은 샘플 수"""
+        with self._lock:
+            return sum(self._pending_counts.values())
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {**self._stats, "pending": sum(self._pending_counts.values())}
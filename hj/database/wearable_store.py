@@ -0,0 +1,269 @@
+import os
+import re
+import shutil
+import threading
+from datetime import datetime, date
+from typing import Dict, Iterable, Iterator, List, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+# 컬럼별 저장 형식 (리틀 엔디언 고정 폭, 파티션마다 컬럼 하나당 파일 하나)
+COLUMNS = {
+    "timestamp": np.dtype("<i8"),   # epoch 나노초
+    "step_count": np.dtype("<i8"),
+    "heart_rate": np.dtype("<i4"),
+}
+
+_USER_ID_PATTERN = re.compile(r"^[A-Za-z0-9_.-]+$")
+
+class WearableStore:
+    """웨어러블 시계열 컬럼형 저장소
+
+    사용자/날짜별 디렉터리에 컬럼마다 고정 폭 바이너리 파일을 두고,
+    새 샘플은 파일 끝에 추가(append)합니다. 조회 시에는 요청한 기간에 해당하는
+    날짜 파티션만 np.memmap 으로 열어 필요한 구간만 메모리에 올립니다.
+
+        {base_dir}/{user_id}/{YYYY-MM-DD}/timestamp.bin
+                                         /step_count.bin
+                                         /heart_rate.bin
+
+    순서가 어긋난 샘플로 파티션을 다시 써야 할 때는 {YYYY-MM-DD}.tmp 에 새 파티션을 만든 뒤
+    디렉터리 단위로 교체하므로, 중간에 중단되어도 컬럼끼리 어긋나지 않습니다.
+    읽기는 컬럼 파일을 쓰기 lock 안에서 열기 때문에 교체 중인 파티션을 보지 않습니다.
+    """
+
+    # 파티션 재작성 단계별 디렉터리 접미사 (작성 중 / 작성 완료 / 교체 후 삭제 대기)
+    _TMP_SUFFIX, _NEW_SUFFIX, _OLD_SUFFIX = ".tmp", ".new", ".old"
+
+    def __init__(self, base_dir: str):
+        self.base_dir = base_dir
+        self._lock = threading.Lock()
+        self._versions: Dict[str, int] = {}
+        os.makedirs(base_dir, exist_ok=True)
+        self._recover()
+
+    # -------------------------------------------------------------------------
+    # 경로
+    # -------------------------------------------------------------------------
+    @staticmethod
+    def validate_user_id(user_id: str) -> str:
+        """경로로 사용할 수 있는 사용자 ID인지 확인"""
+        if not _USER_ID_PATTERN.match(user_id) or user_id in (".", ".."):
+            raise ValueError(f"잘못된 사용자 ID입니다: {user_id}")
+        return user_id
+
+    def _user_dir(self, user_id: str) -> str:
+        return os.path.join(self.base_dir, self.validate_user_id(user_id))
+
+    def _partition_dir(self, user_id: str, day: date) -> str:
+        return os.path.join(self._user_dir(user_id), day.isoformat())
+
+    def list_days(self, user_id: str) -> List[date]:
+        """사용자의 저장된 날짜 파티션 목록"""
+        user_dir = self._user_dir(user_id)
+        if not os.path.isdir(user_dir):
+            return []
+        days = []
+        for name in os.listdir(user_dir):
+            try:
+                days.append(date.fromisoformat(name))
+            except ValueError:
+                continue
+        return sorted(days)
+
+    def _recover(self) -> None:
+        """중단된 파티션 재작성을 정리 (작성 완료된 새 파티션은 마저 교체, 작성 중이던 것은 삭제)"""
+        for user_id in os.listdir(self.base_dir):
+            user_dir = os.path.join(self.base_dir, user_id)
+            if not os.path.isdir(user_dir):
+                continue
+            for name in sorted(os.listdir(user_dir)):
+                path = os.path.join(user_dir, name)
+                stem, suffix = os.path.splitext(name)
+                if suffix == self._TMP_SUFFIX:
+                    shutil.rmtree(path, ignore_errors=True)
+                elif suffix == self._NEW_SUFFIX:
+                    self._swap_partition(os.path.join(user_dir, stem))
+                elif suffix == self._OLD_SUFFIX:
+                    partition = os.path.join(user_dir, stem)
+                    if os.path.isdir(partition):
+                        shutil.rmtree(path, ignore_errors=True)
+                    elif not os.path.isdir(partition + self._NEW_SUFFIX):
+                        os.rename(path, partition)
+
+    def version(self, user_id: str) -> int:
+        """사용자 데이터가 추가될 때마다 증가하는 버전 (캐시 키용)"""
+        return self._versions.get(user_id, 0)
+
+    # -------------------------------------------------------------------------
+    # 쓰기
+    # -------------------------------------------------------------------------
+    @staticmethod
+    def to_frame(samples: Union[pd.DataFrame, Iterable[Dict]]) -> pd.DataFrame:
+        """샘플 목록을 저장 형식의 DataFrame 으로 변환"""
+        if isinstance(samples, pd.DataFrame):
+            missing = [name for name in COLUMNS if name not in samples.columns]
+            if missing:
+                raise ValueError(f"필수 컬럼이 없습니다: {', '.join(missing)}")
+            columns = {name: samples[name] for name in COLUMNS}
+        else:
+            # 요청 본문의 샘플 목록은 DataFrame 생성 없이 컬럼 단위로 바로 모음
+            samples = list(samples)
+            try:
+                columns = {name: [sample[name] for sample in samples] for name in COLUMNS}
+            except KeyError as e:
+                raise ValueError(f"필수 컬럼이 없습니다: {e.args[0]}")
+            except TypeError:
+                raise ValueError("샘플은 객체(dict)여야 합니다")
+        if len(columns["timestamp"]) == 0:
+            return pd.DataFrame({name: pd.Series(dtype=dtype) for name, dtype in COLUMNS.items()})
+
+        # 문자열은 ISO8601 로 바로 파싱 (형식 추론 생략), 숫자는 epoch 초로 해석,
+        # 시간대가 있으면 UTC 기준으로 저장
+        timestamps = pd.Series(columns["timestamp"])
+        if timestamps.dtype == object:
+            timestamps = pd.to_datetime(timestamps, format="ISO8601", utc=True)
+        elif pd.api.types.is_bool_dtype(timestamps):
+            raise ValueError("timestamp 는 ISO8601 문자열 또는 epoch 초여야 합니다")
+        elif pd.api.types.is_numeric_dtype(timestamps):
+            timestamps = pd.to_datetime(timestamps, unit="s", utc=True)
+        else:
+            timestamps = pd.to_datetime(timestamps, utc=True)
+        df = pd.DataFrame({
+            "timestamp": timestamps.dt.tz_convert(None).astype("datetime64[ns]").to_numpy(),
+            "step_count": np.asarray(columns["step_count"]).astype(COLUMNS["step_count"]),
+            "heart_rate": np.asarray(columns["heart_rate"]).astype(COLUMNS["heart_rate"]),
+        })
+        return df.sort_values("timestamp", kind="stable").reset_index(drop=True)
+
+    def append(self, user_id: str, samples: Union[pd.DataFrame, Iterable[Dict]]) -> int:
+        """샘플을 날짜 파티션별로 추가하고 저장된 샘플 수를 반환"""
+        df = self.to_frame(samples)
+        if df.empty:
+            return 0
+
+        with self._lock:
+            for day, day_df in df.groupby(df["timestamp"].dt.date, sort=True):
+                self._append_partition(user_id, day, day_df)
+            self._versions[user_id] = self._versions.get(user_id, 0) + 1
+        return len(df)
+
+    def _append_partition(self, user_id: str, day: date, day_df: pd.DataFrame) -> None:
+        partition = self._partition_dir(user_id, day)
+        os.makedirs(partition, exist_ok=True)
+        new_ts = day_df["timestamp"].to_numpy("datetime64[ns]").astype(COLUMNS["timestamp"])
+
+        existing = self._open_partition(partition)
+        if existing is not None and len(existing["timestamp"]) and existing["timestamp"][-1] >= new_ts[0]:
+            # 순서가 어긋난 샘플: 파티션을 병합·정렬하여 다시 기록 (같은 시각은 새 값 우선)
+            merged = pd.DataFrame({name: np.asarray(existing[name]) for name in COLUMNS})
+            incoming = pd.DataFrame({
+                "timestamp": new_ts,
+                "step_count": day_df["step_count"].to_numpy(),
+                "heart_rate": day_df["heart_rate"].to_numpy(),
+            })
+            merged = pd.concat([merged, incoming], ignore_index=True)
+            merged = merged.drop_duplicates("timestamp", keep="last").sort_values("timestamp", kind="stable")
+            del existing
+            self._rewrite_partition(partition, {name: merged[name].to_numpy() for name in COLUMNS})
+            return
+
+        columns = {
+            "timestamp": new_ts,
+            "step_count": day_df["step_count"].to_numpy(),
+            "heart_rate": day_df["heart_rate"].to_numpy(),
+        }
+        for name, dtype in COLUMNS.items():
+            with open(os.path.join(partition, f"{name}.bin"), "ab") as f:
+                f.write(np.ascontiguousarray(columns[name], dtype=dtype).tobytes())
+
+    def _rewrite_partition(self, partition: str, columns: Dict[str, np.ndarray]) -> None:
+        """새 파티션을 임시 디렉터리에 모두 기록한 뒤 기존 파티션과 교체"""
+        tmp_dir = partition + self._TMP_SUFFIX
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        os.makedirs(tmp_dir)
+        for name, dtype in COLUMNS.items():
+            with open(os.path.join(tmp_dir, f"{name}.bin"), "wb") as f:
+                f.write(np.ascontiguousarray(columns[name], dtype=dtype).tobytes())
+                f.flush()
+                os.fsync(f.fileno())
+        # .new 로 이름을 바꾸는 시점부터 새 파티션이 완성된 것으로 간주
+        os.rename(tmp_dir, partition + self._NEW_SUFFIX)
+        self._swap_partition(partition)
+
+    def _swap_partition(self, partition: str) -> None:
+        """{partition}.new 를 partition 으로 교체 (기존 파티션은 .old 로 옮긴 뒤 삭제)
+
+        이미 열린 memmap 은 삭제된 이전 파일을 계속 참조하므로 읽던 데이터가 바뀌지 않습니다.
+        """
+        old_dir = partition + self._OLD_SUFFIX
+        if os.path.isdir(partition):
+            shutil.rmtree(old_dir, ignore_errors=True)
+            os.rename(partition, old_dir)
+        os.rename(partition + self._NEW_SUFFIX, partition)
+        shutil.rmtree(old_dir, ignore_errors=True)
+
+    # -------------------------------------------------------------------------
+    # 읽기
+    # -------------------------------------------------------------------------
+    @staticmethod
+    def _open_partition(partition: str) -> Optional[Dict[str, np.ndarray]]:
+        """파티션의 컬럼 파일을 memmap 으로 열기 (없으면 None)"""
+        arrays = {}
+        for name, dtype in COLUMNS.items():
+            path = os.path.join(partition, f"{name}.bin")
+            if not os.path.exists(path) or os.path.getsize(path) == 0:
+                return None
+            arrays[name] = np.memmap(path, dtype=dtype, mode="r")
+        # 쓰기 도중 중단된 경우를 대비해 가장 짧은 컬럼 길이에 맞춤
+        length = min(len(array) for array in arrays.values())
+        return {name: array[:length] for name, array in arrays.items()}
+
+    def iter_range(self, user_id: str, start: Optional[datetime] = None,
+                   end: Optional[datetime] = None) -> Iterator[pd.DataFrame]:
+        """기간 [start, end] 의 데이터를 날짜 파티션 단위 DataFrame 으로 순회"""
+        start_ns = pd.Timestamp(start).value if start is not None else None
+        end_ns = pd.Timestamp(end).value if end is not None else None
+
+        for day in self.list_days(user_id):
+            if start is not None and day < pd.Timestamp(start).date():
+                continue
+            if end is not None and day > pd.Timestamp(end).date():
+                break
+            with self._lock:
+                arrays = self._open_partition(self._partition_dir(user_id, day))
+            if arrays is None:
+                continue
+
+            timestamps = arrays["timestamp"]
+            lo = int(np.searchsorted(timestamps, start_ns, side="left")) if start_ns is not None else 0
+            hi = int(np.searchsorted(timestamps, end_ns, side="right")) if end_ns is not None else len(timestamps)
+            if lo >= hi:
+                continue
+            yield pd.DataFrame({
+                "timestamp": pd.to_datetime(np.array(timestamps[lo:hi])),
+                "step_count": np.array(arrays["step_count"][lo:hi]),
+                "heart_rate": np.array(arrays["heart_rate"][lo:hi]),
+            })
+
+    def read_range(self, user_id: str, start: Optional[datetime] = None,
+                   end: Optional[datetime] = None) -> pd.DataFrame:
+        """기간 [start, end] 의 데이터를 하나의 DataFrame 으로 반환"""
+        frames = list(self.iter_range(user_id, start, end))
+        if not frames:
+            return pd.DataFrame({
+                "timestamp": pd.Series(dtype="datetime64[ns]"),
+                "step_count": pd.Series(dtype=COLUMNS["step_count"]),
+                "heart_rate": pd.Series(dtype=COLUMNS["heart_rate"]),
+            })
+        return pd.concat(frames, ignore_index=True)
+
+    def latest_timestamp(self, user_id: str) -> Optional[datetime]:
+        """사용자의 가장 최근 샘플 시각"""
+        for day in reversed(self.list_days(user_id)):
+            with self._lock:
+                arrays = self._open_partition(self._partition_dir(user_id, day))
+            if arrays is not None and len(arrays["timestamp"]):
+                return pd.Timestamp(int(arrays["timestamp"][-1])).to_pydatetime()
+        return None
@@ -1,42 +1,60 @@
 import os
+import argparse
+import itertools
 from config import Config
-from utils.document_parser import load_health_documents
+from utils.document_parser import iter_health_documents
 from database.vectordb_manager import VectorDBManager
 
-def load_health_data_to_vectordb(collection_name="health_data"):
+LOAD_MODES = ("incremental", "full")
+
+def load_health_data_to_vectordb(collection_name="health_data", mode="incremental"):
     """건강 관련 문서를 벡터 데이터베이스에 저장합니다.
     
     Args:
         collection_name (str): 생성할 컬렉션 이름
+        mode (str): 'incremental' (새/변경 문서만 임베딩, 삭제된 문서 제거) 또는
+                    'full' (컬렉션을 삭제하고 전체 재생성)
         
     Returns:
         bool: 성공 여부
     """
-    print(f"건강 데이터 로딩 시작... (컬렉션: {collection_name})")
+    print(f"건강 데이터 로딩 시작... (컬렉션: {collection_name}, 모드: {mode})")
     
-    # 문서 로드
-    documents = load_health_documents()
+    # 문서는 파일에서 스트리밍하여 배치 단위로 적재 (전체 목록을 메모리에 만들지 않음)
+    # 파일 오류 시 해당 문서가 삭제되지 않도록 strict 모드로 로드
+    # (첫 문서를 읽을 때 파일 오류가 발생할 수 있으므로 예외 처리 안에서 읽음)
+    documents = iter_health_documents(strict=True)
+    try:
+        first = next(documents, None)
+    except Exception as e:
+        print(f"문서 로드 중 오류: {e}")
+        return False
     
-    if not documents:
+    # 문서가 하나도 없으면 증분 모드에서 컬렉션 전체가 삭제되지 않도록 중단
+    if first is None:
         print("로드할 문서가 없습니다.")
         return False
+    documents = itertools.chain([first], documents)
     
-    print(f"총 {len(documents)}개 문서 로드 완료")
-    
-    # 벡터 데이터베이스 생성
+    # 벡터 데이터베이스 생성 (sync_collection 은 모든 문서를 읽은 뒤에 삭제를 수행)
     try:
         db_manager = VectorDBManager()
         
         # 컬렉션 존재 여부 확인
         collection_exists = db_manager.collection_exists(collection_name)
         
-        # 컬렉션 생성 (기존에 있으면 덮어쓰기)
-        collection = db_manager.create_collection(documents, collection_name)
-        
-        if collection_exists:
-            print(f"기존 컬렉션 초기화 후 새로 생성 완료: {collection_name}")
+        if mode == "incremental":
+            # 내용 해시를 비교하여 바뀐 문서만 반영
+            counts = db_manager.sync_collection(documents, collection_name)
+            print(f"증분 갱신 완료: {collection_name} ({counts})")
         else:
-            print(f"새 벡터 데이터베이스 생성 완료: {collection_name}")
+            # 컬렉션 생성 (기존에 있으면 덮어쓰기)
+            db_manager.create_collection(documents, collection_name)
+            
+            if collection_exists:
+                print(f"기존 컬렉션 초기화 후 새로 생성 완료: {collection_name}")
+            else:
+                print(f"새 벡터 데이터베이스 생성 완료: {collection_name}")
         
         # 테스트 검색
         retriever = db_manager.get_retriever(collection_name)
@@ -54,6 +72,12 @@ def load_health_data_to_vectordb(collection_name="health_data"):
 
 def main():
     """메인 실행 함수"""
+    parser = argparse.ArgumentParser(description="건강 문서를 벡터 데이터베이스에 적재합니다.")
+    parser.add_argument("--mode", choices=LOAD_MODES, default="incremental",
+                        help="incremental: 변경된 문서만 반영 (기본값), full: 전체 재생성")
+    parser.add_argument("--collection", default="health_data", help="컬렉션 이름")
+    args = parser.parse_args()
+    
     print("=" * 50)
     print("Health Agent 데이터 로딩 시스템")
     print("=" * 50)
@@ -64,12 +88,12 @@ def main():
         return
     
     # 데이터 디렉토리 확인
-    if not os.path.exists(Config.DATA_DIR):
-        print(f"데이터 디렉토리를 찾을 수 없습니다: {Config.DATA_DIR}")
+    if not os.path.exists(Config().DATA_DIR):
+        print(f"데이터 디렉토리를 찾을 수 없습니다: {Config().DATA_DIR}")
         return
     
     # 벡터 데이터베이스 생성
-    success = load_health_data_to_vectordb()
+    success = load_health_data_to_vectordb(args.collection, args.mode)
     
     if success:
         print("\n모든 작업이 완료되었습니다.")
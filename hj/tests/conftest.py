@@ -0,0 +1,5 @@
+import os
+import sys
+
+# hj/ 의 모듈(utils, config 등)을 패키지 경로 없이 import 할 수 있도록 추가
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,99 @@
+import asyncio
+
+import pytest
+from langchain_core.embeddings import Embeddings
+
+from agents import answer_cache as answer_cache_module
+from agents.answer_cache import SemanticAnswerCache
+
+# 질문별 고정 벡터 ("혈당"과 "혈당 관리"는 거의 같은 방향)
+VECTORS = {
+    "혈당": [1.0, 0.0, 0.0],
+    "혈당 관리": [0.99, 0.1, 0.0],
+    "수면": [0.0, 1.0, 0.0],
+    "운동": [0.0, 0.0, 1.0],
+}
+
+class TableEmbeddings(Embeddings):
+    def embed_documents(self, texts):
+        return [VECTORS[text] for text in texts]
+
+    def embed_query(self, text):
+        return VECTORS[text]
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def time(self):
+        return self.now
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(answer_cache_module.time, "time", clock.time)
+    return clock
+
+def make_cache(**kwargs):
+    return SemanticAnswerCache(TableEmbeddings(), threshold=0.95, **kwargs)
+
+def test_similar_question_hits_and_dissimilar_misses(clock):
+    cache = make_cache()
+    cache.store("혈당", "식이섬유를 드세요")
+    assert cache.lookup("혈당 관리") == "식이섬유를 드세요"
+    assert cache.lookup("수면") is None
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["hit_rate"]) == (1, 1, 0.5)
+
+def test_entries_expire_after_ttl(clock):
+    cache = make_cache(ttl_seconds=60)
+    cache.store("혈당", "답변")
+    clock.now += 60
+    assert cache.lookup("혈당") == "답변"
+    clock.now += 1
+    assert cache.lookup("혈당") is None
+    assert cache.stats()["entries"] == 0
+    assert cache.stats()["evictions"] == 1
+
+def test_least_recently_used_entry_is_evicted(clock):
+    cache = make_cache(max_entries=2)
+    cache.store("혈당", "a")
+    cache.store("수면", "b")
+    assert cache.lookup("혈당") == "a"  # 혈당을 최근 사용으로 갱신
+    cache.store("운동", "c")
+    assert cache.lookup("수면") is None
+    assert cache.lookup("혈당") == "a"
+    assert cache.lookup("운동") == "c"
+    assert cache.stats()["evictions"] == 1
+
+def test_version_change_drops_stale_entries(clock):
+    version = {"value": "v1"}
+    cache = make_cache(version_provider=lambda: version["value"])
+    cache.store("혈당", "이전 답변")
+    version["value"] = "v2"
+    assert cache.lookup("혈당") is None
+    assert cache.stats()["invalidations"] == 1
+    cache.store("혈당", "새 답변")
+    assert cache.lookup("혈당") == "새 답변"
+
+def test_bypass_is_counted_separately_from_hits(clock):
+    cache = make_cache()
+    cache.store("혈당", "답변")
+    assert cache.lookup("혈당") == "답변"
+    cache.record_bypass()
+    cache.lookup("수면")
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["bypasses"]) == (1, 1, 1)
+    assert stats["hit_rate"] == 0.5
+
+def test_async_lookup_and_store(clock):
+    cache = make_cache()
+    asyncio.run(cache.astore("수면", "7시간"))
+    assert asyncio.run(cache.alookup("수면")) == "7시간"
+
+def test_invalidate_clears_entries(clock):
+    cache = make_cache()
+    cache.store("혈당", "답변")
+    cache.invalidate()
+    assert cache.lookup("혈당") is None
+    assert cache.stats()["entries"] == 0
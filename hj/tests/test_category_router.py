@@ -0,0 +1,49 @@
+import os
+
+import pytest
+
+from database.category_router import CATEGORIES, CATEGORY_KEYWORDS, route_categories
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data")
+
+def test_categories_match_data_files():
+    """문서 category 는 data/*.json 파일 이름이므로 라우터 카테고리와 같아야 함"""
+    files = {os.path.splitext(name)[0] for name in os.listdir(DATA_DIR) if name.endswith(".json")}
+    assert set(CATEGORIES) == files
+
+@pytest.mark.parametrize("query, expected", [
+    ("스쿼트 세트 수는?", ["exercise"]),
+    ("혈당 관리 식단", ["nutrition"]),
+    ("수면과 스트레스", ["lifestyle"]),
+    ("등산화 고르는 법", ["hiking"]),
+    ("내 심박수 데이터", ["personalization"]),
+])
+def test_single_category_queries(query, expected):
+    assert route_categories(query) == expected
+
+def test_close_second_category_is_included():
+    assert route_categories("근력 운동 후 단백질 섭취") == ["exercise", "nutrition"]
+
+def test_weaker_categories_are_dropped_by_ratio():
+    # exercise 3개, nutrition 1개 일치 -> 1 < 3 * 0.5
+    query = "근력 운동 스쿼트 후 단백질"
+    assert route_categories(query) == ["exercise"]
+    assert route_categories(query, min_ratio=0.3) == ["exercise", "nutrition"]
+
+def test_max_categories_limits_ties():
+    query = "혈당 스트레스 운동 심박"
+    assert len(route_categories(query)) == 2
+    assert set(route_categories(query, max_categories=5)) == {"exercise", "nutrition", "lifestyle", "personalization"}
+
+def test_no_keyword_means_no_filter():
+    assert route_categories("안녕하세요") == []
+    assert route_categories("") == []
+
+def test_query_is_normalized():
+    assert route_categories("ＢＭＲ 계산") == ["personalization"]
+    assert route_categories("InBody   결과") == ["personalization"]
+
+def test_keywords_are_lowercase():
+    # 질문은 소문자로 바꿔 비교하므로 키워드에 대문자가 있으면 일치하지 않음
+    for keywords in CATEGORY_KEYWORDS.values():
+        assert all(keyword == keyword.lower() for keyword in keywords)
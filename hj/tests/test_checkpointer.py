@@ -0,0 +1,69 @@
+import operator
+import threading
+from typing import Annotated, TypedDict
+
+from langgraph.graph import END, StateGraph
+
+from agents.checkpointer import BoundedMemorySaver
+
+class CounterState(TypedDict):
+    values: Annotated[list, operator.add]
+
+def build_app(checkpointer):
+    graph = StateGraph(CounterState)
+    graph.add_node("first", lambda state: {"values": [1]})
+    graph.add_node("second", lambda state: {"values": [2]})
+    graph.set_entry_point("first")
+    graph.add_edge("first", "second")
+    graph.add_edge("second", END)
+    return graph.compile(checkpointer=checkpointer)
+
+def config(thread_id):
+    return {"configurable": {"thread_id": thread_id}}
+
+def test_evicts_least_recently_used_thread():
+    saver = BoundedMemorySaver(max_threads=2)
+    app = build_app(saver)
+    app.invoke({"values": [0]}, config("a"))
+    app.invoke({"values": [0]}, config("b"))
+    # a 를 다시 사용하면 가장 오래된 스레드는 b
+    app.invoke({"values": [0]}, config("a"))
+    app.invoke({"values": [0]}, config("c"))
+
+    assert saver.thread_count == 2
+    assert list(saver.list(config("b"))) == []
+    assert app.get_state(config("a")).values["values"] == [0, 1, 2, 0, 1, 2]
+    assert app.get_state(config("c")).values["values"] == [0, 1, 2]
+
+def test_delete_thread_releases_checkpoints():
+    saver = BoundedMemorySaver(max_threads=10)
+    app = build_app(saver)
+    app.invoke({"values": [0]}, config("a"))
+    assert list(saver.list(config("a")))
+
+    saver.delete_thread("a")
+    assert saver.thread_count == 0
+    assert list(saver.list(config("a"))) == []
+    assert app.get_state(config("a")).values == {}
+
+def test_concurrent_threads_stay_bounded():
+    saver = BoundedMemorySaver(max_threads=5)
+    app = build_app(saver)
+    errors = []
+
+    def run(i):
+        try:
+            app.invoke({"values": [i]}, config(f"thread_{i}"))
+        except Exception as e:  # pragma: no cover - 실패 시 원인 표시용
+            errors.append(e)
+
+    threads = [threading.Thread(target=run, args=(i,)) for i in range(40)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    assert saver.thread_count == 5
+    stored = {checkpoint.config["configurable"]["thread_id"] for checkpoint in saver.list(None)}
+    assert len(stored) == 5
@@ -0,0 +1,55 @@
+import json
+
+import pytest
+
+from utils.document_parser import iter_json_array
+
+SAMPLES = [
+    "[]",
+    "[ ]",
+    "[-0.25]",
+    "[15000000000.0]",
+    "[1, -2, 3.5e2, -4E-3, 0, 10]",
+    "[true, false, null, -0]",
+    '["혈당지수", "GI \\"낮음\\"", "\\u00e9"]',
+    '[{"id": 1, "score": -0.25, "tags": ["운동", "근력"]}, {"id": 2, "nested": {"value": 1e-7}}]',
+    '\n[\n  {"title": "수면", "hours": 7.5},\n  [1, [2, [3.25]]],\n  12345678901234567890\n]\n',
+]
+
+def write(tmp_path, text):
+    path = tmp_path / "data.json"
+    path.write_text(text, encoding="utf-8")
+    return str(path)
+
+@pytest.mark.parametrize("text", SAMPLES)
+def test_matches_json_load_for_every_chunk_size(tmp_path, text):
+    """모든 청크 경계에서 json.loads 와 같은 항목을 반환"""
+    path = write(tmp_path, text)
+    expected = json.loads(text)
+    for chunk_size in range(1, len(text) + 2):
+        assert list(iter_json_array(path, chunk_size=chunk_size)) == expected, chunk_size
+
+@pytest.mark.parametrize("text", ["[-0.25]", "[15000000000.0]"])
+def test_number_types_are_preserved(tmp_path, text):
+    path = write(tmp_path, text)
+    for chunk_size in (1, 2, 4, 13):
+        items = list(iter_json_array(path, chunk_size=chunk_size))
+        assert items == json.loads(text)
+        assert all(isinstance(item, float) for item in items)
+
+def test_empty_file_yields_nothing(tmp_path):
+    assert list(iter_json_array(write(tmp_path, "  \n"))) == []
+
+def test_rejects_non_array(tmp_path):
+    with pytest.raises(ValueError, match="JSON 배열 파일이 아닙니다"):
+        list(iter_json_array(write(tmp_path, '{"a": 1}')))
+
+@pytest.mark.parametrize("chunk_size", [1, 3, 64])
+def test_rejects_unclosed_array(tmp_path, chunk_size):
+    with pytest.raises(ValueError, match="JSON 배열이 닫히지 않았습니다"):
+        list(iter_json_array(write(tmp_path, "[1, 2"), chunk_size=chunk_size))
+
+@pytest.mark.parametrize("chunk_size", [1, 3, 64])
+def test_rejects_malformed_item(tmp_path, chunk_size):
+    with pytest.raises(json.JSONDecodeError):
+        list(iter_json_array(write(tmp_path, '[{"a": 1}, {"b": }]'), chunk_size=chunk_size))
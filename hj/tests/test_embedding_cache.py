@@ -0,0 +1,99 @@
+import asyncio
+import time
+
+import pytest
+from langchain_core.embeddings import DeterministicFakeEmbedding
+
+from database.embedding_cache import CachedEmbeddings, EmbeddingCache
+
+class CountingEmbedding(DeterministicFakeEmbedding):
+    """임베딩한 텍스트 수를 기록하는 가짜 임베딩"""
+
+    embedded: int = 0
+
+    def embed_documents(self, texts):
+        self.embedded += len(texts)
+        return super().embed_documents(texts)
+
+    def embed_query(self, text):
+        self.embedded += 1
+        return super().embed_query(text)
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = EmbeddingCache(str(tmp_path / "cache" / "embeddings.sqlite"), max_entries=3, touch_batch_size=1)
+    yield cache
+    cache._conn.close()
+
+def test_get_many_counts_hits_and_misses(cache):
+    cache.put_many("m", ["a"], [[1.0, 2.0]])
+    assert cache.get_many("m", ["a", "b", "a"]) == [[1.0, 2.0], None, [1.0, 2.0]]
+    assert cache.get_many("other-model", ["a"]) == [None]
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["hit_rate"]) == (2, 2, 0.5)
+
+def test_keys_are_normalized(cache):
+    cache.put_many("m", ["혈당  지수\n"], [[0.5]])
+    assert cache.get_many("m", ["혈당 지수"]) == [[0.5]]
+
+def test_duplicate_puts_do_not_inflate_size(cache):
+    for _ in range(5):
+        cache.put_many("m", ["a", "b"], [[1.0], [2.0]])
+    assert cache.stats()["entries"] == 2
+    # 중복 삽입 후에도 실제 항목 수 기준으로 한도 적용
+    cache.put_many("m", ["c"], [[3.0]])
+    assert cache.stats()["entries"] == 3
+    assert cache.get_many("m", ["a", "b", "c"]) == [[1.0], [2.0], [3.0]]
+
+def test_evicts_least_recently_used(cache):
+    cache.put_many("m", ["a"], [[1.0]])
+    time.sleep(0.01)
+    cache.put_many("m", ["b"], [[2.0]])
+    time.sleep(0.01)
+    cache.put_many("m", ["c"], [[3.0]])
+    time.sleep(0.01)
+    cache.get_many("m", ["a"])  # a 를 최근 사용으로 갱신
+    time.sleep(0.01)
+    cache.put_many("m", ["d"], [[4.0]])
+    assert cache.stats()["entries"] == 3
+    assert cache.get_many("m", ["a", "b", "c", "d"]) == [[1.0], None, [3.0], [4.0]]
+
+def test_pending_touches_are_written_before_eviction(tmp_path):
+    cache = EmbeddingCache(str(tmp_path / "embeddings.sqlite"), max_entries=2, touch_batch_size=100)
+    cache.put_many("m", ["a"], [[1.0]])
+    time.sleep(0.01)
+    cache.put_many("m", ["b"], [[2.0]])
+    time.sleep(0.01)
+    cache.get_many("m", ["a"])  # 조회 시각은 아직 메모리에만 있음
+    cache.put_many("m", ["c"], [[3.0]])
+    assert cache.get_many("m", ["a", "b", "c"]) == [[1.0], None, [3.0]]
+    cache._conn.close()
+
+def test_size_survives_reopen(tmp_path):
+    path = str(tmp_path / "embeddings.sqlite")
+    first = EmbeddingCache(path, max_entries=10)
+    first.put_many("m", ["a", "b"], [[1.0], [2.0]])
+    first._conn.close()
+    second = EmbeddingCache(path, max_entries=10)
+    assert second.stats()["entries"] == 2
+    second._conn.close()
+
+def test_clear_resets_entries_and_counters(cache):
+    cache.put_many("m", ["a"], [[1.0]])
+    cache.get_many("m", ["a"])
+    cache.clear()
+    assert cache.stats() == {"hits": 0, "misses": 0, "hit_rate": 0.0, "entries": 0, "max_entries": 3}
+
+def test_cached_embeddings_only_embeds_missing_texts(tmp_path):
+    cache = EmbeddingCache(str(tmp_path / "embeddings.sqlite"))
+    model = CountingEmbedding(size=4)
+    embeddings = CachedEmbeddings(model, cache, "fake")
+
+    first = embeddings.embed_documents(["a", "b", "a"])
+    assert model.embedded == 2
+    assert first[0] == first[2]
+    assert embeddings.embed_documents(["b", "c"])[0] == first[1]
+    assert model.embedded == 3
+    assert embeddings.embed_query("c") == model.embed_query("c")
+    assert asyncio.run(embeddings.aembed_query("a")) == first[0]
+    cache._conn.close()
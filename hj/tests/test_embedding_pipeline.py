@@ -0,0 +1,94 @@
+import threading
+import time
+
+import pytest
+from langchain_chroma import Chroma
+from langchain_core.documents import Document
+from langchain_core.embeddings import DeterministicFakeEmbedding
+
+from database.embedding_pipeline import EmbeddingPipeline
+
+class FlakyEmbedding(DeterministicFakeEmbedding):
+    """처음 failures 번은 실패하고 호출된 배치를 기록하는 가짜 임베딩"""
+
+    failures: int = 0
+    calls: list = []
+
+    def embed_documents(self, texts):
+        self.calls.append(list(texts))
+        if self.failures > 0:
+            self.failures -= 1
+            raise RuntimeError("rate limited")
+        return super().embed_documents(texts)
+
+def make_pipeline(embeddings=None, **kwargs):
+    kwargs.setdefault("backoff_seconds", 0.0)
+    pipeline = EmbeddingPipeline(embeddings or FlakyEmbedding(size=4, calls=[]), verbose=False, **kwargs)
+    pipeline.count_tokens = len  # 글자 수를 토큰 수로 사용
+    return pipeline
+
+def test_batches_respect_token_budget():
+    pipeline = make_pipeline(max_batch_tokens=10)
+    assert pipeline.make_batches(["aaaa", "bbbb", "cc", "d", "eeeeeeeeee"]) == [[0, 1, 2], [3], [4]]
+
+def test_oversized_text_gets_its_own_batch():
+    pipeline = make_pipeline(max_batch_tokens=5)
+    assert pipeline.make_batches(["a", "x" * 20, "b"]) == [[0], [1], [2]]
+
+def test_batches_respect_max_batch_size():
+    pipeline = make_pipeline(max_batch_tokens=1000, max_batch_size=2)
+    assert pipeline.make_batches(["a"] * 5) == [[0, 1], [2, 3], [4]]
+
+def test_embed_keeps_input_order_across_concurrent_batches():
+    model = FlakyEmbedding(size=4, calls=[])
+    pipeline = make_pipeline(model, max_batch_tokens=3, max_workers=4)
+    texts = [f"{i:03d}" for i in range(20)]
+    assert pipeline.embed(texts) == model.embed_documents(texts)
+    assert pipeline.embed([]) == []
+
+def test_failed_batch_is_retried():
+    model = FlakyEmbedding(size=4, calls=[], failures=2)
+    pipeline = make_pipeline(model, max_retries=2)
+    assert len(pipeline.embed(["a", "b"])) == 2
+    assert model.calls == [["a", "b"]] * 3
+
+def test_gives_up_after_max_retries():
+    model = FlakyEmbedding(size=4, calls=[], failures=5)
+    pipeline = make_pipeline(model, max_retries=1)
+    with pytest.raises(RuntimeError):
+        pipeline.embed(["a"])
+    assert len(model.calls) == 2
+
+def test_concurrency_is_bounded():
+    active, peak, lock = [0], [0], threading.Lock()
+
+    class SlowEmbedding(DeterministicFakeEmbedding):
+        def embed_documents(self, texts):
+            with lock:
+                active[0] += 1
+                peak[0] = max(peak[0], active[0])
+            time.sleep(0.05)
+            with lock:
+                active[0] -= 1
+            return super().embed_documents(texts)
+
+    pipeline = make_pipeline(SlowEmbedding(size=4), max_batch_size=1, max_workers=3)
+    pipeline.embed([str(i) for i in range(10)])
+    assert peak[0] <= 3
+
+def test_upsert_writes_precomputed_vectors(tmp_path):
+    model = FlakyEmbedding(size=4, calls=[])
+    db = Chroma(collection_name="col", embedding_function=model, persist_directory=str(tmp_path))
+    documents = [Document(page_content=f"문서 {i}", metadata={"category": "diet"}) for i in range(7)]
+    pipeline = make_pipeline(model, max_batch_size=3)
+
+    stats = pipeline.upsert(db, documents, [f"id{i}" for i in range(7)], write_batch_size=4)
+    assert stats["documents"] == 7
+    stored = db.get(ids=["id0", "id6"], include=["documents", "metadatas", "embeddings"])
+    assert stored["documents"] == ["문서 0", "문서 6"]
+    assert stored["metadatas"][0] == {"category": "diet"}
+    assert list(stored["embeddings"][1]) == pytest.approx(model.embed_query("문서 6"))
+
+    # 같은 ID 로 다시 기록해도 문서 수는 그대로
+    pipeline.upsert(db, documents, [f"id{i}" for i in range(7)])
+    assert db._collection.count() == 7
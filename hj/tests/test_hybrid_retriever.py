@@ -0,0 +1,127 @@
+import asyncio
+
+import pytest
+from langchain_chroma import Chroma
+from langchain_core.embeddings import Embeddings
+
+from database.bm25_index import BM25Index
+from database.compressors import cosine_similarity
+from database.hybrid_retriever import HybridRetriever
+
+KEYWORDS = ("식단", "수면", "운동")
+
+class KeywordEmbeddings(Embeddings):
+    """키워드 등장 횟수로 만드는 벡터 (벡터 검색 순위를 예측할 수 있도록)"""
+
+    def _embed(self, text):
+        return [float(text.count(word)) for word in KEYWORDS] + [0.1]
+
+    def embed_documents(self, texts):
+        return [self._embed(text) for text in texts]
+
+    def embed_query(self, text):
+        return self._embed(text)
+
+DOCUMENTS = {
+    "diet-1": ("식단 관리는 혈당 조절의 기본입니다. 식단 기록을 권장합니다.", "diet"),
+    "diet-2": ("메트포르민 복용 중에는 식단 조절과 함께 비타민 B12를 확인하세요.", "diet"),
+    "sleep-1": ("수면 부족은 인슐린 저항성을 높입니다. 수면 시간을 지키세요.", "sleep"),
+    "exercise-1": ("운동 전후 혈당을 측정하고 메트포르민 복용 시간을 확인하세요.", "exercise"),
+    "exercise-2": ("운동 강도는 대화가 가능한 수준이 적당합니다. 운동 운동.", "exercise"),
+}
+
+@pytest.fixture
+def index():
+    index = BM25Index()
+    index.add(DOCUMENTS.keys(), [text for text, _ in DOCUMENTS.values()],
+              [category for _, category in DOCUMENTS.values()])
+    return index
+
+@pytest.fixture
+def vectorstore(tmp_path):
+    db = Chroma(collection_name="col", embedding_function=KeywordEmbeddings(), persist_directory=str(tmp_path))
+    db.add_texts([text for text, _ in DOCUMENTS.values()],
+                 metadatas=[{"category": category} for _, category in DOCUMENTS.values()],
+                 ids=list(DOCUMENTS))
+    return db
+
+def test_bm25_finds_exact_terms(index):
+    hits = index.search("메트포르민", k=5)
+    assert {doc_id for doc_id, _ in hits} == {"diet-2", "exercise-1"}
+    assert all(score > 0 for _, score in hits)
+    assert index.search("없는단어zzz") == []
+    assert index.search("") == []
+
+def test_bm25_category_filter_keeps_global_idf(index):
+    unfiltered = dict(index.search("메트포르민", k=5))
+    filtered = index.search("메트포르민", k=5, categories=["exercise"])
+    assert [doc_id for doc_id, _ in filtered] == ["exercise-1"]
+    assert filtered[0][1] == pytest.approx(unfiltered["exercise-1"])
+
+def test_bm25_add_replaces_and_remove_drops(index):
+    index.add(["diet-2"], ["수면 위생"], ["sleep"])
+    assert "diet-2" not in dict(index.search("메트포르민", k=5))
+    assert dict(index.search("위생", k=5)).keys() == {"diet-2"}
+    index.remove(["diet-2", "unknown"])
+    assert len(index) == 4
+    assert index.search("위생") == []
+
+def test_bm25_save_and_load(tmp_path, index):
+    path = str(tmp_path / "bm25" / "index.json")
+    index.path = path
+    index.save()
+    loaded = BM25Index(path)
+    assert loaded.stats() == index.stats()
+    assert loaded.search("메트포르민", categories=["diet"]) == index.search("메트포르민", categories=["diet"])
+
+def test_bm25_ignores_other_format_version(tmp_path):
+    path = tmp_path / "index.json"
+    path.write_text('{"version": 1, "documents": {"a": {"x": 1}}}', encoding="utf-8")
+    assert len(BM25Index(str(path))) == 0
+
+def test_rrf_ranks_documents_found_by_both_searches_first(vectorstore, index):
+    retriever = HybridRetriever(vectorstore=vectorstore, bm25_index=index, k=3)
+    docs = retriever.invoke("메트포르민 복용 식단")
+    # diet-2 는 벡터 검색과 BM25 검색 모두에서 1위
+    assert docs[0].id == "diet-2"
+
+    # rrf_score 는 두 검색의 순위만으로 계산
+    query_vector = KeywordEmbeddings().embed_query("메트포르민 복용 식단")
+    vector_ranks = {doc_id: rank for rank, doc_id in enumerate(retriever._vector_search(query_vector), 1)}
+    lexical_ranks = {doc_id: rank for rank, (doc_id, _) in enumerate(retriever._lexical_hits("메트포르민 복용 식단"), 1)}
+    for doc in docs:
+        expected = sum(1 / (60 + ranks[doc.id]) for ranks in (vector_ranks, lexical_ranks) if doc.id in ranks)
+        assert doc.metadata["rrf_score"] == pytest.approx(expected, abs=1e-6)
+        assert ("bm25_score" in doc.metadata) == (doc.id in lexical_ranks)
+    assert [doc.metadata["rrf_score"] for doc in docs] == sorted((doc.metadata["rrf_score"] for doc in docs), reverse=True)
+
+def test_relevance_score_is_cosine_of_stored_embedding(vectorstore, index):
+    retriever = HybridRetriever(vectorstore=vectorstore, bm25_index=index, k=5)
+    embeddings = KeywordEmbeddings()
+    query = "수면 운동"
+    for doc in retriever.invoke(query):
+        expected = cosine_similarity(embeddings.embed_query(query), embeddings.embed_query(doc.page_content))
+        assert doc.metadata["relevance_score"] == pytest.approx(expected, abs=1e-4)
+        assert doc.metadata["category"] in {"diet", "sleep", "exercise"}
+
+def test_categories_limit_both_searches(vectorstore, index):
+    retriever = HybridRetriever(vectorstore=vectorstore, bm25_index=index, k=5, categories=["exercise"])
+    docs = retriever.invoke("메트포르민 식단")
+    assert {doc.id for doc in docs} == {"exercise-1", "exercise-2"}
+
+def test_vector_only_without_index(vectorstore):
+    retriever = HybridRetriever(vectorstore=vectorstore, k=2)
+    docs = retriever.invoke("수면")
+    assert docs[0].id == "sleep-1"
+    assert all("bm25_score" not in doc.metadata for doc in docs)
+
+def test_documents_missing_from_collection_are_skipped(vectorstore, index):
+    index.add(["stale"], ["메트포르민 메트포르민"], ["diet"])
+    retriever = HybridRetriever(vectorstore=vectorstore, bm25_index=index, k=5)
+    assert "stale" not in {doc.id for doc in retriever.invoke("메트포르민")}
+
+def test_async_matches_sync(vectorstore, index):
+    retriever = HybridRetriever(vectorstore=vectorstore, bm25_index=index, k=3)
+    sync_docs = retriever.invoke("메트포르민 복용 식단")
+    async_docs = asyncio.run(retriever.ainvoke("메트포르민 복용 식단"))
+    assert [(doc.id, doc.metadata) for doc in async_docs] == [(doc.id, doc.metadata) for doc in sync_docs]
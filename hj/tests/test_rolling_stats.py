@@ -0,0 +1,159 @@
+from datetime import timedelta
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from database.wearable_store import WearableStore
+from utils.rolling_stats import RollingAggregator, RunningStats
+from utils.user_data_parser import AppleWatchDataParser
+
+SUMMARY_KEYS = ("duration_minutes", "total_steps", "avg_heart_rate", "min_heart_rate",
+                "max_heart_rate", "heart_rate_variability", "step_rate_per_minute")
+
+def make_trace(start, periods, freq="30s", seed=0):
+    """걷기/휴식이 번갈아 나오는 합성 데이터 (걸음 수는 누적값)"""
+    rng = np.random.default_rng(seed)
+    timestamps = pd.date_range(start, periods=periods, freq=freq)
+    walking = (np.arange(periods) // 7) % 2 == 0
+    steps = np.cumsum(np.where(walking, rng.integers(20, 60, periods), 0))
+    heart_rate = np.where(walking, rng.integers(95, 130, periods), rng.integers(60, 80, periods))
+    return pd.DataFrame({"timestamp": timestamps, "step_count": steps, "heart_rate": heart_rate})
+
+def rescan(df):
+    """같은 구간을 AppleWatchDataParser 로 다시 계산"""
+    parser = AppleWatchDataParser(None)
+    parser.data = {"user_id": "u1", "date": ""}
+    parser.df = df.reset_index(drop=True).copy()
+    return parser.get_summary_stats()
+
+def assert_same_summary(actual, expected):
+    # 반올림된 값은 부동소수점 누적 순서에 따라 마지막 자리가 다를 수 있음
+    for key in SUMMARY_KEYS:
+        assert float(actual[key]) == pytest.approx(float(expected[key]), abs=0.11), key
+
+def aggregator_with(df, batch_size=97, **kwargs):
+    aggregator = RollingAggregator(**kwargs)
+    for i in range(0, len(df), batch_size):
+        aggregator.add("u1", df.iloc[i:i + batch_size])
+    return aggregator
+
+def test_running_stats_merge_matches_numpy():
+    values = np.random.default_rng(1).normal(80, 12, 500)
+    left, right = RunningStats(), RunningStats()
+    for value in values[:123]:
+        left.update(value)
+    for value in values[123:]:
+        right.update(value)
+    merged = left.merge(right)
+    assert merged.count == 500
+    assert merged.mean == pytest.approx(values.mean())
+    assert merged.std == pytest.approx(values.std(ddof=1))
+    assert (merged.min, merged.max) == (values.min(), values.max())
+
+def test_last_hour_uses_minute_buckets():
+    """minute_retention 이내 구간은 시작 시각을 분 단위로 내림"""
+    df = make_trace("2024-03-01T08:00:15", 600)
+    aggregator = aggregator_with(df)
+    latest = df["timestamp"].iloc[-1]
+    start = (latest - timedelta(hours=1)).floor("min")
+    assert_same_summary(aggregator.summary("u1", "last_hour"), rescan(df[df["timestamp"] >= start]))
+
+def test_long_window_start_is_floored_to_the_hour():
+    """minute_retention 보다 긴 구간은 시간 버킷을 쓰므로 시작 시각 이전 같은 시간대 샘플도 포함"""
+    df = make_trace("2024-03-01T00:00:00", 1260)  # 00:00 ~ 10:29:30
+    aggregator = aggregator_with(df)
+    latest = df["timestamp"].iloc[-1]
+    start = latest - timedelta(hours=5)  # 05:29:30
+    assert start.floor("h") == pd.Timestamp("2024-03-01T05:00:00")
+
+    summary = aggregator.summary("u1", timedelta(hours=5))
+    assert_same_summary(summary, rescan(df[df["timestamp"] >= start.floor("h")]))
+    assert summary["duration_minutes"] > rescan(df[df["timestamp"] >= start])["duration_minutes"]
+
+def test_today_window_starts_at_midnight_of_latest_sample():
+    df = make_trace("2024-03-01T20:00:00", 1200)  # 전날 20:00 ~ 다음날 05:59:30
+    aggregator = aggregator_with(df)
+    midnight = pd.Timestamp("2024-03-02T00:00:00")
+    summary = aggregator.summary("u1", "today")
+    assert_same_summary(summary, rescan(df[df["timestamp"] >= midnight]))
+    assert summary["date"] == "2024-03-02"
+
+def test_today_window_with_minute_buckets_shortly_after_midnight():
+    df = make_trace("2024-03-01T22:00:00", 300)  # 22:00 ~ 00:29:30
+    aggregator = aggregator_with(df)
+    summary = aggregator.summary("u1", "today")
+    assert_same_summary(summary, rescan(df[df["timestamp"] >= pd.Timestamp("2024-03-02")]))
+    assert summary["duration_minutes"] == 30.0
+
+def test_duration_assumes_30_second_sampling():
+    """duration_minutes 는 샘플 수 x 0.5분이므로 샘플 간격이 다르면 실제 시간과 다름"""
+    thirty = aggregator_with(make_trace("2024-03-01T08:00:00", 20, freq="30s"))
+    assert thirty.summary("u1", "last_hour")["duration_minutes"] == 10.0
+
+    sixty = aggregator_with(make_trace("2024-03-01T08:00:00", 20, freq="60s"))
+    summary = sixty.summary("u1", "last_hour")
+    assert summary["duration_minutes"] == 10.0  # 실제 측정 시간은 약 20분
+    assert summary["step_rate_per_minute"] == round(summary["total_steps"] / 10.0, 1)
+
+def test_explicit_now_and_unknown_window():
+    df = make_trace("2024-03-01T08:00:00", 240)  # 08:00 ~ 09:59:30
+    aggregator = aggregator_with(df)
+    now = pd.Timestamp("2024-03-01T09:00:00")
+    summary = aggregator.summary("u1", timedelta(minutes=30), now=now)
+    # 끝 시각도 분 버킷 단위로 포함 (now 가 속한 1분 구간 전체)
+    window = df[(df["timestamp"] >= now - timedelta(minutes=30)) & (df["timestamp"] < now + timedelta(minutes=1))]
+    assert_same_summary(summary, rescan(window))
+    with pytest.raises(ValueError):
+        aggregator.summary("u1", "last_month")
+    assert aggregator.summary("nobody") == {}
+
+def test_replayed_and_older_samples_are_ignored():
+    df = make_trace("2024-03-01T08:00:00", 200)
+    aggregator = aggregator_with(df)
+    before = aggregator.summary("u1", "last_hour")
+    aggregator.add("u1", df)  # 같은 배치 재전송
+    aggregator.add("u1", df.iloc[:50].assign(heart_rate=200))  # 이미 반영한 시각의 다른 값
+    assert aggregator.summary("u1", "last_hour") == before
+
+def test_old_buckets_are_pruned():
+    df = make_trace("2024-03-01T00:00:00", 10 * 24 * 120, freq="30s")  # 10일
+    aggregator = aggregator_with(df, batch_size=5000,
+                                 minute_retention=timedelta(hours=3), hour_retention=timedelta(days=8))
+    stats = aggregator.stats()
+    assert stats["minute_buckets"] <= 3 * 60 + 1
+    assert stats["hour_buckets"] <= 8 * 24 + 1
+    # 보관 기간 안의 구간은 그대로 계산됨
+    latest = df["timestamp"].iloc[-1]
+    start = (latest - timedelta(days=7)).floor("h")
+    assert_same_summary(aggregator.summary("u1", "last_7_days"), rescan(df[df["timestamp"] >= start]))
+
+def test_activity_periods_match_parser():
+    df = make_trace("2024-03-01T08:00:00", 300)
+    aggregator = aggregator_with(df)
+    parser = AppleWatchDataParser(None)
+    parser.df = df.copy()
+    expected = parser.get_activity_periods()
+    actual = aggregator.activity_periods("u1", timedelta(hours=3))
+    assert len(actual) == len(expected) > 0
+    for got, want in zip(actual, expected):
+        assert got["start_time"] == want["start_time"]
+        assert got["end_time"] == want["end_time"]
+        assert got["steps_taken"] == want["steps_taken"]
+        assert got["avg_hr"] == pytest.approx(want["avg_hr"])
+
+def test_ensure_warm_restores_from_store_once(tmp_path):
+    store = WearableStore(str(tmp_path / "wearables"))
+    df = make_trace("2024-03-01T08:00:00", 120)
+    store.append("u1", df)
+    aggregator = RollingAggregator()
+    aggregator.ensure_warm(store, "u1")
+    restored = aggregator.summary("u1", "last_hour")
+    assert_same_summary(restored, rescan(df[df["timestamp"] >= (df["timestamp"].iloc[-1] - timedelta(hours=1)).floor("min")]))
+
+    # 이미 상태가 있으면 저장소를 다시 읽지 않음
+    store.append("u1", make_trace("2024-03-01T09:00:00", 10))
+    aggregator.ensure_warm(store, "u1")
+    assert aggregator.summary("u1", "last_hour") == restored
+    aggregator.ensure_warm(store, "nobody")
+    assert aggregator.summary("nobody") == {}
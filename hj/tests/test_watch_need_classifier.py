@@ -0,0 +1,98 @@
+import asyncio
+
+import pytest
+
+from agents.watch_need_classifier import WatchNeedClassifier, normalize_question
+
+class FakeJudge:
+    """호출 횟수를 기록하는 LLM 판단 함수"""
+
+    def __init__(self, answer):
+        self.answer = answer
+        self.calls = 0
+
+    def __call__(self, question):
+        self.calls += 1
+        return self.answer
+
+@pytest.mark.parametrize("question", [
+    "오늘 내 걸음 수 어때?",
+    "내 심박수 괜찮아?",
+    "애플워치 데이터 보면 운동량 충분해?",
+    "오늘 몇 걸음 걸었어?",
+    "What is my heart rate today?",
+])
+def test_personal_metric_questions_are_yes_locally(question):
+    decision, confidence = WatchNeedClassifier.classify(question)
+    assert decision is True and confidence >= 0.8
+
+@pytest.mark.parametrize("question", [
+    "당뇨병 예방에 좋은 음식은?",
+    "심박수 정상 범위는?",
+    "근력 운동은 일주일에 몇 번이 좋나요?",
+])
+def test_general_questions_are_no_locally(question):
+    decision, confidence = WatchNeedClassifier.classify(question)
+    assert decision is False and confidence >= 0.8
+
+@pytest.mark.parametrize("question", ["제 운동 괜찮을까요?", "최근 심박이 높은데 원인이 뭐야?"])
+def test_ambiguous_questions_fall_back_to_llm(question):
+    classifier = WatchNeedClassifier(threshold=0.8)
+    judge = FakeJudge(True)
+    assert classifier.decide(question, judge) is True
+    assert judge.calls == 1
+    assert classifier.stats()["llm_fallback"] == 1
+
+def test_decisions_are_cached_by_normalized_question():
+    classifier = WatchNeedClassifier()
+    judge = FakeJudge(False)
+    assert classifier.decide("제 운동 괜찮을까요?", judge) is False
+    assert classifier.decide("  제 운동   괜찮을까요 ", judge) is False
+    assert judge.calls == 1
+    stats = classifier.stats()
+    assert stats["cache_hits"] == 1
+    assert stats["cached_decisions"] == 1
+
+def test_confident_local_decision_skips_llm():
+    classifier = WatchNeedClassifier()
+    judge = FakeJudge(False)
+    assert classifier.decide("내 심박수 괜찮아?", judge) is True
+    assert judge.calls == 0
+    stats = classifier.stats()
+    assert (stats["local_yes"], stats["llm_fallback"], stats["fallback_rate"]) == (1, 0, 0.0)
+
+def test_llm_errors_are_not_cached():
+    classifier = WatchNeedClassifier()
+    failing = FakeJudge(None)
+    assert classifier.decide("제 운동 괜찮을까요?", failing) is False
+    assert classifier.stats()["llm_errors"] == 1
+    # 다음 요청에서 다시 판단
+    assert classifier.decide("제 운동 괜찮을까요?", FakeJudge(True)) is True
+
+def test_local_rules_can_be_disabled():
+    classifier = WatchNeedClassifier(local_enabled=False)
+    judge = FakeJudge(False)
+    assert classifier.decide("내 심박수 괜찮아?", judge) is False
+    assert judge.calls == 1
+
+def test_cache_is_bounded():
+    classifier = WatchNeedClassifier(cache_size=2)
+    judge = FakeJudge(True)
+    for question in ("제 운동 괜찮을까요?", "제 식단 괜찮을까요?", "제 수면 괜찮을까요?"):
+        classifier.decide(question, judge)
+    assert classifier.stats()["cached_decisions"] == 2
+    classifier.decide("제 운동 괜찮을까요?", judge)
+    assert judge.calls == 4
+
+def test_async_decide_uses_async_judge():
+    classifier = WatchNeedClassifier()
+
+    async def judge(question):
+        return True
+
+    assert asyncio.run(classifier.adecide("제 운동 괜찮을까요?", judge)) is True
+    assert asyncio.run(classifier.adecide("당뇨병 예방에 좋은 음식은?", judge)) is False
+
+def test_normalize_question():
+    assert normalize_question("  내 심박수   어때?!  ") == "내 심박수 어때"
+    assert normalize_question("ＡＰＰＬＥ Watch") == "apple watch"
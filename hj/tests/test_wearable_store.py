@@ -0,0 +1,76 @@
+import os
+
+import pandas as pd
+import pytest
+
+from database.wearable_store import WearableStore
+from utils.user_data_parser import AppleWatchDataParser, load_wearable_data
+
+def samples(start, count, step_seconds=30, heart_rate=70):
+    start = pd.Timestamp(start)
+    return [
+        {"timestamp": (start + pd.Timedelta(seconds=step_seconds * i)).isoformat(),
+         "step_count": i * 10, "heart_rate": heart_rate + i % 5}
+        for i in range(count)
+    ]
+
+@pytest.fixture
+def store(tmp_path):
+    return WearableStore(str(tmp_path / "wearables"))
+
+def test_read_range_crosses_day_partition(store):
+    """자정을 걸친 기간은 두 날짜 파티션을 이어서 시간순으로 반환"""
+    store.append("u1", samples("2024-03-01T23:50:00", 40))  # 23:50 ~ 00:09:30
+    assert store.list_days("u1") == [pd.Timestamp("2024-03-01").date(), pd.Timestamp("2024-03-02").date()]
+
+    df = store.read_range("u1", pd.Timestamp("2024-03-01T23:55:00"), pd.Timestamp("2024-03-02T00:05:00"))
+    assert df["timestamp"].iloc[0] == pd.Timestamp("2024-03-01T23:55:00")
+    assert df["timestamp"].iloc[-1] == pd.Timestamp("2024-03-02T00:05:00")
+    assert len(df) == 21
+    assert df["timestamp"].is_monotonic_increasing
+
+def test_read_range_skips_partitions_outside_range(store):
+    store.append("u1", samples("2024-03-01T12:00:00", 4))
+    store.append("u1", samples("2024-03-03T12:00:00", 4))
+    df = store.read_range("u1", pd.Timestamp("2024-03-02"), pd.Timestamp("2024-03-03T23:59:59"))
+    assert len(df) == 4
+    assert (df["timestamp"].dt.date == pd.Timestamp("2024-03-03").date()).all()
+
+def test_read_range_unknown_user_is_empty(store):
+    df = store.read_range("nobody")
+    assert df.empty
+    assert list(df.columns) == ["timestamp", "step_count", "heart_rate"]
+
+def test_out_of_order_append_rewrites_partition(store):
+    store.append("u1", samples("2024-03-01T10:01:00", 2))
+    store.append("u1", [{"timestamp": "2024-03-01T10:00:00", "step_count": 1, "heart_rate": 60},
+                        {"timestamp": "2024-03-01T10:01:00", "step_count": 5, "heart_rate": 99}])
+    df = store.read_range("u1")
+    assert list(df["timestamp"]) == [pd.Timestamp("2024-03-01T10:00:00"), pd.Timestamp("2024-03-01T10:01:00"),
+                                     pd.Timestamp("2024-03-01T10:01:30")]
+    # 같은 시각은 새 값 우선
+    assert df["heart_rate"].iloc[1] == 99
+    assert not any(name.endswith((".tmp", ".new", ".old")) for name in os.listdir(os.path.join(store.base_dir, "u1")))
+
+def test_numeric_timestamps_are_epoch_seconds(store):
+    store.append("u1", [{"timestamp": 1709251200, "step_count": 1, "heart_rate": 60}])
+    assert store.latest_timestamp("u1") == pd.Timestamp("2024-03-01T00:00:00")
+
+def test_rejects_path_like_user_id(store):
+    with pytest.raises(ValueError):
+        store.append("../etc", samples("2024-03-01", 1))
+
+def test_from_store_reads_only_requested_range(store):
+    store.append("u1", samples("2024-03-01T23:50:00", 40))
+    parser = AppleWatchDataParser.from_store(store, "u1", pd.Timestamp("2024-03-01T23:58:00"),
+                                             pd.Timestamp("2024-03-02T00:02:00"))
+    assert len(parser.df) == 9
+    assert parser.data == {"user_id": "u1", "date": "2024-03-01 23:58 ~ 2024-03-02 00:02"}
+
+def test_load_wearable_data_matches_file_summary_shape(store):
+    store.append("u1", samples("2024-03-01T08:00:00", 20))
+    result = load_wearable_data(store, "u1")
+    assert result["summary"]["user_id"] == "u1"
+    assert result["summary"]["date"] == "2024-03-01"
+    assert "Apple Watch 데이터 분석 결과" in result["text"]
+    assert load_wearable_data(store, "nobody")["summary"] == {}
@@ -0,0 +1,171 @@
+import asyncio
+import threading
+from types import SimpleNamespace
+
+import pytest
+
+from tools import web_search_backends
+from tools.web_search_backends import (
+    FakeWebSearchBackend, TokenBucket, WebSearchCache, WebSearchClient, WebSearchRateLimited,
+    build_web_search_backend, build_web_search_client, normalize_query,
+)
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def time(self):
+        return self.now
+
+@pytest.fixture
+def clock(monkeypatch):
+    # utils.cache 의 LRUCache 도 같은 time 모듈을 사용
+    clock = FakeClock()
+    monkeypatch.setattr(web_search_backends.time, "time", clock.time)
+    return clock
+
+class FailingBackend(FakeWebSearchBackend):
+    def search(self, query):
+        self.calls += 1
+        raise RuntimeError("backend down")
+
+def test_normalize_query():
+    assert normalize_query("  혈당   관리 방법?! ") == "혈당 관리 방법"
+    assert normalize_query("ＢＭＩ Calculator") == "bmi calculator"
+
+def test_cache_entries_expire_after_ttl(clock):
+    cache = WebSearchCache(ttl_seconds=60)
+    documents = FakeWebSearchBackend().search("혈당")
+    cache.set("혈당", documents)
+    clock.now += 60
+    assert cache.get("혈당") == documents
+    clock.now += 1
+    assert cache.get("혈당") is None
+
+def test_cache_evicts_least_recently_used(clock):
+    cache = WebSearchCache(max_entries=2)
+    cache.set("a", [])
+    cache.set("b", [])
+    cache.get("a")
+    cache.set("c", [])
+    assert cache.get("b") is None
+    assert cache.get("a") == [] and cache.get("c") == []
+    assert cache.stats()["entries"] == 2
+
+def test_persistent_cache_survives_restart_until_ttl(tmp_path, clock):
+    path = str(tmp_path / "cache" / "web.sqlite")
+    documents = FakeWebSearchBackend().search("수면")
+    WebSearchCache(ttl_seconds=60, path=path).set("수면", documents)
+
+    restarted = WebSearchCache(ttl_seconds=60, path=path)
+    assert restarted.stats()["persistent"] is True
+    assert [doc.page_content for doc in restarted.get("수면")] == [doc.page_content for doc in documents]
+    assert restarted.get("수면")[0].metadata == documents[0].metadata
+
+    clock.now += 61
+    # 만료된 행은 시작할 때 삭제
+    assert WebSearchCache(ttl_seconds=60, path=path).get("수면") is None
+
+def test_client_returns_cached_results_for_normalized_query(clock):
+    backend = FakeWebSearchBackend()
+    client = WebSearchClient(backend, cache=WebSearchCache())
+    first = client.search("혈당 관리?")
+    assert client.search("  혈당   관리 ") == first
+    assert asyncio.run(client.asearch("혈당 관리")) == first
+    assert backend.calls == 1
+    assert client.stats()["cache"]["hits"] == 2
+
+def test_concurrent_sync_searches_share_one_backend_call():
+    backend = FakeWebSearchBackend(latency=0.2)
+    client = WebSearchClient(backend, timeout=2.0)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(client.search("단백질"))) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(results) == 5 and all(result == results[0] for result in results)
+    assert backend.calls == 1
+    assert client.stats()["coalesced"] == 4
+
+def test_concurrent_async_searches_share_one_backend_call():
+    backend = FakeWebSearchBackend(latency=0.1)
+    client = WebSearchClient(backend, timeout=2.0)
+
+    async def run():
+        return await asyncio.gather(*(client.asearch("단백질") for _ in range(5)))
+
+    results = asyncio.run(run())
+    assert all(result == results[0] for result in results)
+    stats = client.stats()
+    assert (backend.calls, stats["backend_calls"], stats["coalesced"]) == (1, 1, 4)
+
+def test_rate_limited_search_raises():
+    client = WebSearchClient(FakeWebSearchBackend(), limiter=TokenBucket(rate=0.01, capacity=1), timeout=0.1)
+    client.search("첫 번째")
+    with pytest.raises(WebSearchRateLimited):
+        client.search("두 번째")
+    with pytest.raises(WebSearchRateLimited):
+        asyncio.run(client.asearch("세 번째"))
+    assert client.stats()["rate_limited"] == 2
+
+def test_token_bucket_refuses_without_consuming():
+    bucket = TokenBucket(rate=20, capacity=1)
+    assert bucket.acquire(timeout=0)
+    assert not bucket.acquire(timeout=0)
+    # 거절된 요청은 토큰을 예약하지 않으므로 다음 토큰은 1/rate 초 뒤에 사용 가능
+    assert bucket.acquire(timeout=0.2)
+
+def test_sync_timeout_is_counted():
+    backend = FakeWebSearchBackend(latency=1.0, timeout=0.3)
+    client = WebSearchClient(backend, timeout=0.05)
+    with pytest.raises(TimeoutError):
+        client.search("느린 검색")
+    assert client.stats()["timeouts"] == 1
+
+def test_async_timeout_cancels_abandoned_backend_call():
+    backend = FakeWebSearchBackend(latency=1.0)
+    client = WebSearchClient(backend, timeout=0.05)
+
+    async def run():
+        with pytest.raises(TimeoutError):
+            await client.asearch("느린 검색")
+        await asyncio.sleep(0)
+        return dict(client._apending), dict(client._awaiters)
+
+    assert asyncio.run(run()) == ({}, {})
+    assert backend.calls == 0
+    assert client.stats()["timeouts"] == 1
+
+def test_backend_errors_are_counted_and_not_cached(clock):
+    backend = FailingBackend()
+    client = WebSearchClient(backend, cache=WebSearchCache())
+    for _ in range(2):
+        with pytest.raises(RuntimeError):
+            client.search("오류")
+    assert backend.calls == 2
+    assert client.stats()["errors"] == 2
+
+def make_config(**overrides):
+    values = dict(
+        WEB_SEARCH_BACKEND="fake", WEB_SEARCH_CALL_TIMEOUT=1.0, WEB_SEARCH_CACHE_ENABLED=True,
+        WEB_SEARCH_CACHE_TTL_SECONDS=60, WEB_SEARCH_CACHE_MAX_ENTRIES=10, WEB_SEARCH_CACHE_PATH="",
+        WEB_SEARCH_RATE_PER_SECOND=5.0, WEB_SEARCH_BURST=2, TAVILY_API_KEY="",
+    )
+    values.update(overrides)
+    return SimpleNamespace(**values)
+
+def test_build_client_from_config():
+    client = build_web_search_client(make_config())
+    assert isinstance(client.backend, FakeWebSearchBackend)
+    assert client.cache.stats()["max_entries"] == 10
+    assert client.limiter.capacity == 2
+    assert client.timeout == 1.0
+
+    plain = build_web_search_client(make_config(WEB_SEARCH_CACHE_ENABLED=False, WEB_SEARCH_RATE_PER_SECOND=0))
+    assert plain.cache is None and plain.limiter is None
+    assert plain.stats()["cache"] == {}
+
+def test_unknown_backend_is_rejected():
+    with pytest.raises(ValueError):
+        build_web_search_backend("bing", make_config())
@@ -1,61 +1,141 @@
-from typing import List
-from langchain_core.tools import tool
+from typing import List, Optional
+from langchain_core.tools import StructuredTool
 from langchain_core.documents import Document
-from langchain_community.retrievers import TavilySearchAPIRetriever
 
+from database.category_router import CATEGORIES, route_categories
 from database.vectordb_manager import VectorDBManager
+from tools.web_search_backends import WebSearchRateLimited, build_web_search_client
 from config import Config
 
 config = Config()
 db_manager = VectorDBManager()
 
-@tool
-def health_search(query: str) -> List[Document]:
-    """건강 관련 문서를 검색합니다."""
+# 검색 결과가 없거나 실패했을 때 반환하는 안내 문서의 출처 표시
+FALLBACK_SOURCE = "fallback"
+
+def fallback_document(message: str) -> Document:
+    """검색 결과 대신 반환하는 안내 문서"""
+    return Document(page_content=message, metadata={"source": FALLBACK_SOURCE})
+
+def is_fallback(document: Document) -> bool:
+    """검색 결과가 아닌 안내 문서인지 확인"""
+    return document.metadata.get("source") == FALLBACK_SOURCE
+
+def document_relevance(document: Document) -> Optional[float]:
+    """검색 결과 문서의 질문 유사도 (벡터 검색 점수가 없는 문서는 None)"""
+    for key in ("relevance_score", "similarity_score"):
+        if key in document.metadata:
+            return document.metadata[key]
+    return None
+
+def _search_categories(query: str, categories: Optional[List[str]]) -> List[str]:
+    """검색할 카테고리 (지정하지 않으면 질문 키워드로 추정, 빈 리스트는 전체 검색)"""
+    if categories:
+        # 알 수 없는 카테고리는 무시 (retriever 캐시가 임의의 값으로 늘어나지 않도록)
+        return [category for category in categories if category in CATEGORIES]
+    if config.CATEGORY_ROUTING_ENABLED:
+        return route_categories(query, config.CATEGORY_ROUTER_MAX_CATEGORIES)
+    return []
+
+def _health_search(query: str, categories: Optional[List[str]] = None) -> List[Document]:
+    """건강 관련 문서를 검색합니다. categories 로 검색할 문서 분류(exercise, nutrition, lifestyle, hiking, personalization)를 제한할 수 있습니다."""
     try:
-        retriever = db_manager.load_collection("health_data")
-        docs = retriever.invoke(query)
+        docs = []
+        categories = _search_categories(query, categories)
+        if categories:
+            docs = db_manager.get_retriever("health_data", categories=categories).invoke(query)
+        if not docs:
+            # 카테고리 추정이 틀렸거나 해당 카테고리에 문서가 없으면 전체 검색
+            docs = db_manager.load_collection("health_data").invoke(query)
         
         if len(docs) > 0:
             return docs
         
-        return [Document(page_content="관련 건강 정보를 찾을 수 없습니다.")]
+        return [fallback_document("관련 건강 정보를 찾을 수 없습니다.")]
     except Exception as e:
         print(f"건강 데이터 검색 중 오류: {e}")
-        return [Document(page_content="건강 데이터 검색 중 오류가 발생했습니다.")]
+        return [fallback_document("건강 데이터 검색 중 오류가 발생했습니다.")]
 
-# 웹 검색 설정
+async def _ahealth_search(query: str, categories: Optional[List[str]] = None) -> List[Document]:
+    """건강 관련 문서를 검색합니다. categories 로 검색할 문서 분류(exercise, nutrition, lifestyle, hiking, personalization)를 제한할 수 있습니다."""
+    try:
+        docs = []
+        categories = _search_categories(query, categories)
+        if categories:
+            docs = await db_manager.get_retriever("health_data", categories=categories).ainvoke(query)
+        if not docs:
+            docs = await db_manager.load_collection("health_data").ainvoke(query)
+        
+        if len(docs) > 0:
+            return docs
+        
+        return [fallback_document("관련 건강 정보를 찾을 수 없습니다.")]
+    except Exception as e:
+        print(f"건강 데이터 검색 중 오류: {e}")
+        return [fallback_document("건강 데이터 검색 중 오류가 발생했습니다.")]
+
+health_search = StructuredTool.from_function(
+    func=_health_search,
+    coroutine=_ahealth_search,
+    name="health_search",
+)
+
+# 웹 검색 설정 (검색어 캐시, 요청 제한, 호출 시간 제한 적용)
 try:
-    web_retriever = TavilySearchAPIRetriever(k=5, api_key=config.TAVILY_API_KEY)
+    web_client = build_web_search_client(config)
 except Exception as e:
     print(f"웹 검색 설정 오류: {e}")
-    web_retriever = None
+    web_client = None
 
-@tool
-def web_search(query: str) -> List[Document]:
+def _format_web_docs(docs: List[Document]) -> List[Document]:
+    """웹 검색 결과를 출처가 포함된 Document로 변환"""
+    formatted_docs = []
+    for doc in docs:
+        formatted_docs.append(
+            Document(
+                page_content=f'<Document href="{doc.metadata.get("source", "Unknown")}"/>\n{doc.page_content}\n</Document>',
+                metadata={"source": "web search", "url": doc.metadata.get("source", "Unknown")}
+            )
+        )
+    
+    if len(formatted_docs) > 0:
+        return formatted_docs
+    
+    return [fallback_document("관련 정보를 웹에서 찾을 수 없습니다.")]
+
+def _web_search(query: str) -> List[Document]:
     """데이터베이스에 없는 정보 또는 최신 건강 정보를 웹에서 검색합니다."""
-    if not web_retriever:
-        return [Document(page_content="웹 검색 기능을 사용할 수 없습니다. TAVILY_API_KEY를 확인하세요.")]
+    if not web_client:
+        return [fallback_document("웹 검색 기능을 사용할 수 없습니다. TAVILY_API_KEY를 확인하세요.")]
     
     try:
-        docs = web_retriever.invoke(query)
-        
-        formatted_docs = []
-        for doc in docs:
-            formatted_docs.append(
-                Document(
-                    page_content=f'<Document href="{doc.metadata.get("source", "Unknown")}"/>\n{doc.page_content}\n</Document>',
-                    metadata={"source": "web search", "url": doc.metadata.get("source", "Unknown")}
-                )
-            )
-        
-        if len(formatted_docs) > 0:
-            return formatted_docs
-        
-        return [Document(page_content="관련 정보를 웹에서 찾을 수 없습니다.")]
+        return _format_web_docs(web_client.search(query))
+    except WebSearchRateLimited as e:
+        print(f"웹 검색 건너뜀: {e}")
+        return [fallback_document("웹 검색 요청이 많아 지금은 검색할 수 없습니다.")]
     except Exception as e:
         print(f"웹 검색 중 오류: {e}")
-        return [Document(page_content="웹 검색 중 오류가 발생했습니다.")]
+        return [fallback_document("웹 검색 중 오류가 발생했습니다.")]
+
+async def _aweb_search(query: str) -> List[Document]:
+    """데이터베이스에 없는 정보 또는 최신 건강 정보를 웹에서 검색합니다."""
+    if not web_client:
+        return [fallback_document("웹 검색 기능을 사용할 수 없습니다. TAVILY_API_KEY를 확인하세요.")]
+    
+    try:
+        return _format_web_docs(await web_client.asearch(query))
+    except WebSearchRateLimited as e:
+        print(f"웹 검색 건너뜀: {e}")
+        return [fallback_document("웹 검색 요청이 많아 지금은 검색할 수 없습니다.")]
+    except Exception as e:
+        print(f"웹 검색 중 오류: {e}")
+        return [fallback_document("웹 검색 중 오류가 발생했습니다.")]
+
+web_search = StructuredTool.from_function(
+    func=_web_search,
+    coroutine=_aweb_search,
+    name="web_search",
+)
 
 # 현재 활성화된 도구 목록
-tools = [health_search, web_search] 
\ No newline at end of file
+tools = [health_search, web_search]
@@ -0,0 +1,379 @@
+import asyncio
+import json
+import math
+import os
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from abc import ABC, abstractmethod
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from typing import Dict, List, Optional
+
+from langchain_core.documents import Document
+
+from utils.cache import LRUCache
+
+# 사용 가능한 웹 검색 백엔드 종류
+WEB_SEARCH_BACKENDS = ("tavily", "fake")
+
+def normalize_query(query: str) -> str:
+    """캐시 키용 검색어 정규화 (유니코드 정규화, 소문자, 공백 정리, 끝 문장부호 제거)"""
+    text = re.sub(r"\s+", " ", unicodedata.normalize("NFKC", query).lower()).strip()
+    return text.rstrip("?!.~ ")
+
+class WebSearchBackend(ABC):
+    """웹 검색 백엔드 인터페이스
+
+    search 는 metadata["source"] 에 URL 이 담긴 Document 목록을 반환합니다.
+    asearch 를 구현하지 않으면 search 를 스레드에서 실행합니다.
+    호출이 멈춰 스레드를 계속 차지하지 않도록 search 는 timeout 초 안에 끝나야 합니다.
+    """
+
+    name = "base"
+
+    @abstractmethod
+    def search(self, query: str) -> List[Document]:
+        """검색 결과 Document 목록"""
+
+    async def asearch(self, query: str) -> List[Document]:
+        return await asyncio.to_thread(self.search, query)
+
+class TavilyBackend(WebSearchBackend):
+    """Tavily 검색 API 백엔드"""
+
+    name = "tavily"
+
+    def __init__(self, api_key: str, k: int = 5, timeout: float = 6.0):
+        from langchain_community.retrievers import TavilySearchAPIRetriever
+
+        # HTTP 요청 시간 제한 (tavily 클라이언트는 정수 초만 받음)
+        self.retriever = TavilySearchAPIRetriever(
+            k=k, api_key=api_key, kwargs={"timeout": max(1, math.ceil(timeout))}
+        )
+
+    def search(self, query: str) -> List[Document]:
+        return self.retriever.invoke(query)
+
+    async def asearch(self, query: str) -> List[Document]:
+        return await self.retriever.ainvoke(query)
+
+class FakeWebSearchBackend(WebSearchBackend):
+    """테스트/벤치마크용 가짜 웹 검색 백엔드 (고정 지연 시간, 네트워크 호출 없음)
+
+    latency 가 timeout 보다 길면 timeout 초 뒤 TimeoutError 를 발생시킵니다.
+    """
+
+    name = "fake"
+
+    def __init__(self, latency: float = 0.0, k: int = 3, timeout: Optional[float] = None):
+        self.latency = latency
+        self.k = k
+        self.timeout = timeout
+        self.calls = 0
+
+    def _check_timeout(self) -> None:
+        if self.timeout is not None and self.latency > self.timeout:
+            raise TimeoutError(f"웹 검색 시간 초과 ({self.timeout}초)")
+
+    def _delay(self) -> float:
+        return self.latency if self.timeout is None else min(self.latency, self.timeout)
+
+    def _results(self, query: str) -> List[Document]:
+        self.calls += 1
+        return [
+            Document(
+                page_content=f"{query} 에 대한 웹 검색 결과 {i + 1}",
+                metadata={"source": f"https://example.com/search/{i + 1}"}
+            )
+            for i in range(self.k)
+        ]
+
+    def search(self, query: str) -> List[Document]:
+        time.sleep(self._delay())
+        self._check_timeout()
+        return self._results(query)
+
+    async def asearch(self, query: str) -> List[Document]:
+        await asyncio.sleep(self._delay())
+        self._check_timeout()
+        return self._results(query)
+
+class WebSearchCache:
+    """정규화된 검색어 기준 웹 검색 결과 TTL 캐시
+
+    메모리 LRU 캐시를 먼저 확인하고, path 가 주어지면 SQLite 에도 저장하여
+    재시작 후에도 ttl_seconds 동안 결과를 재사용합니다.
+    """
+
+    def __init__(self, ttl_seconds: float = 86400, max_entries: int = 1000, path: Optional[str] = None):
+        self.ttl_seconds = ttl_seconds
+        self._memory = LRUCache(max_size=max_entries, ttl_seconds=ttl_seconds)
+        self._conn = None
+        self._lock = threading.Lock()
+        if path:
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._conn = sqlite3.connect(path, check_same_thread=False)
+            self._conn.execute(
+                """CREATE TABLE IF NOT EXISTS web_search_cache (
+                    key TEXT PRIMARY KEY,
+                    results TEXT NOT NULL,
+                    created_at REAL NOT NULL
+                )"""
+            )
+            self._conn.execute("DELETE FROM web_search_cache WHERE created_at < ?", (time.time() - ttl_seconds,))
+            self._conn.commit()
+
+    @staticmethod
+    def _dump(documents: List[Document]) -> str:
+        return json.dumps(
+            [{"page_content": doc.page_content, "metadata": doc.metadata} for doc in documents],
+            ensure_ascii=False
+        )
+
+    @staticmethod
+    def _load(payload: str) -> List[Document]:
+        return [Document(page_content=item["page_content"], metadata=item["metadata"]) for item in json.loads(payload)]
+
+    def get(self, key: str) -> Optional[List[Document]]:
+        documents = self._memory.get(key)
+        if documents is not None or self._conn is None:
+            return documents
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT results, created_at FROM web_search_cache WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None or time.time() - row[1] > self.ttl_seconds:
+            return None
+        documents = self._load(row[0])
+        self._memory.set(key, documents)
+        return documents
+
+    def set(self, key: str, documents: List[Document]) -> None:
+        self._memory.set(key, documents)
+        if self._conn is None:
+            return
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO web_search_cache (key, results, created_at) VALUES (?, ?, ?)",
+                (key, self._dump(documents), time.time())
+            )
+            self._conn.commit()
+
+    def stats(self) -> Dict:
+        return {**self._memory.stats(), "persistent": self._conn is not None}
+
+class TokenBucket:
+    """토큰 버킷 요청 제한기 (초당 rate 개, 최대 capacity 개까지 누적)"""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _reserve(self) -> float:
+        """토큰 하나를 예약하고 사용 가능해질 때까지 기다려야 하는 시간(초)을 반환"""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            return 0.0 if self._tokens >= 0 else -self._tokens / self.rate
+
+    def _cancel(self) -> None:
+        with self._lock:
+            self._tokens += 1
+
+    def acquire(self, timeout: Optional[float] = None) -> bool:
+        """토큰을 얻을 때까지 대기 (timeout 안에 얻을 수 없으면 대기하지 않고 False)"""
+        wait = self._reserve()
+        if timeout is not None and wait > timeout:
+            self._cancel()
+            return False
+        if wait:
+            time.sleep(wait)
+        return True
+
+    async def aacquire(self, timeout: Optional[float] = None) -> bool:
+        """토큰을 얻을 때까지 대기 (비동기)"""
+        wait = self._reserve()
+        if timeout is not None and wait > timeout:
+            self._cancel()
+            return False
+        if wait:
+            try:
+                await asyncio.sleep(wait)
+            except asyncio.CancelledError:
+                # 토큰을 쓰기 전에 취소되면 예약을 되돌림
+                self._cancel()
+                raise
+        return True
+
+class WebSearchRateLimited(Exception):
+    """요청 제한으로 웹 검색을 실행하지 않음"""
+
+class WebSearchClient:
+    """캐시, 요청 제한, 호출 시간 제한을 적용한 웹 검색 클라이언트
+
+    같은 검색어(정규화 기준)는 캐시된 결과를 반환하고, 캐시에 없는 같은 검색어가
+    동시에 들어오면 백엔드 호출 하나를 함께 기다립니다. 백엔드 호출은 토큰 버킷으로
+    제한하며, 호출자는 토큰 대기를 포함해 최대 timeout 초까지 기다립니다.
+    비동기 호출은 기다리는 호출자가 모두 떠나면 (시간 초과/취소) 백엔드 호출도 취소합니다.
+    동기 호출은 스레드를 중단할 수 없으므로 백엔드 자체의 timeout 에 의존합니다.
+    """
+
+    def __init__(self, backend: WebSearchBackend, cache: Optional[WebSearchCache] = None,
+                 limiter: Optional[TokenBucket] = None, timeout: float = 6.0):
+        self.backend = backend
+        self.cache = cache
+        self.limiter = limiter
+        self.timeout = timeout
+        # 동기 호출의 시간 제한용 스레드 풀
+        self._executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="web_search")
+        self._lock = threading.Lock()
+        # 진행 중인 백엔드 호출 (정규화된 검색어 -> Future / Task)
+        self._pending: Dict[str, Future] = {}
+        self._apending: Dict[str, asyncio.Task] = {}
+        # 비동기 백엔드 호출별 기다리는 호출자 수
+        self._awaiters: Dict[asyncio.Task, int] = {}
+        self._counters = {"backend_calls": 0, "coalesced": 0, "timeouts": 0, "rate_limited": 0, "errors": 0}
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self._counters[name] += 1
+
+    def _cached(self, key: str) -> Optional[List[Document]]:
+        return self.cache.get(key) if self.cache else None
+
+    def _store(self, key: str, documents: List[Document]) -> List[Document]:
+        if self.cache:
+            self.cache.set(key, documents)
+        return documents
+
+    def _fetch(self, query: str, key: str) -> List[Document]:
+        if self.limiter and not self.limiter.acquire(self.timeout):
+            self._count("rate_limited")
+            raise WebSearchRateLimited("웹 검색 요청 한도를 초과했습니다.")
+        self._count("backend_calls")
+        try:
+            documents = self.backend.search(query)
+        except Exception:
+            self._count("errors")
+            raise
+        return self._store(key, documents)
+
+    async def _afetch(self, query: str, key: str) -> List[Document]:
+        if self.limiter and not await self.limiter.aacquire(self.timeout):
+            self._count("rate_limited")
+            raise WebSearchRateLimited("웹 검색 요청 한도를 초과했습니다.")
+        self._count("backend_calls")
+        try:
+            # 기다리는 호출자가 모두 시간 초과로 떠나도 백엔드 호출이 남지 않도록 제한
+            documents = await asyncio.wait_for(self.backend.asearch(query), self.timeout)
+        except Exception:
+            self._count("errors")
+            raise
+        return self._store(key, documents)
+
+    def _release(self, pending: Dict, key: str, job) -> None:
+        with self._lock:
+            if pending.get(key) is job:
+                del pending[key]
+
+    def search(self, query: str) -> List[Document]:
+        key = normalize_query(query)
+        cached = self._cached(key)
+        if cached is not None:
+            return cached
+
+        with self._lock:
+            future = self._pending.get(key)
+            if future is None:
+                future = self._executor.submit(self._fetch, query, key)
+                self._pending[key] = future
+                future.add_done_callback(lambda done: self._release(self._pending, key, done))
+            else:
+                self._counters["coalesced"] += 1
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeoutError:
+            self._count("timeouts")
+            raise TimeoutError(f"웹 검색 시간 초과 ({self.timeout}초)")
+
+    async def asearch(self, query: str) -> List[Document]:
+        key = normalize_query(query)
+        cached = self._cached(key)
+        if cached is not None:
+            return cached
+
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            task = self._apending.get(key)
+            if task is None or task.get_loop() is not loop:
+                task = loop.create_task(self._afetch(query, key))
+                self._apending[key] = task
+                task.add_done_callback(lambda done: self._release(self._apending, key, done))
+                # 기다리는 호출자가 없어도 예외가 처리된 것으로 표시
+                task.add_done_callback(lambda done: done.cancelled() or done.exception())
+            else:
+                self._counters["coalesced"] += 1
+            self._awaiters[task] = self._awaiters.get(task, 0) + 1
+        try:
+            # 한 호출자의 시간 초과/취소가 함께 기다리는 다른 호출자에게 번지지 않도록 shield
+            return await asyncio.wait_for(asyncio.shield(task), self.timeout)
+        except asyncio.TimeoutError:
+            self._count("timeouts")
+            raise TimeoutError(f"웹 검색 시간 초과 ({self.timeout}초)")
+        finally:
+            with self._lock:
+                self._awaiters[task] -= 1
+                last = self._awaiters[task] == 0
+                if last:
+                    del self._awaiters[task]
+                    # 이후 같은 검색어 호출은 취소될 작업에 합류하지 않고 새로 시작
+                    if self._apending.get(key) is task:
+                        del self._apending[key]
+            # 마지막 호출자가 떠나면 백엔드 호출(과 토큰 대기)을 취소
+            if last and not task.done():
+                task.cancel()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            counters = dict(self._counters)
+        return {
+            "backend": self.backend.name,
+            **counters,
+            "cache": self.cache.stats() if self.cache else {},
+        }
+
+def build_web_search_backend(backend_type: str, config) -> WebSearchBackend:
+    """설정된 종류의 웹 검색 백엔드 생성"""
+    if backend_type == "tavily":
+        return TavilyBackend(api_key=config.TAVILY_API_KEY, k=5, timeout=config.WEB_SEARCH_CALL_TIMEOUT)
+    if backend_type == "fake":
+        return FakeWebSearchBackend(timeout=config.WEB_SEARCH_CALL_TIMEOUT)
+    raise ValueError(f"지원하지 않는 웹 검색 백엔드입니다: {backend_type} (가능한 값: {', '.join(WEB_SEARCH_BACKENDS)})")
+
+def build_web_search_client(config, backend: Optional[WebSearchBackend] = None) -> WebSearchClient:
+    """설정값으로 캐시/요청 제한이 적용된 웹 검색 클라이언트 생성"""
+    cache = None
+    if config.WEB_SEARCH_CACHE_ENABLED:
+        cache = WebSearchCache(
+            ttl_seconds=config.WEB_SEARCH_CACHE_TTL_SECONDS,
+            max_entries=config.WEB_SEARCH_CACHE_MAX_ENTRIES,
+            path=config.WEB_SEARCH_CACHE_PATH or None
+        )
+    limiter = None
+    if config.WEB_SEARCH_RATE_PER_SECOND > 0:
+        limiter = TokenBucket(config.WEB_SEARCH_RATE_PER_SECOND, config.WEB_SEARCH_BURST)
+    return WebSearchClient(
+        backend or build_web_search_backend(config.WEB_SEARCH_BACKEND, config),
+        cache=cache,
+        limiter=limiter,
+        timeout=config.WEB_SEARCH_CALL_TIMEOUT
+    )
@@ -1,69 +1,277 @@
 import json
+import multiprocessing
 import os
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 from langchain_core.documents import Document
+from langchain_text_splitters import RecursiveCharacterTextSplitter
 from config import Config
+from utils.token_counter import get_token_counter
 
-def load_health_documents(data_files=None):
+# 기본 데이터 파일 목록
+DEFAULT_DATA_FILES = [
+    'exercise.json',
+    'nutrition.json',
+    'lifestyle.json',
+    'hiking.json',
+    'personalization.json'
+]
+
+# JSON 배열에서 항목 뒤에 올 수 있는 문자
+_ARRAY_DELIMITERS = " \t\r\n,]"
+
+_STREAM_DONE = "__done__"
+_STREAM_ERROR = "__error__"
+
+def iter_json_array(file_path: str, chunk_size: int = 1 << 16) -> Iterator[Any]:
+    """JSON 배열 파일의 항목을 하나씩 반환합니다 (파일 전체를 메모리에 올리지 않음).
+
+    chunk_size 만큼 읽은 버퍼에서 json.JSONDecoder.raw_decode 로 항목 단위 파싱을 하고,
+    항목이 버퍼 경계에서 잘리면 다음 청크를 이어 붙여 다시 시도합니다.
+    숫자 항목은 뒤에 구분자가 보일 때까지 읽은 뒤에 반환합니다.
+    """
+    decoder = json.JSONDecoder()
+    with open(file_path, 'r', encoding='utf-8') as f:
+        buffer, pos, eof, started = "", 0, False, False
+
+        def read_more():
+            nonlocal buffer, pos, eof
+            chunk = f.read(chunk_size)
+            if not chunk:
+                eof = True
+            buffer, pos = buffer[pos:] + chunk, 0
+
+        while True:
+            # 공백과 항목 구분자 건너뛰기
+            while True:
+                while pos < len(buffer) and buffer[pos] in " \t\r\n,":
+                    pos += 1
+                if pos < len(buffer) or eof:
+                    break
+                read_more()
+
+            if pos >= len(buffer):
+                if started:
+                    raise ValueError(f"JSON 배열이 닫히지 않았습니다: {file_path}")
+                return
+
+            if not started:
+                if buffer[pos] != "[":
+                    raise ValueError(f"JSON 배열 파일이 아닙니다: {file_path}")
+                started = True
+                pos += 1
+                continue
+            if buffer[pos] == "]":
+                return
+
+            try:
+                item, end = decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+                read_more()
+                continue
+            # 숫자는 앞부분만으로도 파싱되므로 ("-0.25" 의 "-0", "1e5" 의 "1") 뒤에 구분자가
+            # 올 때까지 더 읽고 다시 파싱
+            if not eof and isinstance(item, (int, float)) and not isinstance(item, bool) \
+                    and (end == len(buffer) or buffer[end] not in _ARRAY_DELIMITERS):
+                read_more()
+                continue
+            yield item
+            pos = end
+
+def iter_jsonl(file_path: str) -> Iterator[Any]:
+    """JSONL 파일(한 줄에 JSON 하나)의 항목을 하나씩 반환합니다."""
+    with open(file_path, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                yield json.loads(line)
+
+def iter_json_items(file_path: str) -> Iterator[Any]:
+    """확장자에 따라 JSON 배열 또는 JSONL 파일을 스트리밍합니다."""
+    if file_path.endswith(('.jsonl', '.ndjson')):
+        return iter_jsonl(file_path)
+    return iter_json_array(file_path)
+
+def item_to_document(item: Dict, filename: str) -> Document:
+    """JSON 항목을 Document 객체로 변환합니다."""
+    category = os.path.splitext(filename)[0]
+    return Document(
+        page_content=f"제목: {item.get('title', 'Unknown')}\n\n내용: {item.get('content', '')}",
+        metadata={
+            "source": filename,
+            "category": category,
+            "id": item.get('id', 'unknown'),
+            "title": item.get('title', 'Unknown')
+        }
+    )
+
+def build_text_splitter(chunk_size: int, chunk_overlap: int) -> RecursiveCharacterTextSplitter:
+    """토큰 수 기준 텍스트 분할기 (문단 -> 줄 -> 문장 -> 단어 순으로 경계를 찾음)"""
+    return RecursiveCharacterTextSplitter(
+        chunk_size=chunk_size,
+        chunk_overlap=chunk_overlap,
+        length_function=get_token_counter(),
+        separators=["\n\n", "\n", ". ", "? ", "! ", " ", ""],
+        keep_separator="end",
+    )
+
+def item_to_documents(item: Dict, filename: str,
+                      splitter: Optional[RecursiveCharacterTextSplitter] = None) -> List[Document]:
+    """JSON 항목을 청크 단위 Document 목록으로 변환합니다.
+
+    splitter 가 없으면 항목 하나를 Document 하나로 변환합니다. 청크마다 제목을 앞에 붙이고
+    원본 메타데이터(id, title, category 등)에 chunk_index, chunk_count 를 추가합니다.
+    """
+    document = item_to_document(item, filename)
+    if splitter is None:
+        return [document]
+
+    content = item.get('content', '')
+    chunks = splitter.split_text(content) or [content]
+    return [
+        Document(
+            page_content=f"제목: {item.get('title', 'Unknown')}\n\n내용: {chunk}",
+            metadata={**document.metadata, "chunk_index": index, "chunk_count": len(chunks)}
+        )
+        for index, chunk in enumerate(chunks)
+    ]
+
+def _chunking_settings(chunking: Optional[bool]) -> Optional[Tuple[int, int]]:
+    """청크 분할 설정 (chunk_size, chunk_overlap), 분할하지 않으면 None"""
+    config = Config()
+    if chunking is None:
+        chunking = config.CHUNKING_ENABLED
+    return (config.CHUNK_SIZE_TOKENS, config.CHUNK_OVERLAP_TOKENS) if chunking else None
+
+def iter_file_documents(filename: str, strict: bool = False,
+                        chunk_settings: Optional[Tuple[int, int]] = None,
+                        data_dir: Optional[str] = None) -> Iterator[Document]:
+    """data 폴더의 파일 하나를 Document 로 하나씩 변환하여 반환합니다.
+
+    strict 이면 파일이 없거나 파싱에 실패했을 때 예외를 발생시킵니다 (기본값은 출력 후 건너뜀).
+    chunk_settings 가 주어지면 (chunk_size, chunk_overlap) 토큰 단위로 청크를 나눕니다.
+    data_dir 의 기본값은 Config.DATA_DIR 입니다.
+    """
+    file_path = os.path.join(data_dir or Config().DATA_DIR, filename)
+
+    if not os.path.exists(file_path):
+        if strict:
+            raise FileNotFoundError(f"파일을 찾을 수 없습니다: {file_path}")
+        print(f"파일을 찾을 수 없습니다: {file_path}")
+        return
+
+    splitter = build_text_splitter(*chunk_settings) if chunk_settings else None
+    count = chunk_count = 0
+    try:
+        for item in iter_json_items(file_path):
+            for document in item_to_documents(item, filename, splitter):
+                yield document
+                chunk_count += 1
+            count += 1
+        if splitter is None:
+            print(f"{filename}: {count}개 문서 로드 완료")
+        else:
+            print(f"{filename}: {count}개 문서 로드 완료 ({chunk_count}개 청크)")
+    except Exception as e:
+        if strict:
+            raise
+        print(f"{filename} 로드 중 오류: {e}")
+
+def _init_stream_worker(queue):
+    global _worker_queue
+    _worker_queue = queue
+
+def _stream_file_to_queue(filename: str, data_dir: str, batch_size: int, strict: bool,
+                          chunk_settings: Optional[Tuple[int, int]]) -> None:
+    """워커 프로세스: 파일을 스트리밍(및 청크 분할)하며 batch_size 개씩 큐에 넣음 (큐가 가득 차면 대기)
+
+    spawn 방식의 워커는 부모 프로세스의 Config 변경을 보지 못하므로, 경로와 청크 설정은
+    부모에서 확정한 값을 인자로 받습니다.
+    """
+    batch = []
+    try:
+        for doc in iter_file_documents(filename, strict, chunk_settings, data_dir):
+            # Document(pydantic) 대신 단순 튜플로 전달하여 프로세스 간 직렬화 비용을 줄임
+            batch.append((doc.page_content, doc.metadata))
+            if len(batch) >= batch_size:
+                _worker_queue.put(batch)
+                batch = []
+        if batch:
+            _worker_queue.put(batch)
+    except Exception as e:
+        _worker_queue.put((_STREAM_ERROR, f"{filename}: {e}"))
+    finally:
+        _worker_queue.put(_STREAM_DONE)
+
+def iter_health_documents(data_files: Optional[List[str]] = None, workers: Optional[int] = None,
+                          batch_size: int = 256, max_pending_batches: Optional[int] = None,
+                          strict: bool = False, chunking: Optional[bool] = None,
+                          data_dir: Optional[str] = None) -> Iterator[Document]:
+    """data 폴더의 JSON/JSONL 파일을 스트리밍하여 Document 를 하나씩 반환합니다.
+
+    여러 파일은 프로세스 풀에서 병렬로 파싱하며, 워커와 주고받는 배치 수를
+    max_pending_batches 로 제한하여 코퍼스 크기와 무관하게 메모리 사용량을 일정하게 유지합니다.
+    파일 간 순서는 보장되지 않습니다.
+
+    Args:
+        data_files (list, optional): 로드할 파일 목록. 기본값은 DEFAULT_DATA_FILES.
+        workers (int, optional): 파싱 프로세스 수. 기본값은 Config.DOCUMENT_LOADER_WORKERS.
+        batch_size (int): 워커가 한 번에 전달하는 문서 수
+        max_pending_batches (int, optional): 큐에 대기할 수 있는 최대 배치 수 (기본값: workers * 2)
+        strict (bool): 파일이 없거나 파싱에 실패하면 예외 발생 (병렬 실행 시 모든 파일 처리 후)
+        chunking (bool, optional): 토큰 단위 청크 분할 여부. 기본값은 Config.CHUNKING_ENABLED.
+        data_dir (str, optional): 파일이 있는 디렉터리. 기본값은 Config.DATA_DIR.
+    """
+    data_files = data_files or DEFAULT_DATA_FILES
+    data_dir = os.path.abspath(data_dir or Config().DATA_DIR)
+    chunk_settings = _chunking_settings(chunking)
+    workers = min(workers or Config().DOCUMENT_LOADER_WORKERS, len(data_files))
+
+    if workers <= 1:
+        for filename in data_files:
+            yield from iter_file_documents(filename, strict, chunk_settings, data_dir)
+        return
+
+    queue = multiprocessing.Queue(maxsize=max_pending_batches or workers * 2)
+    with multiprocessing.Pool(workers, initializer=_init_stream_worker, initargs=(queue,)) as pool:
+        result = pool.starmap_async(
+            _stream_file_to_queue,
+            [(filename, data_dir, batch_size, strict, chunk_settings) for filename in data_files]
+        )
+        remaining, errors = len(data_files), []
+        while remaining:
+            batch = queue.get()
+            if batch == _STREAM_DONE:
+                remaining -= 1
+            elif isinstance(batch, tuple) and batch[0] == _STREAM_ERROR:
+                errors.append(batch[1])
+            else:
+                for page_content, metadata in batch:
+                    yield Document(page_content=page_content, metadata=metadata)
+        result.get()
+    if errors:
+        raise ValueError("문서 파일 로드 실패: " + "; ".join(errors))
+
+def load_health_documents(data_files=None, chunking=None):
     """data 폴더의 JSON 파일을 로드하여 Document 객체로 변환합니다.
-    
+
     Args:
         data_files (list, optional): 로드할 JSON 파일 목록. 기본값은 None으로 모든 파일 로드.
-        
+        chunking (bool, optional): 토큰 단위 청크 분할 여부. 기본값은 Config.CHUNKING_ENABLED.
+
     Returns:
         list: Document 객체 리스트
     """
-    documents = []
-    
-    # 기본 데이터 파일 목록
-    if data_files is None:
-        data_files = [
-            'exercise.json',
-            'nutrition.json', 
-            'lifestyle.json',
-            'hiking.json',
-            'personalization.json'
-        ]
-    
-    for filename in data_files:
-        file_path = os.path.join(Config.DATA_DIR, filename)
-        
-        if not os.path.exists(file_path):
-            print(f"파일을 찾을 수 없습니다: {file_path}")
-            continue
-        
-        try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-            
-            # JSON 데이터를 Document 객체로 변환
-            category = filename.replace('.json', '')
-            
-            for item in data:
-                doc = Document(
-                    page_content=f"제목: {item.get('title', 'Unknown')}\n\n내용: {item.get('content', '')}",
-                    metadata={
-                        "source": filename,
-                        "category": category,
-                        "id": item.get('id', 'unknown'),
-                        "title": item.get('title', 'Unknown')
-                    }
-                )
-                documents.append(doc)
-            
-            print(f"{filename}: {len(data)}개 문서 로드 완료")
-            
-        except Exception as e:
-            print(f"{filename} 로드 중 오류: {e}")
-    
-    return documents
+    return list(iter_health_documents(data_files, chunking=chunking))
 
 def get_document_ids(documents):
     """문서 리스트에서 ID 목록을 추출합니다.
-    
+
     Args:
         documents (list): Document 객체 리스트
-        
+
     Returns:
         set: 문서 ID 집합
     """
-    return {doc.metadata.get("id") for doc in documents if doc.metadata.get("id") != "unknown"} 
\ No newline at end of file
+    return {doc.metadata.get("id") for doc in documents if doc.metadata.get("id") != "unknown"}
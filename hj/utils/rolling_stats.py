@@ -0,0 +1,317 @@
+import math
+import threading
+from collections import deque
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple, Union
+
+import pandas as pd
+
+class RunningStats:
+    """Welford 방식의 누적 통계 (평균, 분산, 최소/최대)
+
+    두 통계는 merge 로 합칠 수 있어 분/시간 단위 버킷을 임의 구간으로 묶을 수 있습니다.
+    """
+
+    __slots__ = ("count", "mean", "m2", "min", "max")
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def update(self, value: float) -> None:
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+
+    def merge(self, other: "RunningStats") -> "RunningStats":
+        """다른 통계를 합침 (Chan 등의 병렬 분산 공식)"""
+        if other.count == 0:
+            return self
+        if self.count == 0:
+            self.count, self.mean, self.m2 = other.count, other.mean, other.m2
+            self.min, self.max = other.min, other.max
+            return self
+        count = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / count
+        self.m2 += other.m2 + delta * delta * self.count * other.count / count
+        self.count = count
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        return self
+
+    @property
+    def variance(self) -> float:
+        """표본 분산 (pandas std 와 같은 ddof=1)"""
+        return self.m2 / (self.count - 1) if self.count > 1 else math.nan
+
+    @property
+    def std(self) -> float:
+        return math.sqrt(self.variance) if self.count > 1 else math.nan
+
+class _Bucket:
+    """한 시간 단위(분/시간)의 심박수 통계와 걸음 수 범위"""
+
+    __slots__ = ("heart_rate", "min_steps", "max_steps", "first_time", "last_time")
+
+    def __init__(self):
+        self.heart_rate = RunningStats()
+        self.min_steps = math.inf
+        self.max_steps = -math.inf
+        self.first_time = None
+        self.last_time = None
+
+    def merge(self, other: "_Bucket") -> "_Bucket":
+        self.heart_rate.merge(other.heart_rate)
+        self.min_steps = min(self.min_steps, other.min_steps)
+        self.max_steps = max(self.max_steps, other.max_steps)
+        if other.first_time is not None:
+            self.first_time = other.first_time if self.first_time is None else min(self.first_time, other.first_time)
+            self.last_time = other.last_time if self.last_time is None else max(self.last_time, other.last_time)
+        return self
+
+class _UserState:
+    """사용자별 버킷과 활동 구간 상태"""
+
+    def __init__(self):
+        self.minutes: Dict[pd.Timestamp, _Bucket] = {}
+        self.hours: Dict[pd.Timestamp, _Bucket] = {}
+        self.latest: Optional[pd.Timestamp] = None
+        # 진행 중인 활동 구간 상태 (get_activity_periods 와 같은 규칙)
+        self.prev_steps: Optional[int] = None
+        self.current_period: Optional[Dict] = None
+        self.periods: deque = deque()
+
+class RollingAggregator:
+    """사용자별 웨어러블 데이터 증분 집계기
+
+    샘플이 들어올 때마다 분/시간 버킷의 심박수 Welford 통계, 걸음 수 범위,
+    활동 구간 상태를 갱신합니다. "최근 1시간", "오늘", "최근 7일" 같은 요약은
+    전체 데이터를 다시 읽지 않고 보관 중인 버킷만 합쳐서 계산합니다.
+
+    - 최근 minute_retention 이내의 구간은 분 버킷을 사용하므로 시작 시각이 분 단위로 내림됩니다.
+    - 그보다 긴 구간은 시간 버킷을 사용하므로 시작 시각이 정시로 내림됩니다.
+    - 사용자별로 이미 반영한 가장 최근 시각 이전(같은 시각 포함)의 샘플은 무시하므로
+      재시도되거나 중복된 배치, 복원 직후 다시 들어온 샘플이 두 번 집계되지 않습니다.
+    """
+
+    WINDOWS = {
+        "last_hour": timedelta(hours=1),
+        "last_24_hours": timedelta(hours=24),
+        "last_7_days": timedelta(days=7),
+    }
+
+    def __init__(self, minute_retention: timedelta = timedelta(hours=3),
+                 hour_retention: timedelta = timedelta(days=8)):
+        self.minute_retention = minute_retention
+        self.hour_retention = hour_retention
+        self._users: Dict[str, _UserState] = {}
+        self._lock = threading.Lock()
+        # 사용자별 갱신 lock (복원과 추가를 직렬화, 항상 _lock 보다 먼저 획득)
+        self._user_locks: Dict[str, threading.Lock] = {}
+
+    # -------------------------------------------------------------------------
+    # 갱신
+    # -------------------------------------------------------------------------
+    def _user_lock(self, user_id: str) -> threading.Lock:
+        with self._lock:
+            return self._user_locks.setdefault(user_id, threading.Lock())
+
+    def add(self, user_id: str, df: pd.DataFrame) -> None:
+        """시간순으로 정렬된 샘플(timestamp, step_count, heart_rate)을 반영 (이미 반영한 시각 이전 샘플은 제외)"""
+        with self._user_lock(user_id):
+            self._add_locked(user_id, df)
+
+    def _add_locked(self, user_id: str, df: pd.DataFrame) -> None:
+        with self._lock:
+            state = self._users.setdefault(user_id, _UserState())
+            if df.empty:
+                return
+            if state.latest is not None:
+                df = df[df["timestamp"] > state.latest]
+            # 같은 시각 샘플은 저장소와 같이 마지막 값만 사용
+            df = df.drop_duplicates("timestamp", keep="last")
+            if df.empty:
+                return
+            self._add_buckets(state.minutes, df, "min")
+            self._add_buckets(state.hours, df, "h")
+            self._update_periods(state, df)
+            latest = df["timestamp"].iloc[-1]
+            state.latest = latest if state.latest is None else max(state.latest, latest)
+            self._prune(state)
+
+    def ensure_warm(self, store, user_id: str) -> None:
+        """처음 보는 사용자면 저장소의 최근 데이터로 상태를 채움 (재시작 후 첫 조회/기록 시)
+
+        확인과 복원을 사용자별 lock 안에서 함께 수행하므로 동시에 호출되어도 한 번만 복원합니다.
+        """
+        with self._user_lock(user_id):
+            with self._lock:
+                if user_id in self._users:
+                    return
+            latest = store.latest_timestamp(user_id)
+            if latest is not None:
+                for day_df in store.iter_range(user_id, latest - self.hour_retention, latest):
+                    self._add_locked(user_id, day_df)
+            with self._lock:
+                self._users.setdefault(user_id, _UserState())
+
+    @staticmethod
+    def _add_buckets(buckets: Dict[pd.Timestamp, _Bucket], df: pd.DataFrame, freq: str) -> None:
+        keys = df["timestamp"].dt.floor(freq)
+        grouped = df.groupby(keys, sort=False)
+        hr = grouped["heart_rate"]
+        steps = grouped["step_count"]
+        times = grouped["timestamp"]
+        aggregated = pd.DataFrame({
+            "count": hr.count(),
+            "mean": hr.mean(),
+            "m2": hr.var(ddof=0) * hr.count(),
+            "hr_min": hr.min(),
+            "hr_max": hr.max(),
+            "steps_min": steps.min(),
+            "steps_max": steps.max(),
+            "first_time": times.min(),
+            "last_time": times.max(),
+        })
+        for key, row in zip(aggregated.index, aggregated.itertuples(index=False)):
+            incoming = _Bucket()
+            incoming.heart_rate.count = int(row.count)
+            incoming.heart_rate.mean = float(row.mean)
+            incoming.heart_rate.m2 = float(row.m2)
+            incoming.heart_rate.min = float(row.hr_min)
+            incoming.heart_rate.max = float(row.hr_max)
+            incoming.min_steps = int(row.steps_min)
+            incoming.max_steps = int(row.steps_max)
+            incoming.first_time = row.first_time
+            incoming.last_time = row.last_time
+            bucket = buckets.get(key)
+            buckets[key] = incoming if bucket is None else bucket.merge(incoming)
+
+    @staticmethod
+    def _update_periods(state: _UserState, df: pd.DataFrame) -> None:
+        """걸음 수가 연속으로 증가하는 구간을 추적 (이전 샘플보다 과거인 샘플은 구간 계산에서 제외)"""
+        for ts, steps, hr in zip(df["timestamp"], df["step_count"].tolist(), df["heart_rate"].tolist()):
+            if state.latest is not None and ts <= state.latest:
+                continue
+            period = state.current_period
+            if state.prev_steps is not None and steps > state.prev_steps:
+                if period is None:
+                    period = state.current_period = {
+                        "start_time": ts, "start_steps": steps, "start_hr": hr,
+                        "hr_sum": 0, "hr_count": 0,
+                    }
+                period["end_time"], period["end_steps"], period["end_hr"] = ts, steps, hr
+                period["hr_sum"] += hr
+                period["hr_count"] += 1
+            elif period is not None:
+                duration = (period["end_time"] - period["start_time"]).total_seconds() / 60
+                if duration >= 1:
+                    state.periods.append({
+                        "start_time": period["start_time"],
+                        "start_steps": period["start_steps"],
+                        "start_hr": period["start_hr"],
+                        "end_time": period["end_time"],
+                        "end_steps": period["end_steps"],
+                        "end_hr": period["end_hr"],
+                        "duration_minutes": round(duration, 1),
+                        "steps_taken": period["end_steps"] - period["start_steps"],
+                        "avg_hr": round(period["hr_sum"] / period["hr_count"], 1),
+                    })
+                state.current_period = None
+            state.prev_steps = steps
+
+    def _prune(self, state: _UserState) -> None:
+        minute_cutoff = (state.latest - self.minute_retention).floor("min")
+        for key in [key for key in state.minutes if key < minute_cutoff]:
+            del state.minutes[key]
+        hour_cutoff = state.latest - self.hour_retention
+        hour_key_cutoff = hour_cutoff.floor("h")
+        for key in [key for key in state.hours if key < hour_key_cutoff]:
+            del state.hours[key]
+        while state.periods and state.periods[0]["start_time"] < hour_cutoff:
+            state.periods.popleft()
+
+    # -------------------------------------------------------------------------
+    # 조회
+    # -------------------------------------------------------------------------
+    def _window(self, state: _UserState, window: Union[str, timedelta],
+                now: Optional[datetime]) -> Tuple[pd.Timestamp, pd.Timestamp]:
+        """기간 이름/길이를 (시작, 끝) 시각으로 변환"""
+        end = pd.Timestamp(now) if now is not None else state.latest
+        if window == "today":
+            return end.normalize(), end
+        if isinstance(window, str):
+            if window not in self.WINDOWS:
+                raise ValueError(f"지원하지 않는 기간입니다: {window}")
+            window = self.WINDOWS[window]
+        return end - window, end
+
+    def _collect(self, state: _UserState, start: pd.Timestamp, end: pd.Timestamp) -> _Bucket:
+        if state.latest - start <= self.minute_retention:
+            buckets, start_key = state.minutes, start.floor("min")
+        else:
+            buckets, start_key = state.hours, start.floor("h")
+        total = _Bucket()
+        for key, bucket in buckets.items():
+            if start_key <= key <= end:
+                total.merge(bucket)
+        return total
+
+    def summary(self, user_id: str, window: Union[str, timedelta] = "last_24_hours",
+                now: Optional[datetime] = None) -> Dict:
+        """기간 요약 통계 (AppleWatchDataParser.get_summary_stats 와 같은 키)
+
+        window: "last_hour", "today", "last_24_hours", "last_7_days" 또는 timedelta
+        now: 기준 시각 (기본값: 사용자의 가장 최근 샘플 시각)
+        """
+        with self._lock:
+            state = self._users.get(user_id)
+            if state is None or state.latest is None:
+                return {}
+            total = self._collect(state, *self._window(state, window, now))
+
+        hr = total.heart_rate
+        if hr.count == 0:
+            return {}
+        if total.first_time.date() == total.last_time.date():
+            date_label = total.first_time.strftime('%Y-%m-%d')
+        else:
+            date_label = f"{total.first_time:%Y-%m-%d %H:%M} ~ {total.last_time:%Y-%m-%d %H:%M}"
+        duration_minutes = hr.count * 0.5  # 30초 간격
+        total_steps = int(total.max_steps - total.min_steps)
+        return {
+            'user_id': user_id,
+            'date': date_label,
+            'duration_minutes': duration_minutes,
+            'total_steps': total_steps,
+            'avg_heart_rate': round(hr.mean, 1),
+            'min_heart_rate': int(hr.min) if float(hr.min).is_integer() else hr.min,
+            'max_heart_rate': int(hr.max) if float(hr.max).is_integer() else hr.max,
+            'heart_rate_variability': round(hr.std, 1),
+            'step_rate_per_minute': round(total_steps / duration_minutes, 1)
+        }
+
+    def activity_periods(self, user_id: str, window: Union[str, timedelta] = "last_24_hours",
+                         now: Optional[datetime] = None) -> List[Dict]:
+        """기간 내에 시작된 종료된 활동 구간 목록"""
+        with self._lock:
+            state = self._users.get(user_id)
+            if state is None or state.latest is None:
+                return []
+            start, end = self._window(state, window, now)
+            return [dict(period) for period in state.periods if start <= period["start_time"] <= end]
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "users": len(self._users),
+                "minute_buckets": sum(len(state.minutes) for state in self._users.values()),
+                "hour_buckets": sum(len(state.hours) for state in self._users.values()),
+            }
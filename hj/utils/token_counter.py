@@ -0,0 +1,16 @@
+from functools import lru_cache
+from typing import Callable
+
+@lru_cache(maxsize=None)
+def get_token_counter(encoding_name: str = "cl100k_base") -> Callable[[str], int]:
+    """tiktoken 토큰 수 계산기 (프로세스당 한 번만 로드)
+
+    tiktoken 이 없거나 인코딩 파일을 받을 수 없으면 글자 수로 보수적으로 추정합니다.
+    """
+    try:
+        import tiktoken
+        encoding = tiktoken.get_encoding(encoding_name)
+        return lambda text: len(encoding.encode(text, disallowed_special=()))
+    except Exception:
+        # 한국어는 대체로 글자당 1토큰 이하이므로 글자 수를 상한으로 사용
+        return len
@@ -1,6 +1,11 @@
 import json
+import os
+import numpy as np
 import pandas as pd
-from typing import Dict, List
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from utils.cache import LRUCache
 
 class AppleWatchDataParser:
     """Apple Watch 데이터를 파싱하고 분석하는 클래스"""
@@ -10,6 +15,26 @@ class AppleWatchDataParser:
         self.data = None
         self.df = None
         
+    @classmethod
+    def from_store(cls, store, user_id: str, start: Optional[datetime] = None,
+                   end: Optional[datetime] = None) -> "AppleWatchDataParser":
+        """WearableStore 에서 기간 [start, end] 의 데이터만 읽어 파서를 생성합니다.
+        
+        요청한 기간에 해당하는 날짜 파티션만 읽으므로 전체 이력을 메모리에 올리지 않습니다.
+        """
+        parser = cls(json_file_path=None)
+        parser.df = store.read_range(user_id, start, end)
+        if parser.df.empty:
+            date_label = 'Unknown'
+        else:
+            first, last = parser.df['timestamp'].iloc[0], parser.df['timestamp'].iloc[-1]
+            if first.date() == last.date():
+                date_label = first.strftime('%Y-%m-%d')
+            else:
+                date_label = f"{first:%Y-%m-%d %H:%M} ~ {last:%Y-%m-%d %H:%M}"
+        parser.data = {'user_id': user_id, 'date': date_label}
+        return parser
+    
     def load_data(self) -> Dict:
         """JSON 파일에서 Apple Watch 데이터를 로드합니다."""
         try:
@@ -26,7 +51,8 @@ class AppleWatchDataParser:
             self.load_data()
         
         if not self.data or 'data' not in self.data:
-            return pd.DataFrame()
+            self.df = pd.DataFrame()
+            return self.df
         
         self.df = pd.DataFrame(self.data['data'])
         self.df['timestamp'] = pd.to_datetime(self.df['timestamp'])
@@ -55,7 +81,11 @@ class AppleWatchDataParser:
         return summary
     
     def get_activity_periods(self) -> List[Dict]:
-        """활동 구간을 식별합니다 (걸음 수 증가 구간)."""
+        """활동 구간을 식별합니다 (걸음 수 증가 구간).
+        
+        걸음 수가 연속으로 증가한 행들을 하나의 구간으로 묶어 벡터 연산으로 집계합니다.
+        데이터 끝까지 이어지는(종료되지 않은) 구간과 1분 미만 구간은 제외합니다.
+        """
         if self.df is None:
             self.to_dataframe()
         
@@ -65,44 +95,49 @@ class AppleWatchDataParser:
         # 걸음 수 변화량 계산
         self.df['step_diff'] = self.df['step_count'].diff().fillna(0)
         
-        # 활동 구간 식별 (걸음 수가 증가하는 구간)
-        active_periods = []
-        current_period = None
-        
-        for idx, row in self.df.iterrows():
-            if row['step_diff'] > 0:  # 걸음 수 증가
-                if current_period is None:
-                    current_period = {
-                        'start_time': row['timestamp'],
-                        'start_steps': row['step_count'],
-                        'start_hr': row['heart_rate']
-                    }
-                current_period['end_time'] = row['timestamp']
-                current_period['end_steps'] = row['step_count']
-                current_period['end_hr'] = row['heart_rate']
-            else:  # 걸음 수 변화 없음
-                if current_period is not None:
-                    # 활동 구간 종료
-                    duration = (current_period['end_time'] - current_period['start_time']).total_seconds() / 60
-                    if duration >= 1:  # 1분 이상인 활동만 기록
-                        current_period['duration_minutes'] = round(duration, 1)
-                        current_period['steps_taken'] = current_period['end_steps'] - current_period['start_steps']
-                        current_period['avg_hr'] = round((current_period['start_hr'] + current_period['end_hr']) / 2, 1)
-                        active_periods.append(current_period)
-                    current_period = None
-        
-        return active_periods
+        # 활동 구간 식별 (걸음 수가 증가하는 연속 구간에 번호 부여)
+        active = (self.df['step_diff'] > 0).to_numpy()
+        run_id = np.cumsum(np.concatenate(([True], active[1:] != active[:-1])))
+        
+        # 마지막 행까지 이어지는 구간은 종료되지 않았으므로 제외
+        closed = active & (run_id != run_id[-1])
+        if not closed.any():
+            return []
+        
+        active_rows = self.df.loc[closed, ['timestamp', 'step_count', 'heart_rate']]
+        grouped = active_rows.groupby(run_id[closed], sort=True)
+        periods = pd.DataFrame({
+            'start_time': grouped['timestamp'].first(),
+            'start_steps': grouped['step_count'].first(),
+            'start_hr': grouped['heart_rate'].first(),
+            'end_time': grouped['timestamp'].last(),
+            'end_steps': grouped['step_count'].last(),
+            'end_hr': grouped['heart_rate'].last(),
+            'avg_hr': grouped['heart_rate'].mean().round(1),
+        })
+        
+        duration = (periods['end_time'] - periods['start_time']).dt.total_seconds() / 60
+        periods['duration_minutes'] = duration.round(1)
+        periods['steps_taken'] = periods['end_steps'] - periods['start_steps']
+        
+        # 1분 이상인 활동만 기록
+        periods = periods[duration >= 1]
+        
+        columns = ['start_time', 'start_steps', 'start_hr', 'end_time', 'end_steps', 'end_hr',
+                   'duration_minutes', 'steps_taken', 'avg_hr']
+        return periods[columns].to_dict('records')
     
     def format_for_llm(self) -> str:
         """LLM이 이해하기 쉬운 형태로 데이터를 포맷팅합니다."""
-        summary = self.get_summary_stats()
-        activity_periods = self.get_activity_periods()
-        
-        if not summary:
-            return "Apple Watch 데이터를 로드할 수 없습니다."
-        
-        # 기본 정보
-        formatted_text = f"""## Apple Watch 데이터 분석 결과
+        return format_watch_summary(self.get_summary_stats(), self.get_activity_periods())
+
+def format_watch_summary(summary: Dict, activity_periods: List[Dict]) -> str:
+    """요약 통계와 활동 구간을 LLM용 텍스트로 포맷팅합니다."""
+    if not summary:
+        return "Apple Watch 데이터를 로드할 수 없습니다."
+    
+    # 기본 정보
+    formatted_text = f"""## Apple Watch 데이터 분석 결과
 
 ### 기본 정보
 - 사용자 ID: {summary['user_id']}
@@ -120,24 +155,67 @@ class AppleWatchDataParser:
 - 심박수 변동성: {summary['heart_rate_variability']} bpm (표준편차)
 
 """
-        
-        # 활동 구간 정보
-        if activity_periods:
-            formatted_text += "### 주요 활동 구간\n"
-            for i, period in enumerate(activity_periods, 1):
-                formatted_text += f"""
+    
+    # 활동 구간 정보
+    if activity_periods:
+        formatted_text += "### 주요 활동 구간\n"
+        for i, period in enumerate(activity_periods, 1):
+            formatted_text += f"""
 **구간 {i}**
 - 시간: {period['start_time'].strftime('%H:%M:%S')} ~ {period['end_time'].strftime('%H:%M:%S')}
 - 지속시간: {period['duration_minutes']}분
 - 걸음 수: {period['steps_taken']}보
 - 평균 심박수: {period['avg_hr']} bpm
 """
-        else:
-            formatted_text += "### 활동 구간\n- 특별한 활동 구간이 감지되지 않았습니다.\n"
-        
-        return formatted_text
+    else:
+        formatted_text += "### 활동 구간\n- 특별한 활동 구간이 감지되지 않았습니다.\n"
+    
+    return formatted_text
+
+def _analyze(parser: AppleWatchDataParser) -> Dict:
+    """파서로 요약 통계와 활동 구간을 계산하여 LLM용 텍스트와 함께 반환합니다."""
+    summary = parser.get_summary_stats()
+    activity_periods = parser.get_activity_periods() if summary else []
+    return {
+        "text": format_watch_summary(summary, activity_periods),
+        "summary": summary,
+        "activity_periods": activity_periods,
+    }
+
+# (파일 경로, 수정 시각, 크기) -> 파싱 결과 캐시. 파일이 바뀌면 키가 달라져 자동으로 무효화됩니다.
+_watch_data_cache = LRUCache(max_size=32)
+
+def load_apple_watch_data(json_file_path: str) -> Dict:
+    """Apple Watch 파일을 파싱하여 LLM용 텍스트와 요약 통계를 반환합니다 (파일 변경 시까지 캐시).
+    
+    Returns:
+        dict: {"text": LLM용 텍스트, "summary": 요약 통계, "activity_periods": 활동 구간 목록}
+    """
+    try:
+        stat = os.stat(json_file_path)
+    except OSError:
+        stat = None
+    
+    key = None
+    if stat is not None:
+        key = (os.path.abspath(json_file_path), stat.st_mtime_ns, stat.st_size)
+        cached = _watch_data_cache.get(key)
+        if cached is not None:
+            return cached
+    
+    result = _analyze(AppleWatchDataParser(json_file_path))
+    summary = result["summary"]
+    
+    # 로드에 실패한 결과는 캐시하지 않음
+    if key is not None and summary:
+        _watch_data_cache.set(key, result)
+    return result
 
 def parse_apple_watch_data(json_file_path: str) -> str:
     """Apple Watch 데이터를 파싱하여 LLM용 텍스트로 반환하는 편의 함수"""
-    parser = AppleWatchDataParser(json_file_path)
-    return parser.format_for_llm() 
\ No newline at end of file
+    return load_apple_watch_data(json_file_path)["text"]
+
+def load_wearable_data(store, user_id: str, start: Optional[datetime] = None,
+                       end: Optional[datetime] = None) -> Dict:
+    """WearableStore 의 기간 데이터를 분석하여 load_apple_watch_data 와 같은 형태로 반환합니다."""
+    return _analyze(AppleWatchDataParser.from_store(store, user_id, start, end))